@@ -0,0 +1,11 @@
+"""Entry point for ``python -m voice_notes``.
+
+The CLI module keeps its heavy imports inside the functions that need them,
+so ``python -m voice_notes --help`` returns without loading WhisperX, torch,
+or the OpenAI client.
+"""
+
+from voice_notes.cli import main
+
+if __name__ == "__main__":
+    main()
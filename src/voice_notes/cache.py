@@ -0,0 +1,133 @@
+"""On-disk cache for transcription and summary results.
+
+This module stores JSON-serializable results under a content-addressed key,
+so rerunning VoiceNotes on the same audio or transcript can skip Whisper
+inference and paid API calls.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# Overrides the cache location (default: $XDG_CACHE_HOME/voice_notes)
+_CACHE_DIR_ENV = "VOICE_NOTES_CACHE_DIR"
+
+
+def default_cache_dir() -> Path:
+    """Get the directory cached results are stored in.
+
+    Returns:
+        $VOICE_NOTES_CACHE_DIR if set, otherwise ``voice_notes`` under
+        $XDG_CACHE_HOME (or ~/.cache).
+    """
+    override = os.environ.get(_CACHE_DIR_ENV)
+    if override:
+        return Path(override).expanduser()
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "voice_notes"
+
+
+def file_digest(path: Path) -> str:
+    """Hash a file's full content with BLAKE2b.
+
+    Args:
+        path: Path to the file.
+
+    Returns:
+        Hex digest of the file content.
+
+    Raises:
+        OSError: If the file cannot be read.
+    """
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "blake2b").hexdigest()
+
+
+def make_key(*parts: str) -> str:
+    """Build a cache key from the inputs that determine a result.
+
+    Args:
+        *parts: Strings identifying the request (content digest, options).
+
+    Returns:
+        Hex digest usable as a file name.
+    """
+    digest = hashlib.blake2b(digest_size=32)
+    for part in parts:
+        encoded = part.encode("utf-8")
+        # Length-prefix each part so ("ab", "c") and ("a", "bc") differ
+        digest.update(len(encoded).to_bytes(8, "little"))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+
+def _entry_path(namespace: str, key: str, cache_dir: Path | None) -> Path:
+    """Get the file that holds one cache entry."""
+    return (cache_dir or default_cache_dir()) / namespace / f"{key}.json"
+
+
+def load_result(
+    namespace: str,
+    key: str,
+    ttl: float | None = None,
+    cache_dir: Path | None = None,
+) -> Any | None:
+    """Load a cached result.
+
+    Args:
+        namespace: Kind of result (e.g., "transcripts", "summaries").
+        key: Key from make_key.
+        ttl: Maximum entry age in seconds. None keeps entries forever.
+        cache_dir: Cache root (default: default_cache_dir()).
+
+    Returns:
+        The cached value, or None on a miss or an expired/unreadable entry.
+    """
+    path = _entry_path(namespace, key, cache_dir)
+    try:
+        if ttl is not None and time.time() - path.stat().st_mtime > ttl:
+            return None
+        return orjson.loads(path.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+
+
+def store_result(
+    namespace: str,
+    key: str,
+    value: Any,
+    cache_dir: Path | None = None,
+) -> None:
+    """Store a result in the cache.
+
+    Failures are logged and otherwise ignored; a cache that cannot be written
+    must not fail the run that produced the result.
+
+    Args:
+        namespace: Kind of result (e.g., "transcripts", "summaries").
+        key: Key from make_key.
+        value: JSON-serializable value (numpy values are allowed).
+        cache_dir: Cache root (default: default_cache_dir()).
+    """
+    path = _entry_path(namespace, key, cache_dir)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        data = orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path.write_bytes(data)
+        # Readers never see a partially written entry
+        os.replace(tmp_path, path)
+    except (OSError, TypeError) as e:
+        logger.warning(f"Could not write cache entry {path}: {e}")
+        with contextlib.suppress(OSError):
+            tmp_path.unlink()
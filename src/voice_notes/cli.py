@@ -7,46 +7,60 @@ and summarization workflows.
 
 from __future__ import annotations
 
+import argparse
+import functools
+import json
 import os
-
-# Set Qt to use offscreen platform BEFORE any other imports
-# This must be set before importing any Qt-dependent libraries
-# (e.g., pyannote.audio, torchaudio)
-os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
-
-import argparse  # noqa: E402
-from pathlib import Path  # noqa: E402
-from typing import Any  # noqa: E402
-
-from dotenv import load_dotenv  # noqa: E402
-from rich.console import Console  # noqa: E402
-
-from voice_notes import transcribe  # noqa: E402
-from voice_notes.formatting import format_speaker_transcript  # noqa: E402
-from voice_notes.io_utils import (  # noqa: E402
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from voice_notes.cache import file_digest
+from voice_notes.formatting import format_speaker_transcript
+from voice_notes.io_utils import (
     default_output_dir,
     ensure_dir,
+    file_fingerprint,
     write_text,
 )
-from voice_notes.summarize import summarize_transcript  # noqa: E402
-from voice_notes.transcribe import save_segments_json, transcribe_file  # noqa: E402
-from voice_notes.whisperx_tools import (  # noqa: E402
-    align_transcript,
-    assign_speakers,
-    diarize_audio,
-)
 
-console = Console()
+if TYPE_CHECKING:
+    from voice_notes.transcribe import WhisperResult
 
+# Heavy dependencies (whisperx/torch, pyannote, openai, dotenv) are imported
+# inside the functions that need them so that `--help` and argument errors
+# return without loading them.
 
-def _parse_arguments() -> argparse.Namespace:
-    """Parse command-line arguments.
+# ANSI SGR codes for status labels
+_BOLD = "1"
+_GREEN = "32"
+_YELLOW = "33"
 
-    Returns:
-        Parsed arguments namespace.
 
-    Raises:
-        SystemExit: If argument parsing fails.
+def _echo(label: object, *parts: object, style: str = "") -> None:
+    """Print a status line, colouring the label when stdout is a terminal.
+
+    Args:
+        label: First item on the line; the only part that gets styled.
+        *parts: Remaining items, printed space-separated after the label.
+        style: ANSI SGR code for the label (e.g. _GREEN). Empty for plain text.
+    """
+    head = str(label)
+    if style and sys.stdout.isatty():
+        head = f"\x1b[{style}m{head}\x1b[0m"
+    print(head, *parts)
+
+
+@functools.cache
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser for the voice-notes CLI.
+
+    The parser is built once per process and shared by every parse; parsing
+    does not mutate it.
+
+    Returns:
+        Configured argument parser.
     """
     parser = argparse.ArgumentParser(
         prog="voice-notes",
@@ -55,9 +69,37 @@ def _parse_arguments() -> argparse.Namespace:
             "optionally align and diarize with WhisperX."
         ),
     )
-    parser.add_argument("audio_path", type=str, help="Path to audio/video file.")
+    parser.add_argument(
+        "audio_paths",
+        type=str,
+        nargs="+",
+        metavar="audio_path",
+        help=(
+            "Path to audio/video file. Pass several to process them in one run; "
+            "each file's outputs then go to a subdirectory named after it."
+        ),
+    )
     parser.add_argument("--model", type=str, default="small", help="Whisper model.")
     parser.add_argument("--device", type=str, default="cpu", choices=["cpu", "cuda"])
+    parser.add_argument(
+        "--compute-type",
+        type=str,
+        default=None,
+        choices=["int8", "float16", "float32"],
+        help="Model precision (default: int8 on cpu, float16 on cuda).",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=30,
+        help="Longest audio window in seconds passed to Whisper (1-30).",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=8,
+        help="Audio windows transcribed per forward pass (lower to save memory).",
+    )
     parser.add_argument(
         "--language", type=str, default=None, help="Language code, e.g. en."
     )
@@ -65,38 +107,63 @@ def _parse_arguments() -> argparse.Namespace:
         "--prompt", type=str, default=None, help="Initial prompt for Whisper."
     )
     parser.add_argument("--out", type=str, default=None, help="Output directory.")
-
     parser.add_argument(
+        "--no-cache",
+        dest="cache",
+        action="store_false",
+        help="Do not reuse or store cached transcripts and summaries.",
+    )
+
+    alignment = parser.add_argument_group("alignment")
+    alignment.add_argument(
         "--align",
         action="store_true",
         help="Run WhisperX alignment for better timestamps.",
     )
-    parser.add_argument(
+
+    diarization = parser.add_argument_group("diarization")
+    diarization.add_argument(
         "--diarize",
         action="store_true",
         help="Run diarization and output transcript_by_speaker.txt.",
     )
-    parser.add_argument(
+    diarization.add_argument(
         "--min-speakers", type=int, default=None, help="Minimum speakers (optional)."
     )
-    parser.add_argument(
+    diarization.add_argument(
         "--max-speakers", type=int, default=None, help="Maximum speakers (optional)."
     )
 
-    parser.add_argument(
+    summary = parser.add_argument_group("summary")
+    summary.add_argument(
         "--summarize", action="store_true", help="Generate summary.md using API."
     )
-    parser.add_argument(
+    summary.add_argument(
         "--summary-model",
         type=str,
         default="gpt-4o-mini",
         help="API model for summary.",
     )
-    return parser.parse_args()
+    return parser
+
+
+def _parse_arguments(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse command-line arguments.
+
+    Args:
+        argv: Arguments to parse. Defaults to sys.argv[1:] when None.
+
+    Returns:
+        Parsed arguments namespace.
+
+    Raises:
+        SystemExit: If argument parsing fails.
+    """
+    return _build_parser().parse_args(argv)
 
 
 def _save_basic_transcript(
-    whisper_result: transcribe.WhisperResult,
+    whisper_result: WhisperResult,
     out_dir: Path,
 ) -> None:
     """Save basic transcript and segments.
@@ -105,14 +172,16 @@ def _save_basic_transcript(
         whisper_result: Transcription result from Whisper.
         out_dir: Output directory path.
     """
+    from voice_notes.transcribe import save_segments_json
+
     transcript_path = out_dir / "transcript.txt"
     segments_path = out_dir / "segments.json"
 
     write_text(transcript_path, whisper_result.text)
-    save_segments_json(whisper_result.segments, segments_path)
+    save_segments_json(whisper_result.segments, segments_path, atomic=True)
 
-    console.print(f"[green]Wrote:[/green] {transcript_path}")
-    console.print(f"[green]Wrote:[/green] {segments_path}")
+    _echo("Wrote:", transcript_path, style=_GREEN)
+    _echo("Wrote:", segments_path, style=_GREEN)
 
 
 def _process_alignment(
@@ -121,6 +190,7 @@ def _process_alignment(
     language: str | None,
     device: str,
     out_dir: Path,
+    audio: Any = None,
 ) -> list[dict[str, Any]]:
     """Process WhisperX alignment if requested.
 
@@ -130,6 +200,7 @@ def _process_alignment(
         language: Language code for alignment.
         device: Device to use for processing.
         out_dir: Output directory path.
+        audio: Already decoded samples, if available.
 
     Returns:
         Aligned segments.
@@ -142,35 +213,40 @@ def _process_alignment(
             "Alignment needs a language. Pass --language en or let Whisper detect it."
         )
 
+    from voice_notes.transcribe import save_segments_json
+    from voice_notes.whisperx_tools import align_transcript
+
     aligned_segments = align_transcript(
         audio_path=audio_path,
         segments=segments,
         language=language,
         device=device,
+        audio=audio,
     )
     aligned_path = out_dir / "aligned_segments.json"
-    save_segments_json(aligned_segments, aligned_path)
-    console.print(f"[green]Wrote:[/green] {aligned_path}")
+    save_segments_json(aligned_segments, aligned_path, atomic=True)
+    _echo("Wrote:", aligned_path, style=_GREEN)
     return aligned_segments
 
 
-def _process_diarization(
+def _diarize(
     audio_path: Path,
-    segments: list[dict[str, Any]],
     device: str,
     min_speakers: int | None,
     max_speakers: int | None,
-    out_dir: Path,
-) -> None:
-    """Process speaker diarization if requested.
+    audio: Any = None,
+) -> Any:
+    """Run speaker diarization.
 
     Args:
         audio_path: Path to audio file.
-        segments: Segments to assign speakers to.
         device: Device to use for processing.
         min_speakers: Minimum number of speakers.
         max_speakers: Maximum number of speakers.
-        out_dir: Output directory path.
+        audio: Already decoded samples, if available.
+
+    Returns:
+        The diarization result from diarize_audio.
 
     Raises:
         ValueError: If HUGGINGFACE_TOKEN is not set.
@@ -182,29 +258,69 @@ def _process_diarization(
             "Set it as an environment variable."
         )
 
-    diarization_result = diarize_audio(
+    from voice_notes.whisperx_tools import diarize_audio
+
+    return diarize_audio(
         audio_path=audio_path,
         device=device,
         hf_token=hf_token,
         min_speakers=min_speakers,
         max_speakers=max_speakers,
+        audio=audio,
     )
+
+
+def _process_diarization(
+    audio_path: Path,
+    segments: list[dict[str, Any]],
+    device: str,
+    min_speakers: int | None,
+    max_speakers: int | None,
+    out_dir: Path,
+    audio: Any = None,
+    diarization_result: Any = None,
+) -> None:
+    """Process speaker diarization if requested.
+
+    Args:
+        audio_path: Path to audio file.
+        segments: Segments to assign speakers to.
+        device: Device to use for processing.
+        min_speakers: Minimum number of speakers.
+        max_speakers: Maximum number of speakers.
+        out_dir: Output directory path.
+        audio: Already decoded samples, if available.
+        diarization_result: Result of a diarization already run (e.g., next
+            to alignment); diarization runs here if None.
+
+    Raises:
+        ValueError: If HUGGINGFACE_TOKEN is not set.
+    """
+    if diarization_result is None:
+        diarization_result = _diarize(
+            audio_path, device, min_speakers, max_speakers, audio
+        )
+
+    from voice_notes.transcribe import save_segments_json
+    from voice_notes.whisperx_tools import assign_speakers
+
     diarized_segments = assign_speakers(diarization_result, segments)
 
     diarized_path = out_dir / "diarized_segments.json"
-    save_segments_json(diarized_segments, diarized_path)
-    console.print(f"[green]Wrote:[/green] {diarized_path}")
+    save_segments_json(diarized_segments, diarized_path, atomic=True)
+    _echo("Wrote:", diarized_path, style=_GREEN)
 
     by_speaker_text = format_speaker_transcript(diarized_segments)
     by_speaker_path = out_dir / "transcript_by_speaker.txt"
     write_text(by_speaker_path, by_speaker_text)
-    console.print(f"[green]Wrote:[/green] {by_speaker_path}")
+    _echo("Wrote:", by_speaker_path, style=_GREEN)
 
 
 def _process_summary(
     transcript: str,
     model: str,
     out_dir: Path,
+    cache_enabled: bool = False,
 ) -> None:
     """Process transcript summary if requested.
 
@@ -212,6 +328,7 @@ def _process_summary(
         transcript: Transcript text to summarize.
         model: OpenAI model to use for summary.
         out_dir: Output directory path.
+        cache_enabled: Whether to reuse and store cached summaries.
 
     Raises:
         ValueError: If OPENAI_API_KEY is not set.
@@ -223,66 +340,204 @@ def _process_summary(
             "Set it as an environment variable."
         )
 
+    from voice_notes.summarize import summarize_transcript
+
     summary = summarize_transcript(
         transcript=transcript,
         model=model,
         api_key=api_key,
+        cache_enabled=cache_enabled,
     )
     summary_path = out_dir / "summary.md"
     write_text(summary_path, summary.markdown)
-    console.print(f"[green]Wrote:[/green] {summary_path}")
+    _echo("Wrote:", summary_path, style=_GREEN)
 
 
-def main() -> None:
-    """Entry point for the voice-notes CLI.
+def _maybe_load_dotenv() -> None:
+    """Load the nearest .env file from the working directory or its parents.
 
-    Raises:
-        FileNotFoundError: If audio file does not exist.
-        ValueError: If required arguments are missing or invalid.
+    python-dotenv is only imported when a .env file actually exists, so runs
+    that get their settings from the real environment skip it entirely.
     """
-    load_dotenv()
+    cwd = Path.cwd()
+    for directory in (cwd, *cwd.parents):
+        env_path = directory / ".env"
+        if env_path.is_file():
+            from dotenv import load_dotenv
+
+            load_dotenv(env_path)
+            return
+
+
+def _maybe_preload_model(args: argparse.Namespace) -> None:
+    """Start loading the Whisper model in the background if requested.
 
-    args = _parse_arguments()
+    Enabled with VOICE_NOTES_PRELOAD=1. The model loads while the first file
+    is fingerprinted and decoded instead of after.
 
-    audio_path = Path(args.audio_path).expanduser().resolve()
-    if not audio_path.exists():
-        raise FileNotFoundError(f"Audio file not found: {audio_path}")
+    Args:
+        args: Parsed command-line arguments.
+    """
+    if os.getenv("VOICE_NOTES_PRELOAD") != "1":
+        return
+
+    from voice_notes.transcribe import preload_model
 
-    out_dir = (
-        Path(args.out).expanduser().resolve()
-        if args.out
-        else default_output_dir(audio_path)
+    preload_model(
+        model_name=args.model,
+        device=args.device,
+        language=args.language,
+        prompt=args.prompt,
+        compute_type=args.compute_type,
     )
+
+
+def _resolve_path(raw: str) -> Path:
+    """Expand ``~`` and resolve a command-line path to an absolute real path.
+
+    Goes straight through os.path instead of building intermediate Path
+    objects for expanduser() and resolve().
+
+    Args:
+        raw: Path as given on the command line.
+
+    Returns:
+        Absolute path with symlinks resolved.
+    """
+    return Path(os.path.realpath(os.path.expanduser(raw)))
+
+
+# Per-output-directory cache of the language Whisper detected for the input
+_LANGUAGE_CACHE_NAME = ".voicenotes_cache.json"
+
+
+def _load_cached_language(out_dir: Path, fingerprint: str) -> str | None:
+    """Return the language cached for an audio fingerprint, if any.
+
+    Args:
+        out_dir: Output directory holding the cache file.
+        fingerprint: Content fingerprint of the audio file.
+
+    Returns:
+        Cached language code, or None if there is no matching entry.
+    """
+    try:
+        cache = json.loads((out_dir / _LANGUAGE_CACHE_NAME).read_text("utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(cache, dict) or cache.get("audio_sha") != fingerprint:
+        return None
+    language = cache.get("language")
+    return language if isinstance(language, str) and language else None
+
+
+def _save_cached_language(out_dir: Path, fingerprint: str, language: str) -> None:
+    """Record the detected language for an audio fingerprint.
+
+    Args:
+        out_dir: Output directory to write the cache file into.
+        fingerprint: Content fingerprint of the audio file.
+        language: Language code detected by Whisper.
+    """
+    cache = {"audio_sha": fingerprint, "language": language}
+    write_text(out_dir / _LANGUAGE_CACHE_NAME, json.dumps(cache))
+
+
+def _process_file(
+    audio_path: Path,
+    out_dir: Path,
+    args: argparse.Namespace,
+    *,
+    last: bool = True,
+) -> None:
+    """Run the transcription pipeline for a single audio file.
+
+    Args:
+        audio_path: Resolved path to the audio file.
+        out_dir: Output directory for this file.
+        args: Parsed command-line arguments.
+        last: Whether no later file will need the Whisper model.
+    """
+    from voice_notes.transcribe import load_audio, release_models, transcribe_file
+
     ensure_dir(out_dir)
 
-    console.print(f"[bold]Input:[/bold] {audio_path}")
-    console.print(f"[bold]Output dir:[/bold] {out_dir}")
+    _echo("Input:", audio_path, style=_BOLD)
+    _echo("Output dir:", out_dir, style=_BOLD)
+
+    # The transcript cache hashes the whole file; hash it once and let the
+    # language cache share that digest
+    digest = file_digest(audio_path) if args.cache else None
+
+    # Reuse the language detected on a previous run over the same audio so
+    # Whisper can skip its detection pass
+    language = args.language
+    fingerprint = None
+    if not language:
+        fingerprint = digest or file_fingerprint(audio_path)
+        language = _load_cached_language(out_dir, fingerprint)
+
+    # Alignment and diarization need the samples too, so decode once up front;
+    # otherwise leave decoding to transcribe_file, which skips it on a cache hit
+    audio = load_audio(audio_path) if args.align or args.diarize else None
 
     whisper_result = transcribe_file(
         audio_path=audio_path,
         model_name=args.model,
         device=args.device,
-        language=args.language,
+        language=language,
         prompt=args.prompt,
+        compute_type=args.compute_type,
+        cache_enabled=args.cache,
+        audio=audio,
+        chunk_size=args.chunk_size,
+        batch_size=args.batch_size,
+        audio_digest=digest,
     )
 
     _save_basic_transcript(whisper_result, out_dir)
 
+    # Nothing reuses Whisper after the last file, so give its GPU memory to
+    # the alignment and diarization models instead of holding all three
+    if last and (args.align or args.diarize):
+        release_models(args.device)
+
     detected_language = whisper_result.language
     if detected_language:
-        console.print(f"[bold]Detected language:[/bold] {detected_language}")
+        _echo("Detected language:", detected_language, style=_BOLD)
+        if fingerprint and detected_language != language:
+            _save_cached_language(out_dir, fingerprint, detected_language)
 
     segments_for_next = whisper_result.segments
+    diarization_result = None
 
     if args.align:
         lang = args.language or detected_language
-        segments_for_next = _process_alignment(
-            audio_path=audio_path,
-            segments=segments_for_next,
-            language=lang,
-            device=args.device,
-            out_dir=out_dir,
-        )
+        # Diarization only needs the audio, so it runs while alignment does
+        # instead of after it
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            diarizing = (
+                pool.submit(
+                    _diarize,
+                    audio_path,
+                    args.device,
+                    args.min_speakers,
+                    args.max_speakers,
+                    audio,
+                )
+                if args.diarize
+                else None
+            )
+            segments_for_next = _process_alignment(
+                audio_path=audio_path,
+                segments=segments_for_next,
+                language=lang,
+                device=args.device,
+                out_dir=out_dir,
+                audio=audio,
+            )
+            if diarizing is not None:
+                diarization_result = diarizing.result()
 
     if args.diarize:
         _process_diarization(
@@ -292,6 +547,8 @@ def main() -> None:
             min_speakers=args.min_speakers,
             max_speakers=args.max_speakers,
             out_dir=out_dir,
+            audio=audio,
+            diarization_result=diarization_result,
         )
 
     if args.summarize:
@@ -300,15 +557,69 @@ def main() -> None:
                 transcript=whisper_result.text,
                 model=args.summary_model,
                 out_dir=out_dir,
+                cache_enabled=args.cache,
             )
         except (ValueError, RuntimeError) as e:
-            console.print(f"[yellow]Warning:[/yellow] Summary generation failed: {e}")
-            console.print(
-                "[yellow]Transcription and alignment completed successfully.[/yellow]"
-            )
+            _echo("Warning:", f"Summary generation failed: {e}", style=_YELLOW)
+            _echo("Transcription and alignment completed successfully.", style=_YELLOW)
             # Don't crash - the main work is done
     else:
-        console.print("Skipping summary. Run with --summarize to create summary.md.")
+        _echo("Skipping summary. Run with --summarize to create summary.md.")
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Entry point for the voice-notes CLI.
+
+    All input files are checked before any work starts. Models are loaded
+    once per process and reused for every file in a multi-file run.
+
+    Args:
+        argv: Arguments to parse. Defaults to sys.argv[1:] when None.
+
+    Raises:
+        FileNotFoundError: If an audio file does not exist.
+        ValueError: If required arguments are missing or invalid, or two
+            input files would write to the same output directory.
+    """
+    args = _parse_arguments(argv)
+
+    _maybe_load_dotenv()
+
+    audio_paths = [_resolve_path(raw) for raw in args.audio_paths]
+    for audio_path in audio_paths:
+        if not os.path.exists(audio_path):
+            raise FileNotFoundError(f"Audio file not found: {audio_path}")
+
+    out_base = _resolve_path(args.out) if args.out else None
+    out_dirs = [out_base or default_output_dir(path) for path in audio_paths]
+    if len(audio_paths) > 1:
+        # Keep per-file outputs (transcript.txt, ...) from overwriting
+        out_dirs = [out_dir / path.stem for out_dir, path in zip(out_dirs, audio_paths)]
+        first_input: dict[Path, Path] = {}
+        for out_dir, path in zip(out_dirs, audio_paths):
+            other = first_input.setdefault(out_dir, path)
+            if other != path:
+                raise ValueError(
+                    f"{other} and {path} would both write to {out_dir}; "
+                    "rename one or run them separately"
+                )
+
+    _maybe_preload_model(args)
+
+    try:
+        for index, (audio_path, out_dir) in enumerate(
+            zip(audio_paths, out_dirs), start=1
+        ):
+            _process_file(audio_path, out_dir, args, last=index == len(audio_paths))
+        # Flush here so a closed pipe is reported inside the try
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # stdout was closed early (e.g. ``voice-notes ... | head``). Python
+        # flushes stdout again at exit; point it at devnull so that flush
+        # cannot raise a second time
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -8,6 +8,8 @@ from __future__ import annotations
 
 from typing import Any
 
+_UNKNOWN_SPEAKER = "SPEAKER_UNKNOWN"
+
 
 def format_speaker_transcript(segments: list[dict[str, Any]]) -> str:
     """Format segments into a speaker-labeled transcript.
@@ -26,26 +28,19 @@ def format_speaker_transcript(segments: list[dict[str, Any]]) -> str:
     Raises:
         ValueError: If segments is None or invalid.
     """
-    if segments is None:
-        raise ValueError("segments cannot be None")
-
     if not isinstance(segments, list):
+        if segments is None:
+            raise ValueError("segments cannot be None")
         raise ValueError("segments must be a list")
 
-    lines: list[str] = []
-    for seg in segments:
-        if not isinstance(seg, dict):
-            continue  # Skip invalid segments
-
-        speaker = str(seg.get("speaker", "SPEAKER_UNKNOWN"))
-        text = seg.get("text", "")
-        if not text or not isinstance(text, str):
-            continue
-
-        text = text.strip()
-        if not text:
-            continue
-
-        lines.append(f"{speaker}: {text}")
-
-    return "\n".join(lines).strip()
+    # Every joined line is stripped and non-empty, so the result needs no
+    # outer strip; join() materializes the comprehension in one allocation
+    return "\n".join(
+        [
+            f"{seg.get('speaker', _UNKNOWN_SPEAKER)}: {text}"
+            for seg in segments
+            if isinstance(seg, dict)
+            and isinstance(text := seg.get("text"), str)
+            and (text := text.strip())
+        ]
+    )
@@ -6,8 +6,51 @@ including path validation, directory creation, and text file writing.
 
 from __future__ import annotations
 
+import hashlib
+import os
 from pathlib import Path
 
+# O_BINARY keeps Windows from translating newlines on the raw descriptor
+_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+
+
+def _is_empty_path(path: Path | None) -> bool:
+    """Check whether a path argument is missing or empty.
+
+    ``Path("")`` normalizes to ``"."``, and an empty ``str`` is falsy, so a
+    single comparison covers both spellings.
+
+    Args:
+        path: Path argument to check.
+
+    Returns:
+        True if the path is None or empty.
+    """
+    return not path or str(path) == "."
+
+
+def file_fingerprint(path: Path, sample_size: int = 1 << 20) -> str:
+    """Compute a cheap content fingerprint for a file.
+
+    Hashes the file size plus its first ``sample_size`` bytes with BLAKE2b,
+    which is enough to tell recordings apart without reading them in full.
+
+    Args:
+        path: Path to the file.
+        sample_size: Number of leading bytes to hash (default: 1 MiB).
+
+    Returns:
+        Hex digest identifying the file's content.
+
+    Raises:
+        OSError: If the file cannot be read.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        digest.update(os.fstat(f.fileno()).st_size.to_bytes(8, "little"))
+        digest.update(f.read(sample_size))
+    return digest.hexdigest()
+
 
 def default_output_dir(audio_path: Path) -> Path:
     """Get the default output directory for transcription results.
@@ -23,7 +66,7 @@ def default_output_dir(audio_path: Path) -> Path:
     Raises:
         ValueError: If audio_path is invalid.
     """
-    if not audio_path or str(audio_path) in ("", "."):
+    if _is_empty_path(audio_path):
         raise ValueError("audio_path cannot be None or empty")
     return audio_path.parent
 
@@ -38,7 +81,7 @@ def ensure_dir(path: Path) -> None:
         ValueError: If path is invalid.
         OSError: If directory cannot be created.
     """
-    if not path or str(path) in ("", "."):
+    if _is_empty_path(path):
         raise ValueError("path cannot be None or empty")
     try:
         path.mkdir(parents=True, exist_ok=True)
@@ -49,6 +92,9 @@ def ensure_dir(path: Path) -> None:
 def write_text(path: Path, text: str) -> None:
     """Write text content to a file.
 
+    The text is encoded once and handed to the OS in as few ``os.write``
+    calls as possible, bypassing the buffered text-file layer.
+
     Args:
         path: Path to the output file.
         text: Text content to write.
@@ -57,11 +103,18 @@ def write_text(path: Path, text: str) -> None:
         ValueError: If path or text is invalid.
         OSError: If file cannot be written.
     """
-    if not path or str(path) in ("", "."):
+    if _is_empty_path(path):
         raise ValueError("path cannot be None or empty")
     if text is None:
         raise ValueError("text cannot be None")
+    data = memoryview(text.encode("utf-8"))
     try:
-        path.write_text(text, encoding="utf-8")
+        fd = os.open(path, _WRITE_FLAGS, 0o644)
+        try:
+            # A single write may be partial for large payloads
+            while data:
+                data = data[os.write(fd, data) :]
+        finally:
+            os.close(fd)
     except OSError as e:
         raise OSError(f"Failed to write file {path}: {e}") from e
@@ -6,12 +6,83 @@ using OpenAI's chat completion API.
 
 from __future__ import annotations
 
+import asyncio
+import json
+import time
+from collections.abc import Callable, Iterable
 from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
 
-from openai import APIError, OpenAI, RateLimitError
+from voice_notes.cache import load_result, make_key, store_result
 
+# openai (and httpx/anyio/pydantic behind it) is imported on first use, so
+# importing this module costs nothing on runs that never summarize
+if TYPE_CHECKING:
+    from openai import OpenAI
 
-@dataclass
+# The system message is identical for every request, so build it once
+_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": """You are summarizing a verbatim transcript
+from an audio recording.
+
+First, read the full transcript carefully.
+
+Then produce a concise, structured summary with the sections below.
+
+Use clear language.
+Avoid filler.
+Do not invent facts.
+If something is unclear, note it.
+
+Output format (markdown):
+
+## Summary
+- 5–8 bullets capturing the core points
+
+## Decisions
+- List explicit decisions made
+- If none, write "No explicit decisions recorded"
+
+## Action Items
+- Bullet list
+- Include owner and due date if stated
+- If missing, note "owner not specified" or "no due date stated"
+
+## Open Questions
+- Items that were raised but not resolved
+- If none, write "No open questions"
+
+## Key Quotes (optional)
+- 2–4 short quotes only if they clarify intent or tone
+
+Important rules:
+- Base everything strictly on the transcript
+- Do not infer beyond what was said
+- Preserve intent, not wording""",
+}
+
+# Summaries should be faithful, not creative; a low temperature also keeps
+# reruns (and the on-disk cache) stable
+_TEMPERATURE = 0.2
+
+# Output budget per summary; the prompt's sections fit well within it, and
+# the bound keeps a runaway response from billing thousands of tokens
+_DEFAULT_MAX_TOKENS = 1024
+
+# Sent with every request so OpenAI routes summaries, which all start with
+# the same system message, to servers holding that prefix in the prompt cache
+_PROMPT_CACHE_KEY = "voice-notes-summary"
+
+# Batch API job states that will not change any more
+_BATCH_FAILED_STATES = frozenset({"failed", "expired", "cancelled"})
+
+# OpenAI clients keyed by API key, so repeated summaries in one process share
+# the client's HTTP connection pool instead of opening new TLS connections
+_CLIENT_CACHE: dict[str, OpenAI] = {}
+
+
+@dataclass(slots=True, frozen=True)
 class Summary:
     """Summary result from OpenAI API."""
 
@@ -19,10 +90,165 @@ class Summary:
     text: str
 
 
+def _get_client(api_key: str) -> OpenAI:
+    """Return the OpenAI client for an API key, creating it on first use.
+
+    Args:
+        api_key: OpenAI API key.
+
+    Returns:
+        A shared OpenAI client.
+    """
+    client = _CLIENT_CACHE.get(api_key)
+    if client is None:
+        from openai import OpenAI
+
+        client = OpenAI(api_key=api_key)
+        _CLIENT_CACHE[api_key] = client
+    return client
+
+
+def _build_request(transcript: str, model: str, max_tokens: int) -> dict[str, Any]:
+    """Build the chat completion parameters for summarizing one transcript.
+
+    The fixed system message always comes first and the transcript last, so
+    every request shares the longest possible cacheable prefix.
+
+    Args:
+        transcript: The transcript text to summarize.
+        model: OpenAI model to use.
+        max_tokens: Upper bound on generated tokens.
+
+    Returns:
+        Keyword arguments for chat.completions.create.
+    """
+    return {
+        "model": model,
+        "messages": [
+            _SYSTEM_MESSAGE,
+            {
+                "role": "user",
+                "content": f"Summarize the following transcript:\n\n{transcript}",
+            },
+        ],
+        "temperature": _TEMPERATURE,
+        "max_completion_tokens": max_tokens,
+        "prompt_cache_key": _PROMPT_CACHE_KEY,
+    }
+
+
+def _parse_response(response: Any) -> Summary:
+    """Extract the summary from a chat completion response.
+
+    Args:
+        response: Chat completion response from the OpenAI API.
+
+    Returns:
+        Summary object with markdown and text fields.
+
+    Raises:
+        RuntimeError: If the response is missing its choices or message.
+    """
+    # Defensive access to response structure
+    if not response:
+        raise RuntimeError("Invalid API response: missing choices")
+
+    if not hasattr(response, "choices") or response.choices is None:
+        raise RuntimeError("Invalid API response: missing choices")
+
+    if len(response.choices) == 0:
+        raise RuntimeError("Invalid API response: empty choices list")
+
+    first_choice = response.choices[0]
+    if not first_choice or not first_choice.message:
+        raise RuntimeError("Invalid API response: missing message")
+
+    summary_text = first_choice.message.content or ""
+
+    return Summary(
+        markdown=summary_text,
+        text=summary_text,
+    )
+
+
+def _collect_stream(chunks: Iterable[Any], on_delta: Callable[[str], None]) -> Summary:
+    """Assemble a streamed chat completion, reporting text as it arrives.
+
+    Args:
+        chunks: Chunks from a ``stream=True`` chat completion request.
+        on_delta: Called with each new piece of summary text.
+
+    Returns:
+        Summary object with the concatenated text.
+    """
+    parts: list[str] = []
+    for chunk in chunks:
+        if not chunk.choices:
+            continue  # e.g. the trailing usage chunk
+        delta = chunk.choices[0].delta.content
+        if delta:
+            parts.append(delta)
+            on_delta(delta)
+    summary_text = "".join(parts)
+    return Summary(markdown=summary_text, text=summary_text)
+
+
+def _api_error(error: Exception) -> RuntimeError:
+    """Translate an exception raised during a request into a RuntimeError.
+
+    Args:
+        error: Exception raised by the OpenAI client.
+
+    Returns:
+        RuntimeError with a user-facing explanation.
+    """
+    from openai import APIError, RateLimitError
+
+    if isinstance(error, RateLimitError):
+        return RuntimeError(
+            "OpenAI API quota exceeded. "
+            "Please check your billing and usage at https://platform.openai.com/usage. "
+            f"Error: {error}"
+        )
+    if isinstance(error, APIError):
+        return RuntimeError(
+            f"OpenAI API error: {error}. Please check your API key and account status."
+        )
+    return RuntimeError(f"Failed to generate summary: {error}")
+
+
+def _validate_request(api_key: str | None, model: str, max_tokens: int) -> None:
+    """Validate the arguments shared by all summarization entry points.
+
+    Args:
+        api_key: OpenAI API key.
+        model: OpenAI model to use.
+        max_tokens: Upper bound on generated tokens.
+
+    Raises:
+        ValueError: If the API key or model is missing, or max_tokens < 1.
+    """
+    if not api_key:
+        raise ValueError(
+            "OpenAI API key is required for summarization. "
+            "Set OPENAI_API_KEY environment variable or pass api_key parameter."
+        )
+
+    if not model or not model.strip():
+        raise ValueError("model cannot be empty")
+
+    if max_tokens < 1:
+        raise ValueError("max_tokens must be at least 1")
+
+
 def summarize_transcript(
     transcript: str,
     model: str = "gpt-4o-mini",
     api_key: str | None = None,
+    cache_enabled: bool = False,
+    cache_ttl: float | None = None,
+    max_tokens: int = _DEFAULT_MAX_TOKENS,
+    on_delta: Callable[[str], None] | None = None,
 ) -> Summary:
     """Generate a summary of the transcript using OpenAI API.
 
@@ -30,113 +256,306 @@ def summarize_transcript(
         transcript: The transcript text to summarize.
         model: OpenAI model to use (default: "gpt-4o-mini").
         api_key: OpenAI API key. If None, will try to get from environment.
+        cache_enabled: Reuse a summary cached on disk for the same transcript,
+            model and prompt, and cache new summaries.
+        cache_ttl: Maximum age in seconds of a reusable cached summary.
+        max_tokens: Upper bound on generated tokens (default: 1024).
+        on_delta: If given, the response is streamed and this is called with
+            each piece of text as it arrives (once with the whole text on a
+            cache hit). The full Summary is still returned at the end.
 
     Returns:
         Summary object with markdown and text fields.
 
     Raises:
         ValueError: If API key is not provided, transcript is empty,
-            or model is invalid.
+            or model or max_tokens is invalid.
         RuntimeError: If API request fails or response is invalid.
     """
-    if not api_key:
-        raise ValueError(
-            "OpenAI API key is required for summarization. "
-            "Set OPENAI_API_KEY environment variable or pass api_key parameter."
-        )
+    _validate_request(api_key, model, max_tokens)
 
     if not transcript or not transcript.strip():
         raise ValueError("transcript cannot be empty")
 
-    if not model or not model.strip():
-        raise ValueError("model cannot be empty")
+    cache_key = None
+    if cache_enabled:
+        # The system prompt is part of the key so editing it invalidates
+        # summaries produced by the old prompt
+        cache_key = make_key(
+            transcript, model, _SYSTEM_MESSAGE["content"], str(max_tokens)
+        )
+        cached = load_result("summaries", cache_key, ttl=cache_ttl)
+        if isinstance(cached, str):
+            if on_delta is not None:
+                on_delta(cached)
+            return Summary(markdown=cached, text=cached)
 
     try:
-        client = OpenAI(api_key=api_key)
+        client = _get_client(api_key)
+        request = _build_request(transcript, model, max_tokens)
+        if on_delta is None:
+            summary = _parse_response(client.chat.completions.create(**request))
+        else:
+            stream = client.chat.completions.create(**request, stream=True)
+            summary = _collect_stream(stream, on_delta)
+    except (ValueError, RuntimeError):
+        raise
+    except Exception as e:
+        raise _api_error(e) from e
 
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": """You are summarizing a verbatim transcript
-from an audio recording.
+    if cache_key is not None:
+        store_result("summaries", cache_key, summary.markdown)
+    return summary
 
-First, read the full transcript carefully.
 
-Then produce a concise, structured summary with the sections below.
+async def summarize_transcripts_async(
+    transcripts: list[str],
+    model: str = "gpt-4o-mini",
+    api_key: str | None = None,
+    max_concurrency: int = 4,
+    max_tokens: int = _DEFAULT_MAX_TOKENS,
+) -> list[Summary]:
+    """Summarize several transcripts with concurrent API requests.
 
-Use clear language.
-Avoid filler.
-Do not invent facts.
-If something is unclear, note it.
+    Requests are network-bound, so up to ``max_concurrency`` of them are kept
+    in flight at once. Rate-limit and connection errors are retried with
+    backoff by the OpenAI client itself.
 
-Output format (markdown):
+    Args:
+        transcripts: Transcript texts to summarize.
+        model: OpenAI model to use (default: "gpt-4o-mini").
+        api_key: OpenAI API key.
+        max_concurrency: Maximum number of requests in flight (default: 4).
+        max_tokens: Upper bound on generated tokens per summary.
 
-## Summary
-- 5–8 bullets capturing the core points
+    Returns:
+        One Summary per transcript, in input order.
 
-## Decisions
-- List explicit decisions made
-- If none, write "No explicit decisions recorded"
+    Raises:
+        ValueError: If API key is not provided, any transcript is empty,
+            model is invalid, or max_concurrency or max_tokens is less than 1.
+        RuntimeError: If any API request fails or returns an invalid response.
+    """
+    _validate_request(api_key, model, max_tokens)
 
-## Action Items
-- Bullet list
-- Include owner and due date if stated
-- If missing, note "owner not specified" or "no due date stated"
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1")
 
-## Open Questions
-- Items that were raised but not resolved
-- If none, write "No open questions"
+    if any(not transcript or not transcript.strip() for transcript in transcripts):
+        raise ValueError("transcript cannot be empty")
 
-## Key Quotes (optional)
-- 2–4 short quotes only if they clarify intent or tone
+    if not transcripts:
+        return []
+
+    from openai import AsyncOpenAI
+
+    # The async HTTP pool is tied to the running event loop, so the client
+    # lives for this call rather than in _CLIENT_CACHE
+    client = AsyncOpenAI(api_key=api_key)
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _summarize_one(transcript: str) -> Summary:
+        async with semaphore:
+            try:
+                response = await client.chat.completions.create(
+                    **_build_request(transcript, model, max_tokens)
+                )
+                return _parse_response(response)
+            except (ValueError, RuntimeError):
+                raise
+            except Exception as e:
+                raise _api_error(e) from e
+
+    tasks = [asyncio.ensure_future(_summarize_one(t)) for t in transcripts]
+    try:
+        return list(await asyncio.gather(*tasks))
+    except BaseException:
+        # gather does not stop the other requests when one fails; cancel and
+        # wait for them so none is still using the client when it closes
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    finally:
+        await client.close()
+
+
+def summarize_transcripts(
+    transcripts: list[str],
+    model: str = "gpt-4o-mini",
+    api_key: str | None = None,
+    max_concurrency: int = 4,
+    use_batch_api: bool = False,
+    max_tokens: int = _DEFAULT_MAX_TOKENS,
+) -> list[Summary]:
+    """Summarize several transcripts from synchronous code.
 
-Important rules:
-- Base everything strictly on the transcript
-- Do not infer beyond what was said
-- Preserve intent, not wording""",
-                },
-                {
-                    "role": "user",
-                    "content": (f"Summarize the following transcript:\n\n{transcript}"),
-                },
-            ],
+    Args:
+        transcripts: Transcript texts to summarize.
+        model: OpenAI model to use (default: "gpt-4o-mini").
+        api_key: OpenAI API key.
+        max_concurrency: Maximum number of requests in flight (default: 4).
+            Ignored when use_batch_api is set.
+        use_batch_api: Submit one OpenAI Batch API job instead of concurrent
+            requests. Batches cost half as much but may take up to 24 hours.
+        max_tokens: Upper bound on generated tokens per summary.
+
+    Returns:
+        One Summary per transcript, in input order.
+
+    Raises:
+        ValueError: If any argument is invalid.
+        RuntimeError: If any API request fails or returns an invalid response.
+    """
+    if use_batch_api:
+        return summarize_transcripts_batch(
+            transcripts, model=model, api_key=api_key, max_tokens=max_tokens
+        )
+    return asyncio.run(
+        summarize_transcripts_async(
+            transcripts,
+            model=model,
+            api_key=api_key,
+            max_concurrency=max_concurrency,
+            max_tokens=max_tokens,
         )
+    )
 
-        # Defensive access to response structure
-        if not response:
-            raise RuntimeError("Invalid API response: missing choices")
 
-        if not hasattr(response, "choices") or response.choices is None:
-            raise RuntimeError("Invalid API response: missing choices")
+def _parse_batch_output(output: str, count: int) -> list[Summary]:
+    """Turn Batch API output lines back into summaries in input order.
 
-        if len(response.choices) == 0:
-            raise RuntimeError("Invalid API response: empty choices list")
+    Args:
+        output: JSONL content of the batch output file.
+        count: Number of transcripts that were submitted.
+
+    Returns:
+        One Summary per transcript, in input order.
 
-        first_choice = response.choices[0]
-        if not first_choice or not first_choice.message:
-            raise RuntimeError("Invalid API response: missing message")
+    Raises:
+        RuntimeError: If a request failed or a result is missing.
+    """
+    results: dict[str, Summary] = {}
+    for line in output.splitlines():
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            raise RuntimeError(f"Invalid batch output line: {e}") from e
+        custom_id = record.get("custom_id")
+        response = record.get("response") or {}
+        if record.get("error") or response.get("status_code") != 200:
+            error = record.get("error") or response.get("body")
+            raise RuntimeError(f"Batch request {custom_id} failed: {error}")
+        choices = response.get("body", {}).get("choices") or []
+        if not choices or not choices[0].get("message"):
+            raise RuntimeError(f"Invalid API response for batch request {custom_id}")
+        text = choices[0]["message"].get("content") or ""
+        results[custom_id] = Summary(markdown=text, text=text)
 
-        summary_text = first_choice.message.content or ""
+    try:
+        return [results[f"t-{i}"] for i in range(count)]
+    except KeyError as e:
+        raise RuntimeError(f"Batch output is missing request {e.args[0]}") from e
 
-        return Summary(
-            markdown=summary_text,
-            text=summary_text,
+
+def _batch_error_message(errors: str, batch_id: str) -> str:
+    """Describe the first failed request in a Batch API error file.
+
+    Args:
+        errors: JSONL content of the batch error file.
+        batch_id: ID of the batch job, for when no line can be read.
+
+    Returns:
+        Error message naming the failed request and the API's error.
+    """
+    for line in errors.splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        response = record.get("response") or {}
+        error = record.get("error") or response.get("body")
+        return f"Batch request {record.get('custom_id')} failed: {error}"
+    return f"Batch job {batch_id} has failed requests"
+
+
+def summarize_transcripts_batch(
+    transcripts: list[str],
+    model: str = "gpt-4o-mini",
+    api_key: str | None = None,
+    poll_interval: float = 30.0,
+    max_tokens: int = _DEFAULT_MAX_TOKENS,
+) -> list[Summary]:
+    """Summarize several transcripts through the OpenAI Batch API.
+
+    Uploads all requests as one JSONL file, creates a batch job and polls it
+    until it finishes. Suited to offline backlogs: batches cost half as much
+    as regular requests but complete within a 24 hour window.
+
+    Args:
+        transcripts: Transcript texts to summarize.
+        model: OpenAI model to use (default: "gpt-4o-mini").
+        api_key: OpenAI API key.
+        poll_interval: Seconds to wait between status checks (default: 30).
+        max_tokens: Upper bound on generated tokens per summary.
+
+    Returns:
+        One Summary per transcript, in input order.
+
+    Raises:
+        ValueError: If API key is not provided, any transcript is empty,
+            or model or max_tokens is invalid.
+        RuntimeError: If the batch job fails or any request in it fails.
+    """
+    _validate_request(api_key, model, max_tokens)
+
+    if any(not transcript or not transcript.strip() for transcript in transcripts):
+        raise ValueError("transcript cannot be empty")
+
+    if not transcripts:
+        return []
+
+    requests = "\n".join(
+        json.dumps(
+            {
+                "custom_id": f"t-{i}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": _build_request(transcript, model, max_tokens),
+            }
         )
-    except RateLimitError as e:
-        error_msg = (
-            "OpenAI API quota exceeded. "
-            "Please check your billing and usage at https://platform.openai.com/usage. "
-            f"Error: {e}"
+        for i, transcript in enumerate(transcripts)
+    )
+
+    try:
+        client = _get_client(api_key)
+        batch_file = client.files.create(
+            file=("voice_notes_batch.jsonl", requests.encode("utf-8")),
+            purpose="batch",
         )
-        raise RuntimeError(error_msg) from e
-    except APIError as e:
-        error_msg = (
-            f"OpenAI API error: {e}. Please check your API key and account status."
+        batch = client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
         )
-        raise RuntimeError(error_msg) from e
+        while batch.status != "completed":
+            if batch.status in _BATCH_FAILED_STATES:
+                raise RuntimeError(f"Batch job {batch.id} {batch.status}")
+            time.sleep(poll_interval)
+            batch = client.batches.retrieve(batch.id)
+
+        # Failed requests are written to a separate error file, not the
+        # output file
+        if batch.error_file_id:
+            errors = client.files.content(batch.error_file_id).text
+            raise RuntimeError(_batch_error_message(errors, batch.id))
+        if not batch.output_file_id:
+            raise RuntimeError(f"Batch job {batch.id} produced no output")
+        output = client.files.content(batch.output_file_id).text
+        return _parse_batch_output(output, len(transcripts))
+    except (ValueError, RuntimeError):
+        raise
     except Exception as e:
-        if isinstance(e, (ValueError, RuntimeError)):
-            raise
-        raise RuntimeError(f"Failed to generate summary: {e}") from e
+        raise _api_error(e) from e
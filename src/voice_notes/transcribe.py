@@ -6,24 +6,35 @@ including segment extraction and JSON serialization.
 
 from __future__ import annotations
 
-import os
-
-# Set Qt to use offscreen platform BEFORE importing whisperx
-# whisperx imports pyannote.audio and torchaudio which depend on Qt
-os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
-
-import json
+import contextlib
+import functools
+import gzip
 import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
+from types import ModuleType
 from typing import Any
 
-import whisperx
+import orjson
+
+from voice_notes.cache import file_digest, load_result, make_key, store_result
 
 logger = logging.getLogger(__name__)
 
+# Compact output; numpy scalars/arrays from WhisperX and non-string keys are
+# serialized instead of rejected
+_JSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+# Segment files ending in .gz are gzip-compressed at the fastest level; JSON
+# still shrinks several-fold and writing stays cheap
+_GZIP_LEVEL = 1
+_GZIP_MAGIC = b"\x1f\x8b"
 
-@dataclass
+
+@dataclass(slots=True)
 class WhisperResult:
     """Result from Whisper transcription."""
 
@@ -32,12 +43,321 @@ class WhisperResult:
     language: str | None = None
 
 
+def _whisperx() -> ModuleType:
+    """Import whisperx on first use.
+
+    whisperx (and torch/pyannote/torchaudio behind it) takes seconds to
+    import, so importing this module, or running ``--help``, skips it.
+
+    Returns:
+        The whisperx module.
+    """
+    # Set Qt to use offscreen platform BEFORE importing whisperx
+    # whisperx imports pyannote.audio and torchaudio which depend on Qt
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    import whisperx
+
+    return whisperx
+
+
+# Sample rate Whisper models and whisperx.load_audio work at
+_SAMPLE_RATE = 16000
+
+# Decoded files kept in memory; a minute of 16 kHz float32 audio is ~4 MB
+_AUDIO_CACHE_SIZE = 4
+
+# Whisper's encoder sees at most 30 s of audio per window
+_MAX_CHUNK_SECONDS = 30
+
+# CTranslate2 weight precision used when the caller does not pick one:
+# quantized int8 on CPU, half precision on CUDA
+_DEFAULT_COMPUTE_TYPES = {"cpu": "int8", "cuda": "float16"}
+
+# Loaded Whisper models keyed by (model_name, device, compute_type, language,
+# prompt), so transcribing several files in one process only loads each
+# model once
+_MODEL_CACHE: dict[tuple[str, str, str, str | None, str | None], Any] = {}
+
+# Held while checking and filling _MODEL_CACHE, so a preload thread and the
+# transcription that follows it never load the same model twice
+_MODEL_CACHE_LOCK = threading.Lock()
+
+
+def clear_model_cache() -> None:
+    """Drop all cached Whisper models."""
+    with _MODEL_CACHE_LOCK:
+        _MODEL_CACHE.clear()
+
+
+def release_models(device: str) -> None:
+    """Drop cached Whisper models and return their GPU memory.
+
+    Clearing the cache only drops the references; on CUDA, PyTorch keeps the
+    freed blocks reserved until empty_cache() hands them back, so models
+    loaded afterwards (alignment, diarization) could not use the space.
+
+    Args:
+        device: Device the models were loaded on ("cpu", "cuda", "cuda:N").
+    """
+    with _MODEL_CACHE_LOCK:
+        _MODEL_CACHE.clear()
+    if device.startswith("cuda"):
+        import torch
+
+        torch.cuda.empty_cache()
+
+
+def _load_model(
+    model_name: str,
+    device: str,
+    compute_type: str,
+    language: str | None,
+    prompt: str | None,
+) -> Any:
+    """Load a WhisperX model, reusing a previously loaded one when possible.
+
+    Args:
+        model_name: Whisper model name.
+        device: Device to use ("cpu" or "cuda").
+        compute_type: CTranslate2 compute type (e.g., "int8", "float16").
+        language: Optional language code the model is pinned to.
+        prompt: Optional initial prompt baked into the ASR options.
+
+    Returns:
+        A WhisperX ASR pipeline.
+    """
+    key = (model_name, device, compute_type, language, prompt)
+    with _MODEL_CACHE_LOCK:
+        model = _MODEL_CACHE.get(key)
+        if model is None:
+            # Prepare ASR options if prompt is provided
+            asr_options: dict[str, Any] = {}
+            if prompt:
+                asr_options["initial_prompt"] = prompt
+
+            model = _whisperx().load_model(
+                model_name,
+                device=device,
+                compute_type=compute_type,
+                language=language,
+                asr_options=asr_options if asr_options else None,
+            )
+            _MODEL_CACHE[key] = model
+    return model
+
+
+def _preload(
+    model_name: str,
+    device: str,
+    compute_type: str,
+    language: str | None,
+    prompt: str | None,
+) -> None:
+    """Load a model into the cache, logging instead of raising on failure."""
+    try:
+        _load_model(model_name, device, compute_type, language, prompt)
+    except Exception as e:
+        # transcribe_file loads (and reports) the model itself if this failed
+        logger.warning(f"Preloading Whisper model {model_name} failed: {e}")
+
+
+def preload_model(
+    model_name: str,
+    device: str,
+    language: str | None = None,
+    prompt: str | None = None,
+    compute_type: str | None = None,
+) -> threading.Thread:
+    """Start loading a Whisper model in a background thread.
+
+    Importing whisperx and loading the weights takes several seconds; doing it
+    while the caller decodes audio or sets up output directories hides that
+    latency. A later transcribe_file call with the same options waits for the
+    load to finish and then reuses the model.
+
+    Args:
+        model_name: Whisper model name.
+        device: Device to use ("cpu" or "cuda").
+        language: Optional language code, as passed to transcribe_file.
+        prompt: Optional initial prompt, as passed to transcribe_file.
+        compute_type: CTranslate2 compute type (default: int8 on CPU,
+            float16 on CUDA).
+
+    Returns:
+        The started (daemon) thread.
+    """
+    compute_type = compute_type or _DEFAULT_COMPUTE_TYPES[device]
+    thread = threading.Thread(
+        target=_preload,
+        args=(model_name, device, compute_type, language, prompt),
+        name="voice-notes-preload",
+        daemon=True,
+    )
+    thread.start()
+    return thread
+
+
+def _resample(samples: Any, rate: int) -> Any:
+    """Resample mono samples to 16 kHz in-process.
+
+    Args:
+        samples: 1-D float32 numpy array.
+        rate: Sample rate of samples.
+
+    Returns:
+        1-D float32 numpy array at 16 kHz.
+    """
+    import torch
+    import torchaudio
+
+    resampled = torchaudio.functional.resample(
+        torch.from_numpy(samples), rate, _SAMPLE_RATE
+    )
+    return resampled.numpy()
+
+
+def _read_native_audio(audio_path: Path) -> Any | None:
+    """Read a file libsndfile understands without going through ffmpeg.
+
+    16 kHz mono files are returned as read; other sample rates and channel
+    layouts are downmixed and resampled in-process.
+
+    Args:
+        audio_path: Path to the audio/video file.
+
+    Returns:
+        1-D float32 numpy array at 16 kHz, or None if the file is not a
+        format libsndfile can read (video, mp3 on old libsndfile, ...).
+    """
+    import soundfile
+
+    try:
+        info = soundfile.info(str(audio_path))
+        if info.samplerate == _SAMPLE_RATE and info.channels == 1:
+            audio, _ = soundfile.read(str(audio_path), dtype="float32")
+            return audio
+        audio, rate = soundfile.read(str(audio_path), dtype="float32", always_2d=True)
+    except (RuntimeError, OSError):
+        return None
+
+    audio = audio.mean(axis=1) if info.channels > 1 else audio[:, 0]
+    if rate != _SAMPLE_RATE:
+        audio = _resample(audio, rate)
+    return audio
+
+
+@functools.lru_cache(maxsize=_AUDIO_CACHE_SIZE)
+def _decode_audio(path: str, mtime_ns: int, size: int) -> Any:
+    """Decode a file; cached per path, modification time and size."""
+    audio = _read_native_audio(Path(path))
+    if audio is None:
+        audio = _whisperx().load_audio(path)
+    return audio
+
+
+def clear_audio_cache() -> None:
+    """Drop all cached decoded audio."""
+    _decode_audio.cache_clear()
+
+
+def load_audio(audio_path: Path) -> Any:
+    """Decode an audio/video file to 16 kHz mono float32 samples.
+
+    Formats libsndfile reads (WAV, FLAC, Ogg, ...) are decoded in-process;
+    anything else is resampled by whisperx through an ffmpeg subprocess.
+    The last few decodes are kept in memory, so alignment and diarization
+    of the same unchanged file decode it once. The returned array is shared
+    between callers and must not be modified in place.
+
+    Args:
+        audio_path: Path to the audio/video file.
+
+    Returns:
+        1-D numpy array of samples.
+    """
+    stat = os.stat(audio_path)
+    return _decode_audio(str(audio_path), stat.st_mtime_ns, stat.st_size)
+
+
+def _load_cached_transcript(key: str, ttl: float | None) -> WhisperResult | None:
+    """Load a transcription result from the on-disk cache.
+
+    Args:
+        key: Cache key for the audio and transcription options.
+        ttl: Maximum entry age in seconds, or None for no limit.
+
+    Returns:
+        The cached WhisperResult, or None on a miss or malformed entry.
+    """
+    cached = load_result("transcripts", key, ttl=ttl)
+    if not isinstance(cached, dict):
+        return None
+    text = cached.get("text")
+    segments = cached.get("segments")
+    if not isinstance(text, str) or not isinstance(segments, list):
+        return None
+    return WhisperResult(text=text, segments=segments, language=cached.get("language"))
+
+
+def _log_result_structure(result: Any) -> None:
+    """Log the shape of a WhisperX transcription result at debug level.
+
+    Args:
+        result: Value returned by the ASR pipeline's transcribe().
+    """
+    logger.debug(f"Result type: {type(result)}")
+    if isinstance(result, dict):
+        logger.debug(f"Result keys: {list(result.keys())}")
+        if "segments" in result:
+            logger.debug(
+                f"Segments type: {type(result['segments'])}, "
+                f"length: {len(result.get('segments', []))}"
+            )
+        if "text" in result:
+            logger.debug(f"Text available: {bool(result.get('text'))}")
+    else:
+        logger.debug(f"Result attributes: {dir(result)}")
+        if hasattr(result, "segments"):
+            logger.debug(
+                f"Segments type: {type(result.segments)}, "
+                f"length: {len(getattr(result, 'segments', []))}"
+            )
+
+
+def _segment_to_dict(seg: Any) -> dict[str, Any]:
+    """Convert a segment object to a dict with defensive attribute access.
+
+    Args:
+        seg: Segment object exposing text/start/end (and optionally words).
+
+    Returns:
+        Segment dictionary.
+    """
+    seg_dict = {
+        "text": getattr(seg, "text", ""),
+        "start": getattr(seg, "start", 0.0),
+        "end": getattr(seg, "end", 0.0),
+    }
+    # Add any other attributes
+    words = getattr(seg, "words", None)
+    if words:
+        seg_dict["words"] = words
+    return seg_dict
+
+
 def transcribe_file(
     audio_path: Path,
     model_name: str,
     device: str,
     language: str | None = None,
     prompt: str | None = None,
+    compute_type: str | None = None,
+    cache_enabled: bool = False,
+    cache_ttl: float | None = None,
+    audio: Any = None,
+    chunk_size: int = _MAX_CHUNK_SECONDS,
+    batch_size: int = 8,
+    audio_digest: str | None = None,
 ) -> WhisperResult:
     """Transcribe an audio file using WhisperX.
 
@@ -47,13 +367,25 @@ def transcribe_file(
         device: Device to use ("cpu" or "cuda").
         language: Optional language code (e.g., "en"). If None, will auto-detect.
         prompt: Optional initial prompt for Whisper.
+        compute_type: Optional CTranslate2 compute type. Defaults to "int8"
+            on CPU and "float16" on CUDA.
+        cache_enabled: Reuse a result cached on disk for the same audio
+            content and options, and cache new results.
+        cache_ttl: Maximum age in seconds of a reusable cached result.
+        audio: Samples from load_audio. Decoded from audio_path if None.
+        chunk_size: Longest window, in seconds, that voice activity detection
+            may merge speech into before each window is transcribed (1-30).
+        batch_size: Number of windows run through the model per forward pass
+            (default: 8). Without it WhisperX decodes one window at a time.
+        audio_digest: cache.file_digest of audio_path, for callers that have
+            already hashed the file. Computed when caching if None.
 
     Returns:
         WhisperResult with text, segments, and detected language.
 
     Raises:
         FileNotFoundError: If audio file does not exist.
-        ValueError: If model_name or device is invalid.
+        ValueError: If model_name, device, chunk_size or batch_size is invalid.
     """
     if not audio_path.exists():
         raise FileNotFoundError(f"Audio file not found: {audio_path}")
@@ -64,44 +396,48 @@ def transcribe_file(
     if device not in ("cpu", "cuda"):
         raise ValueError(f"Invalid device: {device}. Must be 'cpu' or 'cuda'")
 
-    # Prepare ASR options if prompt is provided
-    asr_options: dict[str, Any] = {}
-    if prompt:
-        asr_options["initial_prompt"] = prompt
-
-    # Load model
-    model = whisperx.load_model(
-        model_name,
-        device=device,
-        compute_type="float32",
-        language=language,
-        asr_options=asr_options if asr_options else None,
-    )
-
-    # Load audio
-    audio = whisperx.load_audio(str(audio_path))
+    if not 1 <= chunk_size <= _MAX_CHUNK_SECONDS:
+        raise ValueError(
+            f"Invalid chunk_size: {chunk_size}. Must be 1-{_MAX_CHUNK_SECONDS} seconds"
+        )
+
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+
+    compute_type = compute_type or _DEFAULT_COMPUTE_TYPES[device]
+
+    key_parts: tuple[str, ...] = ()
+    cache_key = None
+    if cache_enabled:
+        key_parts = (
+            audio_digest or file_digest(audio_path),
+            model_name,
+            compute_type,
+            prompt or "",
+            str(chunk_size),
+        )
+        cache_key = make_key(*key_parts, language or "")
+        cached = _load_cached_transcript(cache_key, cache_ttl)
+        if cached is not None:
+            logger.debug(f"Using cached transcript for {audio_path}")
+            return cached
+
+    model = _load_model(model_name, device, compute_type, language, prompt)
+
+    if audio is None:
+        audio = load_audio(audio_path)
 
     # Transcribe
-    result = model.transcribe(audio, language=language)
+    # WhisperX splits the buffer at voice activity into windows of at most
+    # chunk_size seconds and runs batch_size of them per forward pass
+    result = model.transcribe(
+        audio, language=language, chunk_size=chunk_size, batch_size=batch_size
+    )
 
     # Debug: Log result structure to understand what we're working with
-    logger.debug(f"Result type: {type(result)}")
-    if isinstance(result, dict):
-        logger.debug(f"Result keys: {list(result.keys())}")
-        if "segments" in result:
-            logger.debug(
-                f"Segments type: {type(result['segments'])}, "
-                f"length: {len(result.get('segments', []))}"
-            )
-        if "text" in result:
-            logger.debug(f"Text available: {bool(result.get('text'))}")
-    else:
-        logger.debug(f"Result attributes: {dir(result)}")
-        if hasattr(result, "segments"):
-            logger.debug(
-                f"Segments type: {type(result.segments)}, "
-                f"length: {len(getattr(result, 'segments', []))}"
-            )
+    # (guarded because the f-strings, dir() included, are built eagerly)
+    if logger.isEnabledFor(logging.DEBUG):
+        _log_result_structure(result)
 
     # WhisperX can return either a dict or an object
     # Handle both cases with defensive checks
@@ -124,33 +460,15 @@ def transcribe_file(
             except (TypeError, ValueError):
                 segments_raw = []
 
-    # Convert segments to list of dicts for consistency
-    segments: list[dict[str, Any]] = []
-    text_parts: list[str] = []
-    for seg in segments_raw:
-        seg_dict: dict[str, Any]
-        if isinstance(seg, dict):
-            seg_dict = seg
-        else:
-            # Convert object to dict with defensive access
-            seg_dict = {
-                "text": getattr(seg, "text", ""),
-                "start": getattr(seg, "start", 0.0),
-                "end": getattr(seg, "end", 0.0),
-            }
-            # Add any other attributes
-            if hasattr(seg, "words"):
-                words = getattr(seg, "words", [])
-                if words:
-                    seg_dict["words"] = words
-        segments.append(seg_dict)
-
-        # Extract text with defensive access
-        seg_text = seg_dict.get("text", "")
-        if seg_text and isinstance(seg_text, str):
-            seg_text = seg_text.strip()
-            if seg_text:
-                text_parts.append(seg_text)
+    # WhisperX returns plain dicts, so the common case needs no conversion
+    segments: list[dict[str, Any]]
+    if all(isinstance(seg, dict) for seg in segments_raw):
+        segments = segments_raw
+    else:
+        segments = [
+            seg if isinstance(seg, dict) else _segment_to_dict(seg)
+            for seg in segments_raw
+        ]
 
     # Extract text - try direct access first, then fallback to segments
     text = ""
@@ -164,8 +482,15 @@ def transcribe_file(
             text = str(text_value).strip()
 
     # Fallback: extract from segments if direct text not available
-    if not text and text_parts:
-        text = " ".join(text_parts).strip()
+    if not text:
+        text = " ".join(
+            [
+                seg_text
+                for seg in segments
+                if isinstance(seg_text := seg.get("text"), str)
+                and (seg_text := seg_text.strip())
+            ]
+        )
 
     logger.debug(f"Extracted text length: {len(text)}, segments count: {len(segments)}")
 
@@ -178,6 +503,15 @@ def transcribe_file(
     else:
         detected_language = language  # Fallback to provided language
 
+    if cache_key is not None:
+        entry = {"text": text, "segments": segments, "language": detected_language}
+        store_result("transcripts", cache_key, entry)
+        # WhisperX transcribes the whole file in the language it detects, so
+        # a rerun that passes that language (e.g. the CLI's cached one) gets
+        # the same result
+        if not language and detected_language:
+            store_result("transcripts", make_key(*key_parts, detected_language), entry)
+
     return WhisperResult(
         text=text,
         segments=segments,
@@ -185,12 +519,98 @@ def transcribe_file(
     )
 
 
-def save_segments_json(segments: list[dict[str, Any]], path: Path) -> None:
-    """Save segments to a JSON file.
+def _to_columns(segments: list[dict[str, Any]]) -> dict[str, list[Any]]:
+    """Transpose a list of segment dicts into a dict of equal-length columns.
+
+    Keys missing from a segment are filled with None so every column lines
+    up with the segment index.
+    """
+    keys = list(dict.fromkeys(key for segment in segments for key in segment))
+    return {key: [segment.get(key) for segment in segments] for key in keys}
+
+
+def transcribe_files(
+    audio_paths: list[Path],
+    model_name: str,
+    device: str,
+    language: str | None = None,
+    prompt: str | None = None,
+    compute_type: str | None = None,
+    chunk_size: int = _MAX_CHUNK_SECONDS,
+    batch_size: int = 8,
+) -> list[WhisperResult]:
+    """Transcribe several audio files with one Whisper model.
+
+    WhisperX transcribes one recording per call, batching that recording's
+    windows (batch_size). Across files the model is loaded once, and the next
+    file is decoded in a background thread while the current one runs
+    through the model, so decoding never leaves the model idle.
+
+    Args:
+        audio_paths: Paths to the audio/video files.
+        model_name: Whisper model name (e.g., "small", "base", "medium").
+        device: Device to use ("cpu" or "cuda").
+        language: Optional language code shared by all files. If None, it is
+            detected per file.
+        prompt: Optional initial prompt for Whisper.
+        compute_type: Optional CTranslate2 compute type (see transcribe_file).
+        chunk_size: Longest VAD-merged window in seconds (1-30).
+        batch_size: Number of windows run through the model per forward pass.
+
+    Returns:
+        One WhisperResult per file, in input order.
+
+    Raises:
+        FileNotFoundError: If any audio file does not exist.
+        ValueError: If model_name, device, chunk_size or batch_size is invalid.
+    """
+    # Fail before any decoding or model loading starts
+    for audio_path in audio_paths:
+        if not audio_path.exists():
+            raise FileNotFoundError(f"Audio file not found: {audio_path}")
+
+    if not audio_paths:
+        return []
+
+    results: list[WhisperResult] = []
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        decoding = pool.submit(load_audio, audio_paths[0])
+        for index, audio_path in enumerate(audio_paths):
+            audio = decoding.result()
+            if index + 1 < len(audio_paths):
+                decoding = pool.submit(load_audio, audio_paths[index + 1])
+            results.append(
+                transcribe_file(
+                    audio_path=audio_path,
+                    model_name=model_name,
+                    device=device,
+                    language=language,
+                    prompt=prompt,
+                    compute_type=compute_type,
+                    audio=audio,
+                    chunk_size=chunk_size,
+                    batch_size=batch_size,
+                )
+            )
+    return results
+
+
+def save_segments_json(
+    segments: list[dict[str, Any]],
+    path: Path,
+    *,
+    columnar: bool = False,
+    atomic: bool = False,
+) -> None:
+    """Save segments to a compact JSON file.
 
     Args:
         segments: List of segment dictionaries.
-        path: Path to the output JSON file.
+        path: Path to the output JSON file. A ".gz" suffix gzip-compresses it.
+        columnar: Write one array per field (``{"start": [...], ...}``)
+            instead of one object per segment.
+        atomic: Write to a temporary file and rename it over path, so an
+            interrupted run never leaves a truncated file behind.
 
     Raises:
         OSError: If file cannot be written.
@@ -200,9 +620,65 @@ def save_segments_json(segments: list[dict[str, Any]], path: Path) -> None:
         segments = []  # Ensure we have a valid list
 
     try:
-        json_content = json.dumps(segments, indent=2, ensure_ascii=False)
-        path.write_text(json_content, encoding="utf-8")
+        data = _to_columns(segments) if columnar else segments
+        encoded = orjson.dumps(data, option=_JSON_OPTIONS)
+        if path.suffix == ".gz":
+            encoded = gzip.compress(encoded, compresslevel=_GZIP_LEVEL)
+        if atomic:
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            try:
+                tmp_path.write_bytes(encoded)
+                os.replace(tmp_path, path)
+            except OSError:
+                with contextlib.suppress(OSError):
+                    tmp_path.unlink()
+                raise
+        else:
+            path.write_bytes(encoded)
     except (TypeError, ValueError) as e:
         raise TypeError(f"Failed to serialize segments to JSON: {e}") from e
     except OSError as e:
         raise OSError(f"Failed to write JSON file {path}: {e}") from e
+
+
+def load_segments_json(path: Path) -> list[dict[str, Any]]:
+    """Load segments written by save_segments_json.
+
+    Accepts both the list-of-objects layout and the columnar layout, plain or
+    gzip-compressed. Columnar entries that are None are dropped, mirroring
+    keys absent when saved.
+
+    Args:
+        path: Path to the JSON file.
+
+    Returns:
+        List of segment dictionaries.
+
+    Raises:
+        OSError: If file cannot be read.
+        ValueError: If the file is not valid segments JSON.
+    """
+    raw = path.read_bytes()
+    try:
+        if raw.startswith(_GZIP_MAGIC):
+            raw = gzip.decompress(raw)
+        data = orjson.loads(raw)
+    except (gzip.BadGzipFile, EOFError, orjson.JSONDecodeError) as e:
+        raise ValueError(f"Invalid segments JSON in {path}: {e}") from e
+
+    if isinstance(data, list):
+        return data
+    if not isinstance(data, dict) or not all(
+        isinstance(column, list) for column in data.values()
+    ):
+        raise ValueError(f"Invalid segments JSON in {path}: unexpected layout")
+
+    lengths = {len(column) for column in data.values()}
+    if len(lengths) > 1:
+        raise ValueError(f"Invalid segments JSON in {path}: ragged columns")
+
+    keys = list(data)
+    return [
+        {key: value for key, value in zip(keys, row) if value is not None}
+        for row in zip(*data.values())
+    ]
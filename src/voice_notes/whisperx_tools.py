@@ -2,21 +2,30 @@
 
 This module provides functions for aligning transcription segments with
 word-level timestamps and performing speaker diarization using WhisperX.
+
+Devices may name a GPU ("cuda:1"), so on multi-GPU hosts alignment and
+diarization can run side by side on different cards, e.g. from two threads
+calling align_transcript(..., "cuda:0") and diarize_audio(..., "cuda:1").
 """
 
 from __future__ import annotations
 
+import bisect
+import contextlib
+import functools
+import hashlib
+import itertools
 import os
+import re
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from types import ModuleType
+from typing import Any, TypeVar
 
-# Set Qt to use offscreen platform BEFORE importing whisperx
-# whisperx imports pyannote.audio and torchaudio which depend on Qt
-os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
-
-from dataclasses import dataclass  # noqa: E402
-from pathlib import Path  # noqa: E402
-from typing import Any  # noqa: E402
-
-import whisperx  # noqa: E402
+from voice_notes.transcribe import load_audio
 
 
 @dataclass(frozen=True)
@@ -27,11 +36,210 @@ class WhisperXResult:
     diarized_segments: list[dict[str, Any]] | None
 
 
+def _whisperx() -> ModuleType:
+    """Import whisperx on first use.
+
+    whisperx pulls in torch, pyannote.audio and torchaudio, which take
+    seconds to import; assign_speakers and the CLI's other paths never need
+    them.
+
+    Returns:
+        The whisperx module.
+    """
+    # Set Qt to use offscreen platform BEFORE importing whisperx
+    # whisperx imports pyannote.audio and torchaudio which depend on Qt
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    import whisperx
+
+    return whisperx
+
+
+# "cpu", "cuda", or "cuda:N" to pin a stage to one GPU of several
+_DEVICE_PATTERN = re.compile(r"cpu|cuda(?::\d+)?")
+
+
+def _check_device(device: str) -> None:
+    """Reject device strings torch would not accept for this module.
+
+    Args:
+        device: Device string.
+
+    Raises:
+        ValueError: If device is not "cpu", "cuda" or "cuda:N".
+    """
+    if not _DEVICE_PATTERN.fullmatch(device):
+        raise ValueError(f"Invalid device: {device}. Must be 'cpu', 'cuda' or 'cuda:N'")
+
+
+# Alignment models keyed by (language, device) and diarization pipelines keyed
+# by (device, token digest); loading either reads weights from disk, so a
+# multi-file run loads each one once
+_ALIGN_MODEL_CACHE: dict[tuple[str, str], tuple[Any, Any]] = {}
+_DIARIZE_PIPELINE_CACHE: dict[tuple[str, str], Any] = {}
+
+# Rate of the samples load_audio returns
+_SAMPLE_RATE = 16000
+
+# Label given to every word when the caller says there is one speaker
+_SINGLE_SPEAKER = "SPEAKER_00"
+
+# Held while checking and filling one cache, so concurrent callers never load
+# the same model twice; one lock per cache lets an alignment model and a
+# diarization pipeline load at the same time
+_ALIGN_MODEL_LOCK = threading.Lock()
+_DIARIZE_PIPELINE_LOCK = threading.Lock()
+
+
+def clear_model_cache() -> None:
+    """Drop all cached alignment models and diarization pipelines."""
+    with _ALIGN_MODEL_LOCK:
+        _ALIGN_MODEL_CACHE.clear()
+    with _DIARIZE_PIPELINE_LOCK:
+        _DIARIZE_PIPELINE_CACHE.clear()
+
+
+@functools.cache
+def _alignable_languages() -> frozenset[str]:
+    """Get the language codes whisperx has a default alignment model for.
+
+    Checking up front rejects an unsupported language before any model load
+    or audio decode starts.
+
+    Returns:
+        Supported language codes.
+    """
+    _whisperx()
+    from whisperx.alignment import DEFAULT_ALIGN_MODELS_HF, DEFAULT_ALIGN_MODELS_TORCH
+
+    return frozenset(DEFAULT_ALIGN_MODELS_TORCH) | frozenset(DEFAULT_ALIGN_MODELS_HF)
+
+
+def _load_align_model(language: str, device: str) -> tuple[Any, Any]:
+    """Load a WhisperX alignment model, reusing a cached one when possible.
+
+    Args:
+        language: Language code the alignment model is for.
+        device: Device to use ("cpu", "cuda" or "cuda:N").
+
+    Returns:
+        The alignment model and its metadata.
+    """
+    key = (language, device)
+    with _ALIGN_MODEL_LOCK:
+        cached = _ALIGN_MODEL_CACHE.get(key)
+        if cached is None:
+            align_model, metadata = _whisperx().load_align_model(
+                language_code=language, device=device
+            )
+            if device.startswith("cuda"):
+                # Alignment is a single forward pass; fp16 weights halve its
+                # memory traffic without measurably moving the timestamps
+                align_model = align_model.half()
+            cached = (align_model, metadata)
+            _ALIGN_MODEL_CACHE[key] = cached
+    return cached
+
+
+def _side_stream(device: str) -> contextlib.AbstractContextManager[Any]:
+    """Get a context that queues CUDA work on a new stream.
+
+    Kernels issued from different threads share the default stream and run
+    one after another; a separate stream lets diarization overlap with
+    alignment running on the default one.
+
+    Args:
+        device: Device to use ("cpu", "cuda" or "cuda:N").
+
+    Returns:
+        A torch.cuda.stream context on CUDA, a no-op context otherwise.
+    """
+    if not device.startswith("cuda"):
+        return contextlib.nullcontext()
+
+    import torch
+
+    return torch.cuda.stream(torch.cuda.Stream(device=device))
+
+
+_Model = TypeVar("_Model")
+
+
+def _load_alongside_audio(
+    load: Callable[[], _Model], audio_path: Path, audio: Any
+) -> tuple[_Model, Any]:
+    """Run a model load while the audio is decoded on a worker thread.
+
+    Loading weights and ffmpeg decoding are independent and each take
+    seconds, so only the slower of the two stays on the critical path.
+
+    Args:
+        load: Loads (or fetches the cached) model.
+        audio_path: Audio/video file path.
+        audio: Already decoded samples, or None to decode audio_path.
+
+    Returns:
+        The loaded model and the decoded samples.
+    """
+    if audio is not None:
+        return load(), audio
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        decoding = pool.submit(load_audio, audio_path)
+        model = load()
+        return model, decoding.result()
+
+
+def _half_precision(device: str) -> contextlib.AbstractContextManager[Any]:
+    """Get a context that runs CUDA work in float16 autocast.
+
+    Matmuls and convolutions run on tensor cores in float16 while autocast
+    keeps reductions such as softmax and pooling in float32. It also casts
+    the float32 waveform whisperx feeds in to match the half-precision
+    alignment model.
+
+    Args:
+        device: Device to use ("cpu", "cuda" or "cuda:N").
+
+    Returns:
+        Autocast on CUDA, a no-op context otherwise.
+    """
+    if not device.startswith("cuda"):
+        return contextlib.nullcontext()
+
+    import torch
+
+    return torch.autocast("cuda", dtype=torch.float16)
+
+
+def _load_diarize_pipeline(hf_token: str, device: str) -> Any:
+    """Load the diarization pipeline, reusing a cached one when possible.
+
+    Args:
+        hf_token: HuggingFace authentication token.
+        device: Device to use ("cpu", "cuda" or "cuda:N").
+
+    Returns:
+        A WhisperX diarization pipeline.
+    """
+    # Key on a digest so the token itself is not kept around as a dict key
+    key = (device, hashlib.sha256(hf_token.encode("utf-8")).hexdigest())
+    with _DIARIZE_PIPELINE_LOCK:
+        pipeline = _DIARIZE_PIPELINE_CACHE.get(key)
+        if pipeline is None:
+            pipeline = _whisperx().DiarizationPipeline(
+                use_auth_token=hf_token, device=device
+            )
+            _DIARIZE_PIPELINE_CACHE[key] = pipeline
+    return pipeline
+
+
 def align_transcript(
     audio_path: Path,
     segments: list[dict[str, Any]],
     language: str | None,
     device: str,
+    *,
+    audio: Any = None,
 ) -> list[dict[str, Any]]:
     """Align Whisper segments to get more precise timestamps.
 
@@ -39,14 +247,17 @@ def align_transcript(
         audio_path: Audio/video file path.
         segments: Whisper segments.
         language: Detected or forced language code.
-        device: "cpu" or "cuda".
+        device: "cpu", "cuda" or "cuda:N".
+        audio: Decoded 16 kHz samples. Decoded from audio_path, while the
+            alignment model loads, if None.
 
     Returns:
         Aligned segments.
 
     Raises:
         FileNotFoundError: If audio file does not exist.
-        ValueError: If language is not provided or device is invalid.
+        ValueError: If language is missing or has no alignment model, or
+            device is invalid.
         RuntimeError: If alignment fails.
     """
     if not audio_path or not audio_path.exists():
@@ -55,27 +266,34 @@ def align_transcript(
     if not language or not language.strip():
         raise ValueError("Language is required for alignment (pass detected language).")
 
-    if device not in ("cpu", "cuda"):
-        raise ValueError(f"Invalid device: {device}. Must be 'cpu' or 'cuda'")
+    _check_device(device)
 
     if not segments:
         return []
 
+    # Already aligned (e.g., a saved aligned_segments.json fed back in);
+    # skip loading the alignment model and decoding the audio
+    if all("words" in seg for seg in segments):
+        return list(segments)
+
+    if language not in _alignable_languages():
+        raise ValueError(f"No alignment model for language: {language}")
+
     try:
-        align_model, metadata = whisperx.load_align_model(
-            language_code=language, device=device
-        )
-        audio = whisperx.load_audio(str(audio_path))
-
-        aligned = whisperx.align(
-            segments,
-            align_model,
-            metadata,
-            audio,
-            device,
-            return_char_alignments=False,
+        (align_model, metadata), audio = _load_alongside_audio(
+            lambda: _load_align_model(language, device), audio_path, audio
         )
 
+        with _half_precision(device):
+            aligned = _whisperx().align(
+                segments,
+                align_model,
+                metadata,
+                audio,
+                device,
+                return_char_alignments=False,
+            )
+
         if not aligned or not isinstance(aligned, dict):
             raise RuntimeError("Alignment returned invalid result")
 
@@ -86,24 +304,111 @@ def align_transcript(
         raise RuntimeError(f"Alignment failed: {e}") from e
 
 
+def _prefetch_audio(audio_path: Path) -> Any:
+    """Decode a file ahead of its alignment.
+
+    Args:
+        audio_path: Audio/video file path.
+
+    Returns:
+        Decoded 16 kHz samples, or None if decoding failed; align_transcript
+        then decodes the file itself and reports the error.
+    """
+    try:
+        return load_audio(audio_path)
+    except Exception:
+        return None
+
+
+def align_transcripts_batch(
+    items: list[tuple[Path, list[dict[str, Any]], str | None]],
+    device: str,
+) -> list[list[dict[str, Any]]]:
+    """Align the transcripts of several files.
+
+    Files are processed grouped by language, so each alignment model is
+    loaded once and stays in use for every file that needs it. The next
+    file is decoded in the background while the current one is aligned.
+
+    Args:
+        items: (audio_path, segments, language) for each file.
+        device: "cpu", "cuda" or "cuda:N".
+
+    Returns:
+        Aligned segments for each item, in the order given.
+
+    Raises:
+        FileNotFoundError: If an audio file does not exist.
+        ValueError: If a language is missing or device is invalid.
+        RuntimeError: If alignment fails.
+    """
+    results: list[list[dict[str, Any]]] = [[] for _ in items]
+    order = sorted(range(len(items)), key=lambda i: items[i][2] or "")
+    if not order:
+        return results
+
+    # Decode the next file on a worker thread while the current one aligns,
+    # so the device is not left idle during ffmpeg decoding
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        pending = pool.submit(_prefetch_audio, items[order[0]][0])
+        for position, i in enumerate(order):
+            audio = pending.result()
+            if position + 1 < len(order):
+                pending = pool.submit(_prefetch_audio, items[order[position + 1]][0])
+            audio_path, segments, language = items[i]
+            results[i] = align_transcript(
+                audio_path, segments, language, device, audio=audio
+            )
+    return results
+
+
+def _audio_duration(audio_path: Path, audio: Any) -> float:
+    """Get the length of a recording in seconds.
+
+    Args:
+        audio_path: Audio/video file path.
+        audio: Decoded 16 kHz samples, if available.
+
+    Returns:
+        Duration in seconds, read from the file header when possible.
+    """
+    if audio is None:
+        import soundfile
+
+        try:
+            return float(soundfile.info(str(audio_path)).duration)
+        except (RuntimeError, OSError):
+            audio = load_audio(audio_path)
+    return len(audio) / _SAMPLE_RATE
+
+
 def diarize_audio(
     audio_path: Path,
     device: str,
     hf_token: str,
     min_speakers: int | None,
     max_speakers: int | None,
+    *,
+    audio: Any = None,
+    half_precision: bool = True,
 ) -> Any:
     """Run diarization to identify speaker turns.
 
     Args:
         audio_path: Audio/video file path.
-        device: Device to use ("cpu" or "cuda").
+        device: Device to use ("cpu", "cuda" or "cuda:N").
         hf_token: HuggingFace authentication token.
         min_speakers: Minimum number of speakers (optional).
         max_speakers: Maximum number of speakers (optional).
+        audio: Decoded 16 kHz samples. Decoded from audio_path, while the
+            pipeline loads, if None.
+        half_precision: On CUDA, run the segmentation and speaker-embedding
+            models under float16 autocast. Ignored on CPU.
 
     Returns:
-        A diarization result object compatible with whisperx.assign_word_speakers.
+        A DataFrame of speaker turns ("start", "end", "speaker") for
+        assign_speakers; a dict of the same columns holding one turn over
+        the whole recording when min_speakers == max_speakers == 1.
 
     Raises:
         FileNotFoundError: If audio file does not exist.
@@ -116,8 +421,7 @@ def diarize_audio(
     if not hf_token or not hf_token.strip():
         raise ValueError("HUGGINGFACE_TOKEN is required for diarization.")
 
-    if device not in ("cpu", "cuda"):
-        raise ValueError(f"Invalid device: {device}. Must be 'cpu' or 'cuda'")
+    _check_device(device)
 
     if min_speakers is not None and min_speakers < 1:
         raise ValueError("min_speakers must be at least 1")
@@ -132,16 +436,24 @@ def diarize_audio(
     ):
         raise ValueError("min_speakers cannot be greater than max_speakers")
 
+    if min_speakers == max_speakers == 1:
+        # Nothing to cluster; skip the segmentation and embedding models
+        duration = _audio_duration(audio_path, audio)
+        return {"start": [0.0], "end": [duration], "speaker": [_SINGLE_SPEAKER]}
+
     try:
-        diarize_model = whisperx.DiarizationPipeline(
-            use_auth_token=hf_token,
-            device=device,
+        diarize_model, audio = _load_alongside_audio(
+            lambda: _load_diarize_pipeline(hf_token, device), audio_path, audio
         )
-        result = diarize_model(
-            str(audio_path),
-            min_speakers=min_speakers,
-            max_speakers=max_speakers,
+        precision = (
+            _half_precision(device) if half_precision else contextlib.nullcontext()
         )
+        with _side_stream(device), precision:
+            result = diarize_model(
+                audio,
+                min_speakers=min_speakers,
+                max_speakers=max_speakers,
+            )
         return result
     except AttributeError as e:
         # This occurs when Pipeline.from_pretrained() fails and returns None
@@ -181,15 +493,99 @@ def diarize_audio(
         raise RuntimeError(f"Diarization failed: {e}") from e
 
 
+def _speaker_turns(diarization_result: Any) -> list[tuple[float, float, str]]:
+    """Extract speaker turns from a diarization result.
+
+    Args:
+        diarization_result: DataFrame-like result with "start", "end" and
+            "speaker" columns, as returned by whisperx.DiarizationPipeline.
+
+    Returns:
+        (start, end, speaker) tuples sorted by start time.
+    """
+    return sorted(
+        zip(
+            diarization_result["start"],
+            diarization_result["end"],
+            diarization_result["speaker"],
+            strict=True,
+        )
+    )
+
+
+def _assign_turn_speakers(
+    turns: list[tuple[float, float, str]],
+    segments: list[dict[str, Any]],
+) -> list[dict[str, Any]]:
+    """Label segments and their words with the speaker who overlaps them most.
+
+    Each lookup bisects the turns (sorted by start) twice: once on the
+    running maximum of their end times for the first turn still running at
+    the interval's start, once on their start times for the first turn past
+    its end. It costs O(log T + k), where k is the number of turns between
+    those two, instead of a scan over all T of them. k stays small while
+    turns follow one another; a turn spanning most of the file (one long
+    monologue under the others) keeps every turn after its start in range.
+
+    Args:
+        turns: Speaker turns from _speaker_turns.
+        segments: Segments with "start" and "end" times and optional "words".
+
+    Returns:
+        Copies of the segments; segments and timed words overlapping any turn
+        get a "speaker".
+    """
+    starts = [start for start, _, _ in turns]
+    # Latest end among turns[:i + 1]; every turn before the first entry past
+    # an interval's start has ended by then
+    reach = list(itertools.accumulate((end for _, end, _ in turns), max))
+
+    def dominant_speaker(begin: float, finish: float) -> str | None:
+        lo = bisect.bisect_right(reach, begin)
+        hi = bisect.bisect_left(starts, finish)
+        overlaps: dict[str, float] = {}
+        for start, end, speaker in turns[lo:hi]:
+            overlap = min(end, finish) - max(start, begin)
+            if overlap > 0:
+                overlaps[speaker] = overlaps.get(speaker, 0.0) + overlap
+        return max(overlaps, key=overlaps.__getitem__) if overlaps else None
+
+    assigned = []
+    for seg in segments:
+        seg = dict(seg)
+        if speaker := dominant_speaker(seg["start"], seg["end"]):
+            seg["speaker"] = speaker
+        if "words" in seg:
+            words = []
+            for word in seg["words"]:
+                # Alignment leaves some tokens (digits, symbols) untimed
+                if "start" in word and "end" in word:
+                    if speaker := dominant_speaker(word["start"], word["end"]):
+                        word = {**word, "speaker": speaker}
+                words.append(word)
+            seg["words"] = words
+        assigned.append(seg)
+    return assigned
+
+
 def assign_speakers(
     diarization_result: Any,
     aligned_segments: list[dict[str, Any]],
 ) -> list[dict[str, Any]]:
     """Assign speakers to aligned segments.
 
+    Each segment, and each word with timestamps, gets the speaker whose
+    diarization turns overlap it the most. Segments without word timestamps
+    (alignment was skipped) get a segment-level speaker only.
+
+    Segments need not be sorted: the diarization turns are sorted once and
+    every lookup is a binary search over them, so the result keeps the
+    input order.
+
     Args:
         diarization_result: Result from diarization pipeline.
-        aligned_segments: Aligned segments to assign speakers to.
+        aligned_segments: Aligned (or plain Whisper) segments to assign
+            speakers to.
 
     Returns:
         Segments annotated with speaker labels where possible.
@@ -205,14 +601,9 @@ def assign_speakers(
         raise ValueError("aligned_segments must be a list")
 
     try:
-        assigned = whisperx.assign_word_speakers(
-            diarization_result, {"segments": aligned_segments}
+        return _assign_turn_speakers(
+            _speaker_turns(diarization_result), aligned_segments
         )
-
-        if not assigned or not isinstance(assigned, dict):
-            raise RuntimeError("Speaker assignment returned invalid result")
-
-        return list(assigned.get("segments", []))
     except Exception as e:
         if isinstance(e, ValueError):
             raise
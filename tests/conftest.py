@@ -2,23 +2,51 @@
 
 from __future__ import annotations
 
+import os
+import shutil
 import tempfile
+from collections.abc import Callable, Iterator, Mapping
 from pathlib import Path
+from types import MappingProxyType, SimpleNamespace
 from typing import Any
-from unittest.mock import MagicMock
+from unittest.mock import Mock
 
 import pytest
 
+from voice_notes.transcribe import WhisperResult
+
+# RAM-backed on Linux, so file tests never wait on the block layer; None
+# falls back to the system temp directory
+_TEMP_BASE = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+
+def _make_temp_dir() -> Iterator[Path]:
+    """Create a temporary directory and remove it once the caller is done."""
+    path = Path(tempfile.mkdtemp(prefix="voice-notes-", dir=_TEMP_BASE))
+    yield path
+    shutil.rmtree(path, ignore_errors=True)
+
 
 @pytest.fixture
-def temp_dir() -> Path:
-    """Create a temporary directory for file operations.
+def temp_dir() -> Iterator[Path]:
+    """Create a fresh temporary directory for file operations.
 
     Yields:
-        Path to temporary directory.
+        Path to a new, empty directory, removed after the test.
     """
-    with tempfile.TemporaryDirectory() as tmpdir:
-        yield Path(tmpdir)
+    yield from _make_temp_dir()
+
+
+@pytest.fixture(scope="class")
+def class_temp_dir() -> Iterator[Path]:
+    """Create a temporary directory shared by the tests of one class.
+
+    Tests must use names unique to themselves (e.g. request.node.name).
+
+    Yields:
+        Path to a directory, removed after the class's last test.
+    """
+    yield from _make_temp_dir()
 
 
 @pytest.fixture
@@ -50,60 +78,128 @@ def sample_segments() -> list[dict[str, Any]]:
     ]
 
 
-@pytest.fixture
-def sample_aligned_segments() -> list[dict[str, Any]]:
+@pytest.fixture(scope="session")
+def sample_aligned_segments() -> list[Mapping[str, Any]]:
     """Sample aligned segments with word-level timestamps.
 
+    Shared by the whole session; segments and words are read-only mappings,
+    so a test that tries to modify them fails.
+
     Returns:
-        List of sample aligned segment dictionaries.
+        List of sample aligned segment mappings.
     """
     return [
-        {
-            "text": "Hello world",
-            "start": 0.0,
-            "end": 1.5,
-            "words": [
-                {"word": "Hello", "start": 0.0, "end": 0.5},
-                {"word": "world", "start": 0.5, "end": 1.5},
-            ],
-        },
-        {
-            "text": "How are you?",
-            "start": 1.5,
-            "end": 3.0,
-            "words": [
-                {"word": "How", "start": 1.5, "end": 1.8},
-                {"word": "are", "start": 1.8, "end": 2.2},
-                {"word": "you?", "start": 2.2, "end": 3.0},
-            ],
-        },
+        MappingProxyType(
+            {
+                "text": "Hello world",
+                "start": 0.0,
+                "end": 1.5,
+                "words": (
+                    MappingProxyType({"word": "Hello", "start": 0.0, "end": 0.5}),
+                    MappingProxyType({"word": "world", "start": 0.5, "end": 1.5}),
+                ),
+            }
+        ),
+        MappingProxyType(
+            {
+                "text": "How are you?",
+                "start": 1.5,
+                "end": 3.0,
+                "words": (
+                    MappingProxyType({"word": "How", "start": 1.5, "end": 1.8}),
+                    MappingProxyType({"word": "are", "start": 1.8, "end": 2.2}),
+                    MappingProxyType({"word": "you?", "start": 2.2, "end": 3.0}),
+                ),
+            }
+        ),
     ]
 
 
 @pytest.fixture
-def mock_whisperx_model() -> MagicMock:
-    """Mock WhisperX model with predictable responses.
+def mock_whisperx_model() -> SimpleNamespace:
+    """Stub WhisperX model with predictable responses.
 
     Returns:
-        Mock WhisperX model object.
+        Object whose transcribe() returns a fixed result.
     """
-    mock_model = MagicMock()
-    mock_result = MagicMock()
-    mock_result.segments = [
-        {
-            "text": "Hello world",
-            "start": 0.0,
-            "end": 1.5,
-        },
-        {
-            "text": "How are you?",
-            "start": 1.5,
-            "end": 3.0,
-        },
-    ]
-    mock_result.language = "en"
-    mock_model.transcribe.return_value = mock_result
-    return mock_model
+    result = SimpleNamespace(
+        segments=[
+            {
+                "text": "Hello world",
+                "start": 0.0,
+                "end": 1.5,
+            },
+            {
+                "text": "How are you?",
+                "start": 1.5,
+                "end": 3.0,
+            },
+        ],
+        language="en",
+    )
+    return SimpleNamespace(transcribe=lambda *args, **kwargs: result)
+
+
+@pytest.fixture
+def make_whisper_result() -> Callable[..., SimpleNamespace]:
+    """Factory for the attribute-style results a WhisperX model returns.
+
+    Returns:
+        Function taking segments, language (default "en") and text (default
+        None, so the transcript is built from the segments).
+    """
+
+    def make(
+        segments: Any, language: str | None = "en", text: str | None = None
+    ) -> SimpleNamespace:
+        return SimpleNamespace(segments=segments, language=language, text=text)
+
+    return make
+
+
+def _whisper_result(language: str | None) -> WhisperResult:
+    """Build the one-segment transcription result the CLI tests share."""
+    return WhisperResult(
+        text="Hello world",
+        segments=[{"text": "Hello world", "start": 0.0, "end": 1.0}],
+        language=language,
+    )
+
+
+@pytest.fixture(scope="session")
+def whisper_result_en() -> WhisperResult:
+    """Transcription result with English detected.
+
+    Shared by the whole session; tests must not modify it.
+
+    Returns:
+        WhisperResult with language "en".
+    """
+    return _whisper_result("en")
+
+
+@pytest.fixture(scope="session")
+def whisper_result_fr() -> WhisperResult:
+    """Transcription result with French detected.
+
+    Shared by the whole session; tests must not modify it.
+
+    Returns:
+        WhisperResult with language "fr".
+    """
+    return _whisper_result("fr")
+
+
+@pytest.fixture(scope="session")
+def whisper_result_none() -> WhisperResult:
+    """Transcription result without a detected language.
+
+    Shared by the whole session; tests must not modify it.
+
+    Returns:
+        WhisperResult with language None.
+    """
+    return _whisper_result(None)
 
 
 @pytest.fixture
@@ -130,59 +226,132 @@ def mock_whisperx_transcribe_result() -> dict[str, Any]:
     }
 
 
-@pytest.fixture
-def mock_openai_client() -> MagicMock:
-    """Mock OpenAI client for summarization tests.
+@pytest.fixture(scope="session")
+def summary_response() -> SimpleNamespace:
+    """Successful chat completion response.
 
     Returns:
-        Mock OpenAI client object.
+        Read-only response stub shared by the session.
     """
-    mock_client = MagicMock()
-    mock_response = MagicMock()
-    mock_choice = MagicMock()
-    mock_message = MagicMock()
-    mock_message.content = "# Summary\n\nThis is a test summary of the transcript."
-    mock_choice.message = mock_message
-    mock_response.choices = [mock_choice]
-    mock_client.chat.completions.create.return_value = mock_response
-    return mock_client
+    return SimpleNamespace(
+        choices=[
+            SimpleNamespace(
+                message=SimpleNamespace(
+                    content="# Summary\n\nThis is a test summary of the transcript."
+                )
+            )
+        ]
+    )
 
 
 @pytest.fixture
-def mock_audio_file(temp_dir: Path) -> Path:
-    """Create a mock audio file for testing.
+def mock_openai_client(summary_response: SimpleNamespace) -> SimpleNamespace:
+    """Stub OpenAI client for summarization tests.
+
+    Only chat.completions.create is a Mock, so tests can assert on its calls;
+    the rest of the tree is plain attributes.
+
+    Args:
+        summary_response: Session successful-response fixture.
+
+    Returns:
+        Stub OpenAI client object.
+    """
+    create = Mock(return_value=summary_response)
+    return SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+    )
+
+
+@pytest.fixture(scope="session")
+def missing_choices_response() -> SimpleNamespace:
+    """Chat completion response whose choices are None.
+
+    Returns:
+        Read-only response stub shared by the session.
+    """
+    return SimpleNamespace(choices=None)
+
+
+@pytest.fixture(scope="session")
+def empty_choices_response() -> SimpleNamespace:
+    """Chat completion response with an empty choices list.
+
+    Returns:
+        Read-only response stub shared by the session.
+    """
+    return SimpleNamespace(choices=[])
+
+
+@pytest.fixture(scope="session")
+def missing_message_response() -> SimpleNamespace:
+    """Chat completion response whose first choice has no message.
+
+    Returns:
+        Read-only response stub shared by the session.
+    """
+    return SimpleNamespace(choices=[SimpleNamespace(message=None)])
+
+
+@pytest.fixture(scope="session")
+def none_content_response() -> SimpleNamespace:
+    """Chat completion response whose message content is None.
+
+    Returns:
+        Read-only response stub shared by the session.
+    """
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=None))]
+    )
+
+
+@pytest.fixture(scope="session")
+def mock_audio_file(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Create a mock audio file shared by the whole session.
+
+    Tests only read the file, so one copy serves every test.
 
     Args:
-        temp_dir: Temporary directory fixture.
+        tmp_path_factory: Pytest session temporary directory factory.
 
     Returns:
         Path to mock audio file.
     """
-    audio_file = temp_dir / "test_audio.wav"
+    audio_file = tmp_path_factory.mktemp("audio") / "test_audio.wav"
     # Create a minimal valid WAV file header (44 bytes)
     # This is just enough to pass file existence checks
     audio_file.write_bytes(b"RIFF" + b"\x00" * 40)
     return audio_file
 
 
-@pytest.fixture
-def mock_diarization_result() -> dict[str, Any]:
+@pytest.fixture(scope="session")
+def mock_audio_file_str(mock_audio_file: Path) -> str:
+    """Path of the mock audio file as a command-line argument.
+
+    Args:
+        mock_audio_file: Session mock audio file fixture.
+
+    Returns:
+        String form of the mock audio file path.
+    """
+    return str(mock_audio_file)
+
+
+@pytest.fixture(scope="session")
+def mock_diarization_result() -> Mapping[str, Any]:
     """Mock diarization result from WhisperX.
 
+    Shared by the whole session; the result and its turns are read-only
+    mappings, so a test that tries to modify them fails.
+
     Returns:
-        Dictionary representing diarization result.
+        Mapping representing diarization result.
     """
-    return {
-        "segments": [
-            {
-                "start": 0.0,
-                "end": 1.5,
-                "speaker": "SPEAKER_00",
-            },
-            {
-                "start": 1.5,
-                "end": 3.0,
-                "speaker": "SPEAKER_01",
-            },
-        ]
-    }
+    return MappingProxyType(
+        {
+            "segments": (
+                MappingProxyType({"start": 0.0, "end": 1.5, "speaker": "SPEAKER_00"}),
+                MappingProxyType({"start": 1.5, "end": 3.0, "speaker": "SPEAKER_01"}),
+            )
+        }
+    )
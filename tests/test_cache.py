@@ -0,0 +1,108 @@
+"""Tests for cache module."""
+
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from voice_notes.cache import (
+    default_cache_dir,
+    file_digest,
+    load_result,
+    make_key,
+    store_result,
+)
+
+
+class TestDefaultCacheDir:
+    """Test cases for default_cache_dir function."""
+
+    def test_env_override(self, temp_dir: Path) -> None:
+        """Test that VOICE_NOTES_CACHE_DIR wins."""
+        with patch.dict(os.environ, {"VOICE_NOTES_CACHE_DIR": str(temp_dir)}):
+            assert default_cache_dir() == temp_dir
+
+    def test_xdg_cache_home(self, temp_dir: Path) -> None:
+        """Test that XDG_CACHE_HOME is used when set."""
+        env = {"VOICE_NOTES_CACHE_DIR": "", "XDG_CACHE_HOME": str(temp_dir)}
+        with patch.dict(os.environ, env):
+            assert default_cache_dir() == temp_dir / "voice_notes"
+
+    def test_home_fallback(self) -> None:
+        """Test the ~/.cache fallback."""
+        env = {"VOICE_NOTES_CACHE_DIR": "", "XDG_CACHE_HOME": ""}
+        with patch.dict(os.environ, env):
+            assert default_cache_dir() == Path.home() / ".cache" / "voice_notes"
+
+
+class TestKeys:
+    """Test cases for file_digest and make_key functions."""
+
+    def test_file_digest_tracks_content(self, temp_dir: Path) -> None:
+        """Test that the digest changes with file content."""
+        file_path = temp_dir / "audio.wav"
+        file_path.write_bytes(b"one")
+        before = file_digest(file_path)
+        file_path.write_bytes(b"two")
+        assert file_digest(file_path) != before
+
+    def test_make_key_separates_parts(self) -> None:
+        """Test that part boundaries are part of the key."""
+        assert make_key("ab", "c") != make_key("a", "bc")
+        assert make_key("ab", "c") == make_key("ab", "c")
+
+
+class TestLoadStoreResult:
+    """Test cases for load_result and store_result functions."""
+
+    def test_round_trip(self, temp_dir: Path) -> None:
+        """Test that a stored value loads back."""
+        value = {"text": "Hi", "segments": [{"start": 0.5}]}
+        store_result("transcripts", "k", value, cache_dir=temp_dir)
+
+        loaded = load_result("transcripts", "k", cache_dir=temp_dir)
+        assert loaded == {"text": "Hi", "segments": [{"start": 0.5}]}
+        assert list((temp_dir / "transcripts").iterdir()) == [
+            temp_dir / "transcripts" / "k.json"
+        ]
+
+    def test_miss_returns_none(self, temp_dir: Path) -> None:
+        """Test that a missing entry yields None."""
+        assert load_result("transcripts", "missing", cache_dir=temp_dir) is None
+
+    def test_corrupt_entry_returns_none(self, temp_dir: Path) -> None:
+        """Test that an unreadable entry yields None."""
+        (temp_dir / "summaries").mkdir()
+        (temp_dir / "summaries" / "k.json").write_text("{", encoding="utf-8")
+        assert load_result("summaries", "k", cache_dir=temp_dir) is None
+
+    def test_expired_entry_returns_none(self, temp_dir: Path) -> None:
+        """Test that entries older than the TTL are ignored."""
+        store_result("summaries", "k", "text", cache_dir=temp_dir)
+        old = time.time() - 120
+        os.utime(temp_dir / "summaries" / "k.json", (old, old))
+
+        assert load_result("summaries", "k", ttl=60, cache_dir=temp_dir) is None
+        assert load_result("summaries", "k", ttl=600, cache_dir=temp_dir) == "text"
+
+    def test_store_failure_is_not_fatal(
+        self, temp_dir: Path, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        """Test that unwritable caches only log a warning."""
+        blocker = temp_dir / "file"
+        blocker.write_text("", encoding="utf-8")
+
+        store_result("summaries", "k", "text", cache_dir=blocker)
+
+        assert "Could not write cache entry" in caplog.text
+
+    def test_unserializable_value_is_not_stored(self, temp_dir: Path) -> None:
+        """Test that values orjson cannot encode leave no entry behind."""
+        store_result("summaries", "k", object(), cache_dir=temp_dir)
+
+        assert load_result("summaries", "k", cache_dir=temp_dir) is None
+        assert not (temp_dir / "summaries").exists()
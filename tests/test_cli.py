@@ -3,107 +3,198 @@
 from __future__ import annotations
 
 import os
+import subprocess
 import sys
+from collections.abc import Mapping
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import MagicMock, Mock, patch
 
 import pytest
 
 from voice_notes.cli import (
+    _GREEN,
+    _build_parser,
+    _echo,
+    _load_cached_language,
+    _maybe_load_dotenv,
+    _maybe_preload_model,
     _parse_arguments,
     _process_alignment,
     _process_diarization,
     _process_summary,
+    _resolve_path,
     _save_basic_transcript,
+    _save_cached_language,
     main,
 )
+from voice_notes.summarize import Summary
+from voice_notes.transcribe import (
+    WhisperResult,
+    clear_audio_cache,
+    clear_model_cache,
+)
 
 
 class TestParseArguments:
     """Test cases for _parse_arguments function."""
 
-    def test_basic_arguments(self) -> None:
-        """Test parsing basic required arguments."""
-        with patch.object(sys, "argv", ["voice-notes", "test.wav"]):
-            args = _parse_arguments()
-            assert args.audio_path == "test.wav"
-            assert args.model == "small"
-            assert args.device == "cpu"
-            assert args.align is False
-            assert args.diarize is False
-            assert args.summarize is False
-
-    def test_all_arguments(self) -> None:
-        """Test parsing all arguments."""
-        with patch.object(
-            sys,
-            "argv",
-            [
-                "voice-notes",
-                "test.wav",
-                "--model",
-                "base",
-                "--device",
-                "cuda",
-                "--language",
-                "en",
-                "--prompt",
-                "Test prompt",
-                "--out",
-                "/tmp/output",
-                "--align",
-                "--diarize",
-                "--min-speakers",
-                "2",
-                "--max-speakers",
-                "3",
-                "--summarize",
-                "--summary-model",
-                "gpt-4",
-            ],
-        ):
-            args = _parse_arguments()
-            assert args.audio_path == "test.wav"
-            assert args.model == "base"
-            assert args.device == "cuda"
-            assert args.language == "en"
-            assert args.prompt == "Test prompt"
-            assert args.out == "/tmp/output"
-            assert args.align is True
-            assert args.diarize is True
-            assert args.min_speakers == 2
-            assert args.max_speakers == 3
-            assert args.summarize is True
-            assert args.summary_model == "gpt-4"
-
-    def test_optional_flags(self) -> None:
-        """Test parsing optional flags."""
-        with patch.object(
-            sys, "argv", ["voice-notes", "test.wav", "--align", "--diarize"]
-        ):
-            args = _parse_arguments()
-            assert args.align is True
-            assert args.diarize is True
-            assert args.summarize is False
+    @pytest.mark.parametrize(
+        ("argv", "expected"),
+        [
+            pytest.param(
+                ["test.wav"],
+                {
+                    "audio_paths": ["test.wav"],
+                    "model": "small",
+                    "device": "cpu",
+                    "compute_type": None,
+                    "chunk_size": 30,
+                    "batch_size": 8,
+                    "cache": True,
+                    "align": False,
+                    "diarize": False,
+                    "summarize": False,
+                },
+                id="defaults",
+            ),
+            pytest.param(
+                [
+                    "test.wav",
+                    "--model",
+                    "base",
+                    "--device",
+                    "cuda",
+                    "--language",
+                    "en",
+                    "--prompt",
+                    "Test prompt",
+                    "--out",
+                    "/tmp/output",
+                    "--no-cache",
+                    "--align",
+                    "--diarize",
+                    "--min-speakers",
+                    "2",
+                    "--max-speakers",
+                    "3",
+                    "--summarize",
+                    "--summary-model",
+                    "gpt-4",
+                ],
+                {
+                    "audio_paths": ["test.wav"],
+                    "model": "base",
+                    "device": "cuda",
+                    "language": "en",
+                    "prompt": "Test prompt",
+                    "out": "/tmp/output",
+                    "cache": False,
+                    "align": True,
+                    "diarize": True,
+                    "min_speakers": 2,
+                    "max_speakers": 3,
+                    "summarize": True,
+                    "summary_model": "gpt-4",
+                },
+                id="all-arguments",
+            ),
+            pytest.param(
+                ["test.wav", "--align", "--diarize"],
+                {"align": True, "diarize": True, "summarize": False},
+                id="optional-flags",
+            ),
+        ],
+    )
+    def test_arguments(self, argv: list[str], expected: dict[str, Any]) -> None:
+        """Test that arguments parse to the expected values."""
+        assert expected.items() <= vars(_parse_arguments(argv)).items()
+
+    def test_explicit_argv(self) -> None:
+        """Test parsing an explicit argument list instead of sys.argv."""
+        args = _parse_arguments(["test.wav", "--summarize"])
+        assert args.audio_paths == ["test.wav"]
+        assert args.summarize is True
+        assert args.align is False
+
+    def test_multiple_audio_paths(self) -> None:
+        """Test that several audio paths can be passed in one run."""
+        args = _parse_arguments(["a.wav", "b.wav", "--align"])
+        assert args.audio_paths == ["a.wav", "b.wav"]
+        assert args.align is True
+
+    def test_parser_built_once(self) -> None:
+        """Test that repeated parses share one parser instance."""
+        assert _build_parser() is _build_parser()
+        first = _parse_arguments(["a.wav", "--align"])
+        second = _parse_arguments(["b.wav"])
+        assert first.align is True
+        assert second.align is False
+
+    def test_help_lists_feature_groups(self) -> None:
+        """Test that help output groups options by feature."""
+        help_text = _build_parser().format_help()
+        assert "alignment:" in help_text
+        assert "diarization:" in help_text
+        assert "summary:" in help_text
+
+
+class TestEcho:
+    """Test cases for _echo status output."""
+
+    def test_plain_output_when_not_a_tty(
+        self, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        """Test that labels are not styled when stdout is not a terminal."""
+        _echo("Wrote:", "out.txt", style=_GREEN)
+        assert capsys.readouterr().out == "Wrote: out.txt\n"
+
+    def test_styled_label_on_tty(self) -> None:
+        """Test that only the label is wrapped in ANSI codes on a terminal."""
+        with patch("voice_notes.cli.sys.stdout") as mock_stdout:
+            mock_stdout.isatty.return_value = True
+            _echo("Wrote:", "out.txt", style=_GREEN)
+        written = "".join(call.args[0] for call in mock_stdout.write.call_args_list)
+        assert written == "\x1b[32mWrote:\x1b[0m out.txt\n"
+
+
+class TestLazyImports:
+    """Test cases for deferred heavy imports in the CLI module."""
+
+    def test_cli_import_skips_heavy_modules(self) -> None:
+        """Test that importing the CLI does not load transcription backends."""
+        code = (
+            "import sys, voice_notes.cli; "
+            "heavy = [m for m in ('voice_notes.transcribe', "
+            "'voice_notes.whisperx_tools', 'voice_notes.summarize', 'dotenv') "
+            "if m in sys.modules]; "
+            "print(','.join(heavy))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        assert result.stdout.strip() == ""
 
 
 class TestSaveBasicTranscript:
     """Test cases for _save_basic_transcript function."""
 
     @patch("voice_notes.cli.write_text")
-    @patch("voice_notes.cli.save_segments_json")
-    @patch("voice_notes.cli.console")
+    @patch("voice_notes.transcribe.save_segments_json")
+    @patch("voice_notes.cli._echo")
     def test_save_basic_transcript(
         self,
-        mock_console: MagicMock,
+        mock_echo: MagicMock,
         mock_save_segments: MagicMock,
         mock_write_text: MagicMock,
         temp_dir: Path,
         sample_segments: list[dict],
     ) -> None:
         """Test saving basic transcript."""
-        from voice_notes.transcribe import WhisperResult
-
         whisper_result = WhisperResult(
             text="Hello world",
             segments=sample_segments,
@@ -116,24 +207,26 @@ class TestSaveBasicTranscript:
         transcript_path = temp_dir / "transcript.txt"
         segments_path = temp_dir / "segments.json"
         mock_write_text.assert_called_once_with(transcript_path, "Hello world")
-        mock_save_segments.assert_called_once_with(sample_segments, segments_path)
-        assert mock_console.print.call_count == 2
+        mock_save_segments.assert_called_once_with(
+            sample_segments, segments_path, atomic=True
+        )
+        assert mock_echo.call_count == 2
 
 
 class TestProcessAlignment:
     """Test cases for _process_alignment function."""
 
-    @patch("voice_notes.cli.align_transcript")
-    @patch("voice_notes.cli.save_segments_json")
-    @patch("voice_notes.cli.console")
+    @patch("voice_notes.whisperx_tools.align_transcript")
+    @patch("voice_notes.transcribe.save_segments_json")
+    @patch("voice_notes.cli._echo")
     def test_process_alignment_success(
         self,
-        mock_console: MagicMock,
+        mock_echo: MagicMock,
         mock_save_segments: MagicMock,
         mock_align: MagicMock,
         mock_audio_file: Path,
         temp_dir: Path,
-        sample_aligned_segments: list[dict],
+        sample_aligned_segments: list[Mapping],
     ) -> None:
         """Test successful alignment processing."""
         mock_align.return_value = sample_aligned_segments
@@ -147,10 +240,10 @@ class TestProcessAlignment:
             out_dir=temp_dir,
         )
 
-        assert result == sample_aligned_segments
+        assert result is sample_aligned_segments
         mock_align.assert_called_once()
         mock_save_segments.assert_called_once()
-        mock_console.print.assert_called_once()
+        mock_echo.assert_called_once()
 
     def test_process_alignment_no_language_raises_error(
         self,
@@ -172,15 +265,15 @@ class TestProcessAlignment:
 class TestProcessDiarization:
     """Test cases for _process_diarization function."""
 
-    @patch("voice_notes.cli.diarize_audio")
-    @patch("voice_notes.cli.assign_speakers")
+    @patch("voice_notes.whisperx_tools.diarize_audio")
+    @patch("voice_notes.whisperx_tools.assign_speakers")
     @patch("voice_notes.cli.format_speaker_transcript")
-    @patch("voice_notes.cli.save_segments_json")
+    @patch("voice_notes.transcribe.save_segments_json")
     @patch("voice_notes.cli.write_text")
-    @patch("voice_notes.cli.console")
+    @patch("voice_notes.cli._echo")
     def test_process_diarization_success(
         self,
-        mock_console: MagicMock,
+        mock_echo: MagicMock,
         mock_write_text: MagicMock,
         mock_save_segments: MagicMock,
         mock_format: MagicMock,
@@ -188,455 +281,614 @@ class TestProcessDiarization:
         mock_diarize: MagicMock,
         mock_audio_file: Path,
         temp_dir: Path,
-        sample_aligned_segments: list[dict],
-        mock_diarization_result: dict,
+        sample_aligned_segments: list[Mapping],
+        mock_diarization_result: Mapping,
+        monkeypatch: pytest.MonkeyPatch,
     ) -> None:
         """Test successful diarization processing."""
         mock_diarize.return_value = mock_diarization_result
         mock_assign.return_value = sample_aligned_segments
         mock_format.return_value = "SPEAKER_00: Hello\nSPEAKER_01: World"
 
-        with patch.dict(os.environ, {"HUGGINGFACE_TOKEN": "test_token"}):
-            _process_diarization(
-                audio_path=mock_audio_file,
-                segments=sample_aligned_segments,
-                device="cpu",
-                min_speakers=None,
-                max_speakers=None,
-                out_dir=temp_dir,
-            )
+        monkeypatch.setenv("HUGGINGFACE_TOKEN", "test_token")
+        _process_diarization(
+            audio_path=mock_audio_file,
+            segments=sample_aligned_segments,
+            device="cpu",
+            min_speakers=None,
+            max_speakers=None,
+            out_dir=temp_dir,
+        )
 
         mock_diarize.assert_called_once()
         mock_assign.assert_called_once()
         mock_format.assert_called_once()
         mock_save_segments.assert_called_once()
         mock_write_text.assert_called_once()
-        assert mock_console.print.call_count == 2
+        assert mock_echo.call_count == 2
 
     def test_process_diarization_no_token_raises_error(
         self,
         mock_audio_file: Path,
         temp_dir: Path,
-        sample_aligned_segments: list[dict],
+        sample_aligned_segments: list[Mapping],
+        monkeypatch: pytest.MonkeyPatch,
     ) -> None:
         """Test that missing HuggingFace token raises ValueError."""
-        with patch.dict(os.environ, {}, clear=True):
-            with pytest.raises(ValueError, match="HUGGINGFACE_TOKEN is required"):
-                _process_diarization(
-                    audio_path=mock_audio_file,
-                    segments=sample_aligned_segments,
-                    device="cpu",
-                    min_speakers=None,
-                    max_speakers=None,
-                    out_dir=temp_dir,
-                )
+        monkeypatch.delenv("HUGGINGFACE_TOKEN", raising=False)
+        with pytest.raises(ValueError, match="HUGGINGFACE_TOKEN is required"):
+            _process_diarization(
+                audio_path=mock_audio_file,
+                segments=sample_aligned_segments,
+                device="cpu",
+                min_speakers=None,
+                max_speakers=None,
+                out_dir=temp_dir,
+            )
 
 
 class TestProcessSummary:
     """Test cases for _process_summary function."""
 
-    @patch("voice_notes.cli.summarize_transcript")
+    @patch("voice_notes.summarize.summarize_transcript")
     @patch("voice_notes.cli.write_text")
-    @patch("voice_notes.cli.console")
+    @patch("voice_notes.cli._echo")
     def test_process_summary_success(
         self,
-        mock_console: MagicMock,
+        mock_echo: MagicMock,
         mock_write_text: MagicMock,
         mock_summarize: MagicMock,
         temp_dir: Path,
+        monkeypatch: pytest.MonkeyPatch,
     ) -> None:
         """Test successful summary processing."""
-        from voice_notes.summarize import Summary
-
         mock_summarize.return_value = Summary(
             markdown="# Summary\n\nTest summary",
             text="# Summary\n\nTest summary",
         )
 
-        with patch.dict(os.environ, {"OPENAI_API_KEY": "test_key"}):
+        monkeypatch.setenv("OPENAI_API_KEY", "test_key")
+        _process_summary(
+            transcript="Test transcript",
+            model="gpt-4o-mini",
+            out_dir=temp_dir,
+        )
+
+        mock_summarize.assert_called_once()
+        mock_write_text.assert_called_once()
+        mock_echo.assert_called_once()
+
+    def test_process_summary_no_api_key_raises_error(
+        self, temp_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that missing OpenAI API key raises ValueError."""
+        monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+        with pytest.raises(ValueError, match="OPENAI_API_KEY is required"):
             _process_summary(
                 transcript="Test transcript",
                 model="gpt-4o-mini",
                 out_dir=temp_dir,
             )
 
-        mock_summarize.assert_called_once()
-        mock_write_text.assert_called_once()
-        mock_console.print.assert_called_once()
 
-    def test_process_summary_no_api_key_raises_error(self, temp_dir: Path) -> None:
-        """Test that missing OpenAI API key raises ValueError."""
-        with patch.dict(os.environ, {}, clear=True):
-            with pytest.raises(ValueError, match="OPENAI_API_KEY is required"):
-                _process_summary(
-                    transcript="Test transcript",
-                    model="gpt-4o-mini",
-                    out_dir=temp_dir,
-                )
+class TestResolvePath:
+    """Test cases for _resolve_path function."""
 
+    def test_expands_home_directory(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that a leading ~ is expanded to the home directory."""
+        monkeypatch.setenv("HOME", "/home/tester")
+        assert _resolve_path("~/audio.wav") == Path("/home/tester/audio.wav")
 
-class TestMain:
-    """Test cases for main function."""
+    def test_resolves_relative_and_symlinked_paths(self, temp_dir: Path) -> None:
+        """Test that relative segments and symlinks are resolved."""
+        target = temp_dir / "real.wav"
+        target.write_bytes(b"RIFF")
+        link = temp_dir / "link.wav"
+        link.symlink_to(target)
 
-    @patch("voice_notes.cli.transcribe_file")
-    @patch("voice_notes.cli._save_basic_transcript")
-    @patch("voice_notes.cli.load_dotenv")
-    @patch("voice_notes.cli.console")
-    def test_main_basic_transcription(
+        assert _resolve_path(str(temp_dir / "sub" / ".." / "link.wav")) == (
+            target.resolve()
+        )
+
+
+class TestMaybeLoadDotenv:
+    """Test cases for _maybe_load_dotenv function."""
+
+    def test_loads_env_file_from_parent_directory(
+        self, temp_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that a .env file in a parent directory is loaded."""
+        (temp_dir / ".env").write_text("VOICE_NOTES_TEST_VAR=loaded\n")
+        nested = temp_dir / "nested"
+        nested.mkdir()
+        monkeypatch.chdir(nested)
+        monkeypatch.delenv("VOICE_NOTES_TEST_VAR", raising=False)
+
+        _maybe_load_dotenv()
+
+        assert os.environ["VOICE_NOTES_TEST_VAR"] == "loaded"
+        monkeypatch.delenv("VOICE_NOTES_TEST_VAR")
+
+    @patch("dotenv.load_dotenv")
+    def test_skips_dotenv_without_env_file(
         self,
-        mock_console: MagicMock,
         mock_load_dotenv: MagicMock,
-        mock_save_basic: MagicMock,
-        mock_transcribe: MagicMock,
-        mock_audio_file: Path,
         temp_dir: Path,
+        monkeypatch: pytest.MonkeyPatch,
     ) -> None:
-        """Test main function with basic transcription."""
-        from voice_notes.transcribe import WhisperResult
+        """Test that dotenv is not called when no .env file exists."""
+        monkeypatch.chdir(temp_dir)
+        with patch.object(Path, "is_file", return_value=False):
+            _maybe_load_dotenv()
 
-        mock_transcribe.return_value = WhisperResult(
-            text="Hello world",
-            segments=[{"text": "Hello world", "start": 0.0, "end": 1.0}],
+        mock_load_dotenv.assert_not_called()
+
+
+class TestMaybePreloadModel:
+    """Test cases for _maybe_preload_model function."""
+
+    @patch("voice_notes.transcribe.preload_model")
+    def test_preloads_when_enabled(
+        self, mock_preload: MagicMock, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that VOICE_NOTES_PRELOAD=1 starts loading the chosen model."""
+        monkeypatch.setenv("VOICE_NOTES_PRELOAD", "1")
+        args = _parse_arguments(["test.wav", "--model", "base", "--language", "en"])
+
+        _maybe_preload_model(args)
+
+        mock_preload.assert_called_once_with(
+            model_name="base",
+            device="cpu",
             language="en",
+            prompt=None,
+            compute_type=None,
         )
 
-        with patch.object(sys, "argv", ["voice-notes", str(mock_audio_file)]):
-            with patch("voice_notes.cli.default_output_dir", return_value=temp_dir):
-                main()
+    @patch("voice_notes.transcribe.preload_model")
+    def test_skips_when_disabled(
+        self, mock_preload: MagicMock, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that nothing is preloaded without VOICE_NOTES_PRELOAD=1."""
+        monkeypatch.delenv("VOICE_NOTES_PRELOAD", raising=False)
+
+        _maybe_preload_model(_parse_arguments(["test.wav"]))
+
+        mock_preload.assert_not_called()
+
+
+class TestLanguageCache:
+    """Test cases for the detected-language cache helpers."""
+
+    def test_round_trip(self, temp_dir: Path) -> None:
+        """Test that a saved language is returned for the same fingerprint."""
+        _save_cached_language(temp_dir, "abc", "de")
+        assert _load_cached_language(temp_dir, "abc") == "de"
+
+    def test_fingerprint_mismatch(self, temp_dir: Path) -> None:
+        """Test that a cache written for other audio is ignored."""
+        _save_cached_language(temp_dir, "abc", "de")
+        assert _load_cached_language(temp_dir, "xyz") is None
+
+    def test_missing_cache(self, temp_dir: Path) -> None:
+        """Test that a missing cache file yields None."""
+        assert _load_cached_language(temp_dir, "abc") is None
+
+    @pytest.mark.parametrize(
+        "content",
+        ["not json", "[]", '{"audio_sha": "abc", "language": ""}'],
+    )
+    def test_invalid_cache(self, temp_dir: Path, content: str) -> None:
+        """Test that malformed cache contents yield None."""
+        (temp_dir / ".voicenotes_cache.json").write_text(content, encoding="utf-8")
+        assert _load_cached_language(temp_dir, "abc") is None
+
+
+@pytest.fixture
+def cli_mocks(monkeypatch: pytest.MonkeyPatch) -> SimpleNamespace:
+    """Stub out the collaborators every main() test replaces.
+
+    Status lines are not printed; their labels are collected in ``labels``.
+
+    Args:
+        monkeypatch: Pytest monkeypatch fixture.
+
+    Returns:
+        Namespace of the installed mocks and the echoed labels.
+    """
+    labels: list[str] = []
+    mocks = SimpleNamespace(
+        transcribe=Mock(),
+        load_audio=Mock(),
+        save_basic=Mock(),
+        load_dotenv=Mock(),
+        labels=labels,
+        echo=lambda label, *parts, style="": labels.append(label),
+    )
+    monkeypatch.setattr("voice_notes.transcribe.transcribe_file", mocks.transcribe)
+    monkeypatch.setattr("voice_notes.transcribe.load_audio", mocks.load_audio)
+    monkeypatch.setattr("voice_notes.cli._save_basic_transcript", mocks.save_basic)
+    monkeypatch.setattr("voice_notes.cli._maybe_load_dotenv", mocks.load_dotenv)
+    monkeypatch.setattr("voice_notes.cli._echo", mocks.echo)
+    return mocks
 
-        mock_load_dotenv.assert_called_once()
-        mock_transcribe.assert_called_once()
-        mock_save_basic.assert_called_once()
 
-    @patch("voice_notes.cli.transcribe_file")
-    @patch("voice_notes.cli._save_basic_transcript")
+class TestMain:
+    """Test cases for main function."""
+
+    def test_main_basic_transcription(
+        self,
+        cli_mocks: SimpleNamespace,
+        whisper_result_en: WhisperResult,
+        mock_audio_file_str: str,
+        temp_dir: Path,
+    ) -> None:
+        """Test main function with basic transcription."""
+        cli_mocks.transcribe.return_value = whisper_result_en
+
+        with patch("voice_notes.cli.default_output_dir", return_value=temp_dir):
+            main([mock_audio_file_str])
+
+        cli_mocks.load_dotenv.assert_called_once()
+        cli_mocks.transcribe.assert_called_once()
+        cli_mocks.save_basic.assert_called_once()
+        # Without alignment or diarization, decoding is left to transcribe_file
+        assert cli_mocks.transcribe.call_args.kwargs["audio"] is None
+
     @patch("voice_notes.cli._process_alignment")
-    @patch("voice_notes.cli.load_dotenv")
     def test_main_with_alignment(
         self,
-        mock_load_dotenv: MagicMock,
         mock_process_align: MagicMock,
-        mock_save_basic: MagicMock,
-        mock_transcribe: MagicMock,
-        mock_audio_file: Path,
+        cli_mocks: SimpleNamespace,
+        whisper_result_en: WhisperResult,
+        mock_audio_file_str: str,
         temp_dir: Path,
     ) -> None:
         """Test main function with alignment."""
-        from voice_notes.transcribe import WhisperResult
-
-        mock_transcribe.return_value = WhisperResult(
-            text="Hello world",
-            segments=[{"text": "Hello world", "start": 0.0, "end": 1.0}],
-            language="en",
-        )
+        cli_mocks.transcribe.return_value = whisper_result_en
         mock_process_align.return_value = [
             {"text": "Hello world", "start": 0.0, "end": 1.0}
         ]
 
-        with patch.object(
-            sys,
-            "argv",
-            ["voice-notes", str(mock_audio_file), "--align", "--language", "en"],
-        ):
-            with patch("voice_notes.cli.default_output_dir", return_value=temp_dir):
-                main()
+        with patch("voice_notes.cli.default_output_dir", return_value=temp_dir):
+            main([mock_audio_file_str, "--align", "--language", "en"])
 
         mock_process_align.assert_called_once()
 
-    @patch("voice_notes.cli.transcribe_file")
-    @patch("voice_notes.cli._save_basic_transcript")
     @patch("voice_notes.cli._process_alignment")
-    @patch("voice_notes.cli.load_dotenv")
     def test_main_with_alignment_uses_detected_language(
         self,
-        mock_load_dotenv: MagicMock,
         mock_process_align: MagicMock,
-        mock_save_basic: MagicMock,
-        mock_transcribe: MagicMock,
-        mock_audio_file: Path,
+        cli_mocks: SimpleNamespace,
+        whisper_result_fr: WhisperResult,
+        mock_audio_file_str: str,
         temp_dir: Path,
     ) -> None:
         """Test main uses detected language for alignment when --language not set."""
-        from voice_notes.transcribe import WhisperResult
-
-        mock_transcribe.return_value = WhisperResult(
-            text="Hello world",
-            segments=[{"text": "Hello world", "start": 0.0, "end": 1.0}],
-            language="fr",  # Detected language
-        )
+        cli_mocks.transcribe.return_value = whisper_result_fr
         mock_process_align.return_value = [
             {"text": "Hello world", "start": 0.0, "end": 1.0}
         ]
 
-        with patch.object(
-            sys, "argv", ["voice-notes", str(mock_audio_file), "--align"]
-        ):
-            with patch("voice_notes.cli.default_output_dir", return_value=temp_dir):
-                main()
+        with patch("voice_notes.cli.default_output_dir", return_value=temp_dir):
+            main([mock_audio_file_str, "--align"])
 
         # Verify alignment was called with detected language
         call_args = mock_process_align.call_args
         assert call_args is not None
         assert call_args.kwargs["language"] == "fr"
 
-    @patch("voice_notes.cli.transcribe_file")
-    @patch("voice_notes.cli._save_basic_transcript")
+    def test_main_reuses_cached_language(
+        self,
+        cli_mocks: SimpleNamespace,
+        whisper_result_fr: WhisperResult,
+        mock_audio_file_str: str,
+        temp_dir: Path,
+    ) -> None:
+        """Test that a second run passes the previously detected language."""
+        cli_mocks.transcribe.return_value = whisper_result_fr
+
+        argv = [mock_audio_file_str, "--out", str(temp_dir)]
+        main(argv)
+        main(argv)
+
+        first, second = cli_mocks.transcribe.call_args_list
+        assert first.kwargs["language"] is None
+        assert second.kwargs["language"] == "fr"
+
+    def test_closed_stdout_exits_quietly(
+        self,
+        cli_mocks: SimpleNamespace,
+        mock_audio_file_str: str,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test that a closed output pipe exits with status 1, not a traceback."""
+        monkeypatch.setattr(
+            "voice_notes.cli._process_file", Mock(side_effect=BrokenPipeError)
+        )
+        stdout = Mock()
+        monkeypatch.setattr("voice_notes.cli.sys.stdout", stdout)
+        mock_open = Mock(return_value=99)
+        mock_dup2 = Mock()
+        monkeypatch.setattr("voice_notes.cli.os.open", mock_open)
+        monkeypatch.setattr("voice_notes.cli.os.dup2", mock_dup2)
+
+        with pytest.raises(SystemExit) as excinfo:
+            main([mock_audio_file_str])
+
+        assert excinfo.value.code == 1
+        mock_open.assert_called_once_with(os.devnull, os.O_WRONLY)
+        mock_dup2.assert_called_once_with(99, stdout.fileno.return_value)
+
+    def test_rerun_hits_transcript_cache(
+        self,
+        mock_audio_file_str: str,
+        temp_dir: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test that the cached language does not defeat the transcript cache."""
+        model = SimpleNamespace(
+            transcribe=Mock(return_value={"segments": [], "language": "fr"})
+        )
+        whisperx = SimpleNamespace(
+            load_model=Mock(return_value=model), load_audio=Mock()
+        )
+        monkeypatch.setitem(sys.modules, "whisperx", whisperx)
+        monkeypatch.setenv("VOICE_NOTES_CACHE_DIR", str(temp_dir / "cache"))
+        monkeypatch.setattr("voice_notes.cli._maybe_load_dotenv", Mock())
+
+        argv = [mock_audio_file_str, "--out", str(temp_dir / "out")]
+        try:
+            main(argv)
+            main(argv)
+        finally:
+            clear_model_cache()
+            clear_audio_cache()
+
+        model.transcribe.assert_called_once()
+
     @patch("voice_notes.cli._process_alignment")
+    @patch("voice_notes.cli._diarize")
     @patch("voice_notes.cli._process_diarization")
-    @patch("voice_notes.cli.load_dotenv")
     def test_main_with_diarization(
         self,
-        mock_load_dotenv: MagicMock,
         mock_process_diarize: MagicMock,
+        mock_diarize: MagicMock,
         mock_process_align: MagicMock,
-        mock_save_basic: MagicMock,
-        mock_transcribe: MagicMock,
+        cli_mocks: SimpleNamespace,
+        whisper_result_en: WhisperResult,
         mock_audio_file: Path,
+        mock_audio_file_str: str,
         temp_dir: Path,
+        monkeypatch: pytest.MonkeyPatch,
     ) -> None:
         """Test main function with diarization."""
-        from voice_notes.transcribe import WhisperResult
-
-        mock_transcribe.return_value = WhisperResult(
-            text="Hello world",
-            segments=[{"text": "Hello world", "start": 0.0, "end": 1.0}],
-            language="en",
-        )
+        cli_mocks.transcribe.return_value = whisper_result_en
         mock_process_align.return_value = [
             {"text": "Hello world", "start": 0.0, "end": 1.0}
         ]
 
-        with patch.object(
-            sys,
-            "argv",
-            [
-                "voice-notes",
-                str(mock_audio_file),
-                "--align",
-                "--diarize",
-                "--language",
-                "en",
-            ],
-        ):
-            with patch("voice_notes.cli.default_output_dir", return_value=temp_dir):
-                with patch.dict(os.environ, {"HUGGINGFACE_TOKEN": "test_token"}):
-                    main()
+        monkeypatch.setenv("HUGGINGFACE_TOKEN", "test_token")
+        with patch("voice_notes.cli.default_output_dir", return_value=temp_dir):
+            main([mock_audio_file_str, "--align", "--diarize", "--language", "en"])
 
         mock_process_diarize.assert_called_once()
+        cli_mocks.load_audio.assert_called_once()
+        audio = cli_mocks.load_audio.return_value
+        assert cli_mocks.transcribe.call_args.kwargs["audio"] is audio
+        assert mock_process_align.call_args.kwargs["audio"] is audio
+        assert mock_process_diarize.call_args.kwargs["audio"] is audio
+        # Diarization ran next to alignment and its result is reused
+        mock_diarize.assert_called_once_with(mock_audio_file, "cpu", None, None, audio)
+        assert (
+            mock_process_diarize.call_args.kwargs["diarization_result"]
+            is mock_diarize.return_value
+        )
 
-    @patch("voice_notes.cli.transcribe_file")
-    @patch("voice_notes.cli._save_basic_transcript")
     @patch("voice_notes.cli._process_summary")
-    @patch("voice_notes.cli.load_dotenv")
     def test_main_with_summary(
         self,
-        mock_load_dotenv: MagicMock,
         mock_process_summary: MagicMock,
-        mock_save_basic: MagicMock,
-        mock_transcribe: MagicMock,
-        mock_audio_file: Path,
+        cli_mocks: SimpleNamespace,
+        whisper_result_en: WhisperResult,
+        mock_audio_file_str: str,
         temp_dir: Path,
+        monkeypatch: pytest.MonkeyPatch,
     ) -> None:
         """Test main function with summary."""
-        from voice_notes.transcribe import WhisperResult
+        cli_mocks.transcribe.return_value = whisper_result_en
 
-        mock_transcribe.return_value = WhisperResult(
-            text="Hello world",
-            segments=[{"text": "Hello world", "start": 0.0, "end": 1.0}],
-            language="en",
-        )
-
-        with patch.object(
-            sys, "argv", ["voice-notes", str(mock_audio_file), "--summarize"]
-        ):
-            with patch("voice_notes.cli.default_output_dir", return_value=temp_dir):
-                with patch.dict(os.environ, {"OPENAI_API_KEY": "test_key"}):
-                    main()
+        monkeypatch.setenv("OPENAI_API_KEY", "test_key")
+        with patch("voice_notes.cli.default_output_dir", return_value=temp_dir):
+            main([mock_audio_file_str, "--summarize"])
 
         mock_process_summary.assert_called_once()
 
-    @patch("voice_notes.cli.load_dotenv")
     def test_main_file_not_found_raises_error(
-        self,
-        mock_load_dotenv: MagicMock,
-        temp_dir: Path,
+        self, cli_mocks: SimpleNamespace, temp_dir: Path
     ) -> None:
         """Test that missing audio file raises FileNotFoundError."""
         non_existent_file = temp_dir / "nonexistent.wav"
-        with patch.object(sys, "argv", ["voice-notes", str(non_existent_file)]):
-            with pytest.raises(FileNotFoundError, match="Audio file not found"):
-                main()
-
-    @patch("voice_notes.cli.transcribe_file")
-    @patch("voice_notes.cli._save_basic_transcript")
-    @patch("voice_notes.cli.load_dotenv")
-    @patch("voice_notes.cli.console")
+        with pytest.raises(FileNotFoundError, match="Audio file not found"):
+            main([str(non_existent_file)])
+
     def test_main_with_custom_output_dir(
         self,
-        mock_console: MagicMock,
-        mock_load_dotenv: MagicMock,
-        mock_save_basic: MagicMock,
-        mock_transcribe: MagicMock,
-        mock_audio_file: Path,
+        cli_mocks: SimpleNamespace,
+        whisper_result_en: WhisperResult,
+        mock_audio_file_str: str,
         temp_dir: Path,
     ) -> None:
         """Test main function with custom output directory."""
-        from voice_notes.transcribe import WhisperResult
-
         custom_out = temp_dir / "custom_output"
-        mock_transcribe.return_value = WhisperResult(
-            text="Hello world",
-            segments=[{"text": "Hello world", "start": 0.0, "end": 1.0}],
-            language="en",
-        )
+        cli_mocks.transcribe.return_value = whisper_result_en
 
-        with patch.object(
-            sys, "argv", ["voice-notes", str(mock_audio_file), "--out", str(custom_out)]
-        ):
-            main()
+        main([mock_audio_file_str, "--out", str(custom_out)])
 
         assert custom_out.exists()
-        mock_save_basic.assert_called_once()
+        cli_mocks.save_basic.assert_called_once()
 
-    @patch("voice_notes.cli.transcribe_file")
-    @patch("voice_notes.cli._save_basic_transcript")
-    @patch("voice_notes.cli.load_dotenv")
-    @patch("voice_notes.cli.console")
     def test_main_with_detected_language(
         self,
-        mock_console: MagicMock,
-        mock_load_dotenv: MagicMock,
-        mock_save_basic: MagicMock,
-        mock_transcribe: MagicMock,
-        mock_audio_file: Path,
+        cli_mocks: SimpleNamespace,
+        whisper_result_fr: WhisperResult,
+        mock_audio_file_str: str,
         temp_dir: Path,
     ) -> None:
         """Test main function prints detected language when available."""
-        from voice_notes.transcribe import WhisperResult
+        cli_mocks.transcribe.return_value = whisper_result_fr
 
-        mock_transcribe.return_value = WhisperResult(
-            text="Hello world",
-            segments=[{"text": "Hello world", "start": 0.0, "end": 1.0}],
-            language="fr",  # Detected language
-        )
-
-        with patch.object(sys, "argv", ["voice-notes", str(mock_audio_file)]):
-            with patch("voice_notes.cli.default_output_dir", return_value=temp_dir):
-                main()
+        with patch("voice_notes.cli.default_output_dir", return_value=temp_dir):
+            main([mock_audio_file_str])
 
         # Check that detected language was printed
-        language_prints = [
-            call
-            for call in mock_console.print.call_args_list
-            if len(call[0]) > 0 and "Detected language" in str(call[0][0])
-        ]
-        assert len(language_prints) == 1
+        assert cli_mocks.labels.count("Detected language:") == 1
 
-    @patch("voice_notes.cli.transcribe_file")
-    @patch("voice_notes.cli._save_basic_transcript")
-    @patch("voice_notes.cli.load_dotenv")
-    @patch("voice_notes.cli.console")
     def test_main_without_detected_language(
         self,
-        mock_console: MagicMock,
-        mock_load_dotenv: MagicMock,
-        mock_save_basic: MagicMock,
-        mock_transcribe: MagicMock,
-        mock_audio_file: Path,
+        cli_mocks: SimpleNamespace,
+        whisper_result_none: WhisperResult,
+        mock_audio_file_str: str,
         temp_dir: Path,
     ) -> None:
         """Test main function does not print language when None."""
-        from voice_notes.transcribe import WhisperResult
-
-        mock_transcribe.return_value = WhisperResult(
-            text="Hello world",
-            segments=[{"text": "Hello world", "start": 0.0, "end": 1.0}],
-            language=None,  # No detected language
-        )
+        cli_mocks.transcribe.return_value = whisper_result_none
 
-        with patch.object(sys, "argv", ["voice-notes", str(mock_audio_file)]):
-            with patch("voice_notes.cli.default_output_dir", return_value=temp_dir):
-                main()
+        with patch("voice_notes.cli.default_output_dir", return_value=temp_dir):
+            main([mock_audio_file_str])
 
         # Check that detected language was NOT printed
-        language_prints = [
-            call
-            for call in mock_console.print.call_args_list
-            if len(call[0]) > 0 and "Detected language" in str(call[0][0])
-        ]
-        assert len(language_prints) == 0
+        assert "Detected language:" not in cli_mocks.labels
 
-    @patch("voice_notes.cli.transcribe_file")
-    @patch("voice_notes.cli._save_basic_transcript")
     @patch("voice_notes.cli._process_summary")
-    @patch("voice_notes.cli.load_dotenv")
-    @patch("voice_notes.cli.console")
     def test_main_summary_failure_non_fatal(
         self,
-        mock_console: MagicMock,
-        mock_load_dotenv: MagicMock,
         mock_process_summary: MagicMock,
-        mock_save_basic: MagicMock,
-        mock_transcribe: MagicMock,
-        mock_audio_file: Path,
+        cli_mocks: SimpleNamespace,
+        whisper_result_en: WhisperResult,
+        mock_audio_file_str: str,
         temp_dir: Path,
+        monkeypatch: pytest.MonkeyPatch,
     ) -> None:
         """Test that summary failures don't crash the program."""
-        from voice_notes.transcribe import WhisperResult
-
-        mock_transcribe.return_value = WhisperResult(
-            text="Hello world",
-            segments=[{"text": "Hello world", "start": 0.0, "end": 1.0}],
-            language="en",
-        )
+        cli_mocks.transcribe.return_value = whisper_result_en
         mock_process_summary.side_effect = RuntimeError("API quota exceeded")
 
-        with patch.object(
-            sys, "argv", ["voice-notes", str(mock_audio_file), "--summarize"]
-        ):
-            with patch("voice_notes.cli.default_output_dir", return_value=temp_dir):
-                with patch.dict(os.environ, {"OPENAI_API_KEY": "test_key"}):
-                    main()  # Should not raise
+        monkeypatch.setenv("OPENAI_API_KEY", "test_key")
+        with patch("voice_notes.cli.default_output_dir", return_value=temp_dir):
+            main([mock_audio_file_str, "--summarize"])  # Should not raise
 
         # Verify warning was printed
-        warning_prints = [
-            call
-            for call in mock_console.print.call_args_list
-            if len(call[0]) > 0 and "Warning" in str(call[0][0])
-        ]
-        assert len(warning_prints) >= 1
-        mock_save_basic.assert_called_once()  # Basic transcription still completed
+        assert "Warning:" in cli_mocks.labels
+        # Basic transcription still completed
+        cli_mocks.save_basic.assert_called_once()
 
-    @patch("voice_notes.cli.transcribe_file")
-    @patch("voice_notes.cli._save_basic_transcript")
-    @patch("voice_notes.cli.load_dotenv")
-    @patch("voice_notes.cli.console")
     def test_main_without_summarize_prints_skip_message(
         self,
-        mock_console: MagicMock,
-        mock_load_dotenv: MagicMock,
-        mock_save_basic: MagicMock,
-        mock_transcribe: MagicMock,
-        mock_audio_file: Path,
+        cli_mocks: SimpleNamespace,
+        whisper_result_en: WhisperResult,
+        mock_audio_file_str: str,
         temp_dir: Path,
     ) -> None:
         """Test that main prints skip message when summarize is not requested."""
-        from voice_notes.transcribe import WhisperResult
+        cli_mocks.transcribe.return_value = whisper_result_en
 
-        mock_transcribe.return_value = WhisperResult(
-            text="Hello world",
-            segments=[{"text": "Hello world", "start": 0.0, "end": 1.0}],
-            language="en",
-        )
-
-        with patch.object(sys, "argv", ["voice-notes", str(mock_audio_file)]):
-            with patch("voice_notes.cli.default_output_dir", return_value=temp_dir):
-                main()
+        with patch("voice_notes.cli.default_output_dir", return_value=temp_dir):
+            main([mock_audio_file_str])
 
         # Check that skip message was printed
-        skip_prints = [
-            call
-            for call in mock_console.print.call_args_list
-            if len(call[0]) > 0 and "Skipping summary" in str(call[0][0])
+        skips = [label for label in cli_mocks.labels if "Skipping summary" in label]
+        assert len(skips) == 1
+
+    def test_main_multiple_files_use_per_file_output_dirs(
+        self,
+        cli_mocks: SimpleNamespace,
+        whisper_result_en: WhisperResult,
+        temp_dir: Path,
+    ) -> None:
+        """Test that a multi-file run writes each file's outputs separately."""
+        first = temp_dir / "first.wav"
+        second = temp_dir / "second.wav"
+        first.write_bytes(b"RIFF")
+        second.write_bytes(b"RIFF")
+        out_dir = temp_dir / "out"
+        cli_mocks.transcribe.return_value = whisper_result_en
+
+        main([str(first), str(second), "--out", str(out_dir)])
+
+        assert cli_mocks.transcribe.call_count == 2
+        saved_dirs = [call.args[1] for call in cli_mocks.save_basic.call_args_list]
+        assert saved_dirs == [out_dir / "first", out_dir / "second"]
+        assert (out_dir / "first").is_dir()
+        assert (out_dir / "second").is_dir()
+
+    @pytest.mark.parametrize(
+        "names",
+        [
+            pytest.param(("talk.wav", "talk.mp3"), id="same-stem"),
+            pytest.param(("a/x.wav", "b/x.wav"), id="same-name"),
+        ],
+    )
+    def test_main_rejects_colliding_output_dirs(
+        self, cli_mocks: SimpleNamespace, temp_dir: Path, names: tuple[str, str]
+    ) -> None:
+        """Test that inputs sharing a stem fail before any file is processed."""
+        paths = [temp_dir / name for name in names]
+        for path in paths:
+            path.parent.mkdir(exist_ok=True)
+            path.write_bytes(b"RIFF")
+
+        with pytest.raises(ValueError, match="would both write to"):
+            main([*map(str, paths), "--out", str(temp_dir / "out")])
+
+        cli_mocks.transcribe.assert_not_called()
+
+    @patch("voice_notes.transcribe.release_models")
+    @patch("voice_notes.cli._process_alignment")
+    def test_main_releases_whisper_after_last_transcription(
+        self,
+        mock_process_align: MagicMock,
+        mock_release: MagicMock,
+        cli_mocks: SimpleNamespace,
+        whisper_result_en: WhisperResult,
+        temp_dir: Path,
+    ) -> None:
+        """Test that Whisper is released before aligning the last file only."""
+        first = temp_dir / "first.wav"
+        second = temp_dir / "second.wav"
+        first.write_bytes(b"RIFF")
+        second.write_bytes(b"RIFF")
+        cli_mocks.transcribe.return_value = whisper_result_en
+        order = Mock()
+        order.attach_mock(cli_mocks.transcribe, "transcribe")
+        order.attach_mock(mock_release, "release")
+
+        main(
+            [
+                str(first),
+                str(second),
+                "--align",
+                "--language",
+                "en",
+                "--out",
+                str(temp_dir / "out"),
+            ]
+        )
+
+        assert [name for name, _, _ in order.mock_calls] == [
+            "transcribe",
+            "transcribe",
+            "release",
         ]
-        assert len(skip_prints) == 1
+        mock_release.assert_called_once_with("cpu")
+        assert mock_process_align.call_count == 2
+
+    def test_main_checks_all_files_before_processing(
+        self, cli_mocks: SimpleNamespace, mock_audio_file_str: str, temp_dir: Path
+    ) -> None:
+        """Test that a missing file aborts the run before any transcription."""
+        missing = temp_dir / "missing.wav"
+        with pytest.raises(FileNotFoundError, match="Audio file not found"):
+            main([mock_audio_file_str, str(missing)])
+
+        cli_mocks.transcribe.assert_not_called()
@@ -2,38 +2,53 @@
 
 from __future__ import annotations
 
+import os
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
-from voice_notes.io_utils import default_output_dir, ensure_dir, write_text
+from voice_notes.io_utils import (
+    default_output_dir,
+    ensure_dir,
+    file_fingerprint,
+    write_text,
+)
+
+# Built once at import; compared as bytes so no read-back decode is needed
+_LONG_TEXT = "A" * 10000
+_LONG_TEXT_BYTES = _LONG_TEXT.encode("utf-8")
+
+# (text, expected file bytes) pairs for the write_text round-trip test
+_UNICODE_TEXT = "Hello 世界 🌍 Здравствуй"
+_SPECIAL_TEXT = "Special chars: !@#$%^&*()[]{}|\\/<>?~`"
+WRITE_CASES = (
+    pytest.param("Line 1\nLine 2\nLine 3", b"Line 1\nLine 2\nLine 3", id="multiline"),
+    pytest.param(_UNICODE_TEXT, _UNICODE_TEXT.encode("utf-8"), id="unicode"),
+    pytest.param(_SPECIAL_TEXT, _SPECIAL_TEXT.encode("utf-8"), id="special"),
+)
 
 
 class TestDefaultOutputDir:
     """Test cases for default_output_dir function."""
 
-    def test_valid_path(self, temp_dir: Path) -> None:
+    # default_output_dir is pure path arithmetic, so none of these paths
+    # need to exist on disk
+
+    def test_valid_path(self) -> None:
         """Test default output dir for valid path."""
-        audio_file = temp_dir / "test_audio.wav"
-        audio_file.touch()
-        result = default_output_dir(audio_file)
-        assert result == temp_dir
+        audio_dir = Path("recordings")
+        assert default_output_dir(audio_dir / "test_audio.wav") == audio_dir
 
-    def test_nested_path(self, temp_dir: Path) -> None:
+    def test_nested_path(self) -> None:
         """Test default output dir for nested path."""
-        nested_dir = temp_dir / "subdir" / "nested"
-        nested_dir.mkdir(parents=True)
-        audio_file = nested_dir / "test_audio.wav"
-        audio_file.touch()
-        result = default_output_dir(audio_file)
-        assert result == nested_dir
-
-    def test_path_with_dots(self, temp_dir: Path) -> None:
+        nested_dir = Path("recordings") / "subdir" / "nested"
+        assert default_output_dir(nested_dir / "test_audio.wav") == nested_dir
+
+    def test_path_with_dots(self) -> None:
         """Test default output dir for path with dots."""
-        audio_file = temp_dir / "test.audio.file.wav"
-        audio_file.touch()
-        result = default_output_dir(audio_file)
-        assert result == temp_dir
+        audio_dir = Path("recordings")
+        assert default_output_dir(audio_dir / "test.audio.file.wav") == audio_dir
 
     def test_none_path_raises_value_error(self) -> None:
         """Test that None path raises ValueError."""
@@ -46,6 +61,39 @@ class TestDefaultOutputDir:
             default_output_dir(Path(""))
 
 
+class TestFileFingerprint:
+    """Test cases for file_fingerprint function."""
+
+    def test_same_content_same_fingerprint(self, temp_dir: Path) -> None:
+        """Test that identical files produce identical fingerprints."""
+        first = temp_dir / "a.wav"
+        second = temp_dir / "b.wav"
+        first.write_bytes(b"audio" * 100)
+        second.write_bytes(b"audio" * 100)
+        assert file_fingerprint(first) == file_fingerprint(second)
+
+    def test_different_content_different_fingerprint(self, temp_dir: Path) -> None:
+        """Test that changed content changes the fingerprint."""
+        file_path = temp_dir / "a.wav"
+        file_path.write_bytes(b"audio")
+        before = file_fingerprint(file_path)
+        file_path.write_bytes(b"other")
+        assert file_fingerprint(file_path) != before
+
+    def test_size_beyond_sample_is_included(self, temp_dir: Path) -> None:
+        """Test that files sharing a prefix but not a size differ."""
+        file_path = temp_dir / "a.wav"
+        file_path.write_bytes(b"abcd")
+        before = file_fingerprint(file_path, sample_size=2)
+        file_path.write_bytes(b"abcdef")
+        assert file_fingerprint(file_path, sample_size=2) != before
+
+    def test_missing_file_raises(self, temp_dir: Path) -> None:
+        """Test that a missing file raises OSError."""
+        with pytest.raises(OSError):
+            file_fingerprint(temp_dir / "missing.wav")
+
+
 class TestEnsureDir:
     """Test cases for ensure_dir function."""
 
@@ -53,7 +101,6 @@ class TestEnsureDir:
         """Test creating a new directory."""
         new_dir = temp_dir / "new_dir"
         ensure_dir(new_dir)
-        assert new_dir.exists()
         assert new_dir.is_dir()
 
     def test_existing_directory(self, temp_dir: Path) -> None:
@@ -61,17 +108,29 @@ class TestEnsureDir:
         existing_dir = temp_dir / "existing_dir"
         existing_dir.mkdir()
         ensure_dir(existing_dir)
-        assert existing_dir.exists()
         assert existing_dir.is_dir()
 
     def test_nested_paths(self, temp_dir: Path) -> None:
         """Test creating nested directory paths."""
         nested_dir = temp_dir / "level1" / "level2" / "level3"
         ensure_dir(nested_dir)
-        assert nested_dir.exists()
+        # A directory can only exist if its parents do, so one stat suffices
         assert nested_dir.is_dir()
-        assert (temp_dir / "level1").exists()
-        assert (temp_dir / "level1" / "level2").exists()
+
+    def test_removed_directory_is_recreated(self, temp_dir: Path) -> None:
+        """Test that a directory removed after a first call is created again."""
+        out_dir = temp_dir / "out"
+        ensure_dir(out_dir)
+        out_dir.rmdir()
+        ensure_dir(out_dir)
+        assert out_dir.is_dir()
+
+    def test_mkdir_failure_raises_os_error(self, temp_dir: Path) -> None:
+        """Test that mkdir failures are wrapped in OSError."""
+        blocker = temp_dir / "blocker"
+        blocker.write_text("not a directory", encoding="utf-8")
+        with pytest.raises(OSError, match="Failed to create directory"):
+            ensure_dir(blocker / "child")
 
     def test_none_path_raises_value_error(self) -> None:
         """Test that None path raises ValueError."""
@@ -87,41 +146,45 @@ class TestEnsureDir:
 class TestWriteText:
     """Test cases for write_text function."""
 
-    def test_normal_write(self, temp_dir: Path) -> None:
+    @pytest.fixture
+    def file_path(self, class_temp_dir: Path, request: pytest.FixtureRequest) -> Path:
+        """Get an output path unique to the running test.
+
+        Args:
+            class_temp_dir: Directory shared by this class's tests.
+            request: Pytest request for the running test.
+
+        Returns:
+            Path in the class's shared directory named after the test.
+        """
+        return class_temp_dir / f"{request.node.name}.txt"
+
+    def test_normal_write(self, file_path: Path) -> None:
         """Test writing normal text to file."""
-        file_path = temp_dir / "test.txt"
         content = "Hello, world!"
         write_text(file_path, content)
         assert file_path.exists()
-        assert file_path.read_text(encoding="utf-8") == content
+        assert file_path.read_bytes() == content.encode("utf-8")
 
-    def test_empty_text(self, temp_dir: Path) -> None:
+    def test_empty_text(self, file_path: Path) -> None:
         """Test writing empty text."""
-        file_path = temp_dir / "empty.txt"
         write_text(file_path, "")
         assert file_path.exists()
-        assert file_path.read_text(encoding="utf-8") == ""
+        assert file_path.read_bytes() == b""
 
-    def test_multiline_text(self, temp_dir: Path) -> None:
-        """Test writing multiline text."""
-        file_path = temp_dir / "multiline.txt"
-        content = "Line 1\nLine 2\nLine 3"
+    @pytest.mark.parametrize(("content", "expected"), WRITE_CASES)
+    def test_content_is_written_as_utf8(
+        self, file_path: Path, content: str, expected: bytes
+    ) -> None:
+        """Test writing multiline, unicode and special-character text."""
         write_text(file_path, content)
-        assert file_path.read_text(encoding="utf-8") == content
+        assert file_path.read_bytes() == expected
 
-    def test_unicode_text(self, temp_dir: Path) -> None:
-        """Test writing unicode text."""
-        file_path = temp_dir / "unicode.txt"
-        content = "Hello 世界 🌍 Здравствуй"
-        write_text(file_path, content)
-        assert file_path.read_text(encoding="utf-8") == content
-
-    def test_overwrite_existing_file(self, temp_dir: Path) -> None:
+    def test_overwrite_existing_file(self, file_path: Path) -> None:
         """Test overwriting existing file."""
-        file_path = temp_dir / "existing.txt"
         file_path.write_text("Old content", encoding="utf-8")
         write_text(file_path, "New content")
-        assert file_path.read_text(encoding="utf-8") == "New content"
+        assert file_path.read_bytes() == b"New content"
 
     def test_none_path_raises_value_error(self) -> None:
         """Test that None path raises ValueError."""
@@ -133,23 +196,32 @@ class TestWriteText:
         with pytest.raises(ValueError, match="path cannot be None or empty"):
             write_text(Path(""), "content")
 
-    def test_none_text_raises_value_error(self, temp_dir: Path) -> None:
+    def test_none_text_raises_value_error(self, file_path: Path) -> None:
         """Test that None text raises ValueError."""
-        file_path = temp_dir / "test.txt"
         with pytest.raises(ValueError, match="text cannot be None"):
             write_text(file_path, None)  # type: ignore[arg-type]
 
-    def test_special_characters(self, temp_dir: Path) -> None:
-        """Test writing text with special characters."""
-        file_path = temp_dir / "special.txt"
-        content = "Special chars: !@#$%^&*()[]{}|\\/<>?~`"
-        write_text(file_path, content)
-        assert file_path.read_text(encoding="utf-8") == content
-
-    def test_very_long_text(self, temp_dir: Path) -> None:
+    def test_very_long_text(self, file_path: Path) -> None:
         """Test writing very long text."""
-        file_path = temp_dir / "long.txt"
-        content = "A" * 10000
-        write_text(file_path, content)
-        assert file_path.read_text(encoding="utf-8") == content
-        assert len(file_path.read_text(encoding="utf-8")) == 10000
+        write_text(file_path, _LONG_TEXT)
+        assert file_path.read_bytes() == _LONG_TEXT_BYTES
+
+    def test_partial_writes_are_completed(self, file_path: Path) -> None:
+        """Test that short os.write results are retried until all bytes land."""
+        content = "chunked content"
+        real_write = os.write
+
+        def short_write(fd: int, data: bytes) -> int:
+            return real_write(fd, bytes(data[:4]))
+
+        with patch("voice_notes.io_utils.os.write", side_effect=short_write):
+            write_text(file_path, content)
+        assert file_path.read_bytes() == content.encode("utf-8")
+
+    def test_write_into_missing_directory_raises_os_error(
+        self, file_path: Path
+    ) -> None:
+        """Test that write failures are wrapped in OSError."""
+        file_path = file_path.parent / "missing" / file_path.name
+        with pytest.raises(OSError, match="Failed to write file"):
+            write_text(file_path, "content")
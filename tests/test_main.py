@@ -0,0 +1,17 @@
+"""Tests for the package __main__ module."""
+
+from __future__ import annotations
+
+import runpy
+from unittest.mock import MagicMock, patch
+
+
+class TestMainModule:
+    """Test cases for running the package with python -m."""
+
+    @patch("voice_notes.cli.main")
+    def test_run_module_calls_cli_main(self, mock_main: MagicMock) -> None:
+        """Test that python -m voice_notes dispatches to the CLI."""
+        runpy.run_module("voice_notes", run_name="__main__")
+
+        mock_main.assert_called_once_with()
@@ -2,22 +2,69 @@
 
 from __future__ import annotations
 
-from unittest.mock import MagicMock, patch
+import asyncio
+import dataclasses
+import json
+import os
+import subprocess
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
 import pytest
 from openai import APIError, RateLimitError
 
-from voice_notes.summarize import Summary, summarize_transcript
+from voice_notes import summarize
+from voice_notes.summarize import (
+    Summary,
+    summarize_transcript,
+    summarize_transcripts,
+    summarize_transcripts_batch,
+)
+
+# 16,000 characters; built once at import
+_LONG_TRANSCRIPT = "This is a test. " * 1000
+
+
+def _stub_client(create: Mock) -> SimpleNamespace:
+    """Build an OpenAI client stub exposing only chat.completions.create."""
+    return SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+    )
+
+
+@pytest.fixture(autouse=True)
+def clear_client_cache() -> Iterator[None]:
+    """Start and finish every test with an empty OpenAI client cache."""
+    summarize._CLIENT_CACHE.clear()
+    yield
+    summarize._CLIENT_CACHE.clear()
 
 
 class TestSummarizeTranscript:
     """Test cases for summarize_transcript function."""
 
-    @patch("voice_notes.summarize.OpenAI")
+    @pytest.fixture
+    def mock_openai_class(self, monkeypatch: pytest.MonkeyPatch) -> MagicMock:
+        """Replace the OpenAI client class for one test.
+
+        Args:
+            monkeypatch: Pytest monkeypatch fixture.
+
+        Returns:
+            Mock standing in for openai.OpenAI.
+        """
+        mock_class = MagicMock()
+        monkeypatch.setattr("openai.OpenAI", mock_class)
+        return mock_class
+
     def test_successful_summarization(
         self,
         mock_openai_class: MagicMock,
-        mock_openai_client: MagicMock,
+        mock_openai_client: SimpleNamespace,
     ) -> None:
         """Test successful summarization with valid inputs."""
         mock_openai_class.return_value = mock_openai_client
@@ -36,11 +83,135 @@ class TestSummarizeTranscript:
         mock_openai_class.assert_called_once_with(api_key="test_api_key")
         mock_openai_client.chat.completions.create.assert_called_once()
 
-    @patch("voice_notes.summarize.OpenAI")
+    def test_client_reused_for_same_api_key(
+        self,
+        mock_openai_class: MagicMock,
+        mock_openai_client: SimpleNamespace,
+    ) -> None:
+        """Test that one client is shared by calls with the same API key."""
+        mock_openai_class.return_value = mock_openai_client
+
+        summarize_transcript(transcript="First", api_key="test_api_key")
+        summarize_transcript(transcript="Second", api_key="test_api_key")
+        summarize_transcript(transcript="Third", api_key="other_api_key")
+
+        assert mock_openai_class.call_count == 2
+        assert mock_openai_client.chat.completions.create.call_count == 3
+
+    def test_cached_summary_reused(
+        self,
+        mock_openai_class: MagicMock,
+        mock_openai_client: SimpleNamespace,
+        temp_dir: Path,
+    ) -> None:
+        """Test that a cached summary skips the API call."""
+        mock_openai_class.return_value = mock_openai_client
+
+        with patch.dict(os.environ, {"VOICE_NOTES_CACHE_DIR": str(temp_dir)}):
+            first = summarize_transcript("Notes", api_key="key", cache_enabled=True)
+            second = summarize_transcript("Notes", api_key="key", cache_enabled=True)
+            summarize_transcript(
+                "Notes", model="gpt-4o", api_key="key", cache_enabled=True
+            )
+
+        assert second == first
+        assert mock_openai_client.chat.completions.create.call_count == 2
+
+    def test_output_is_bounded(
+        self,
+        mock_openai_class: MagicMock,
+        mock_openai_client: SimpleNamespace,
+    ) -> None:
+        """Test that requests cap output tokens and use a low temperature."""
+        mock_openai_class.return_value = mock_openai_client
+
+        summarize_transcript("Notes", api_key="key")
+        summarize_transcript("Notes", api_key="key", max_tokens=200)
+
+        first, second = mock_openai_client.chat.completions.create.call_args_list
+        assert first.kwargs["max_completion_tokens"] == 1024
+        assert first.kwargs["temperature"] == 0.2
+        assert second.kwargs["max_completion_tokens"] == 200
+
+    def test_requests_share_cacheable_prefix(
+        self,
+        mock_openai_class: MagicMock,
+        mock_openai_client: SimpleNamespace,
+    ) -> None:
+        """Test that every request starts with the same system message."""
+        mock_openai_class.return_value = mock_openai_client
+
+        summarize_transcript("First meeting", api_key="key")
+        summarize_transcript("Second meeting", api_key="key")
+
+        first, second = mock_openai_client.chat.completions.create.call_args_list
+        assert first.kwargs["messages"][0] == second.kwargs["messages"][0]
+        assert first.kwargs["messages"][0]["role"] == "system"
+        assert first.kwargs["messages"][-1]["content"].endswith("First meeting")
+        assert first.kwargs["prompt_cache_key"] == second.kwargs["prompt_cache_key"]
+
+    def test_streamed_summary(
+        self,
+        mock_openai_class: MagicMock,
+        mock_openai_client: SimpleNamespace,
+        temp_dir: Path,
+    ) -> None:
+        """Test that streamed text is reported as it arrives and cached whole."""
+        mock_openai_class.return_value = mock_openai_client
+
+        def chunk(content: str | None) -> MagicMock:
+            piece = MagicMock()
+            piece.choices = [MagicMock()]
+            piece.choices[0].delta.content = content
+            return piece
+
+        usage_chunk = MagicMock(choices=[])
+        mock_openai_client.chat.completions.create.return_value = iter(
+            [chunk("## Sum"), chunk(None), chunk("mary"), usage_chunk]
+        )
+        deltas: list[str] = []
+
+        with patch.dict(os.environ, {"VOICE_NOTES_CACHE_DIR": str(temp_dir)}):
+            result = summarize_transcript(
+                "Notes", api_key="key", cache_enabled=True, on_delta=deltas.append
+            )
+            cached = summarize_transcript(
+                "Notes", api_key="key", cache_enabled=True, on_delta=deltas.append
+            )
+
+        assert result == Summary(markdown="## Summary", text="## Summary")
+        assert cached == result
+        assert deltas == ["## Sum", "mary", "## Summary"]
+        create = mock_openai_client.chat.completions.create
+        create.assert_called_once()
+        assert create.call_args.kwargs["stream"] is True
+
+    def test_invalid_max_tokens_raises_value_error(self) -> None:
+        """Test that a non-positive output budget is rejected."""
+        with pytest.raises(ValueError, match="max_tokens must be at least 1"):
+            summarize_transcript("Notes", api_key="key", max_tokens=0)
+
+    def test_system_message_shared_across_calls(
+        self,
+        mock_openai_class: MagicMock,
+        mock_openai_client: SimpleNamespace,
+    ) -> None:
+        """Test that the system message is sent ahead of the transcript."""
+        mock_openai_class.return_value = mock_openai_client
+
+        summarize_transcript(transcript="Test transcript", api_key="test_api_key")
+
+        messages = mock_openai_client.chat.completions.create.call_args.kwargs[
+            "messages"
+        ]
+        assert messages[0] is summarize._SYSTEM_MESSAGE
+        assert messages[1]["role"] == "user"
+        assert messages[1]["content"].endswith("Test transcript")
+
     def test_summarization_with_default_model(
         self,
         mock_openai_class: MagicMock,
-        mock_openai_client: MagicMock,
+        mock_openai_client: SimpleNamespace,
     ) -> None:
         """Test summarization with default model."""
         mock_openai_class.return_value = mock_openai_client
@@ -56,11 +227,10 @@ class TestSummarizeTranscript:
         assert call_args is not None
         assert call_args.kwargs["model"] == "gpt-4o-mini"
 
-    @patch("voice_notes.summarize.OpenAI")
     def test_summarization_with_custom_model(
         self,
         mock_openai_class: MagicMock,
-        mock_openai_client: MagicMock,
+        mock_openai_client: SimpleNamespace,
     ) -> None:
         """Test summarization with custom model."""
         mock_openai_class.return_value = mock_openai_client
@@ -76,18 +246,16 @@ class TestSummarizeTranscript:
         assert call_args is not None
         assert call_args.kwargs["model"] == "gpt-4"
 
-    @patch("voice_notes.summarize.OpenAI")
     def test_summarization_with_long_transcript(
         self,
         mock_openai_class: MagicMock,
-        mock_openai_client: MagicMock,
+        mock_openai_client: SimpleNamespace,
     ) -> None:
         """Test summarization with long transcript."""
         mock_openai_class.return_value = mock_openai_client
-        long_transcript = "This is a test. " * 1000
 
         result = summarize_transcript(
-            transcript=long_transcript,
+            transcript=_LONG_TRANSCRIPT,
             api_key="test_api_key",
         )
 
@@ -95,131 +263,105 @@ class TestSummarizeTranscript:
         # Verify transcript was included in the request
         call_args = mock_openai_client.chat.completions.create.call_args
         assert call_args is not None
-        assert long_transcript in str(call_args.kwargs["messages"])
-
-    def test_empty_api_key_raises_value_error(self) -> None:
-        """Test that empty API key raises ValueError."""
-        with pytest.raises(ValueError, match="OpenAI API key is required"):
-            summarize_transcript(
-                transcript="Test transcript",
-                api_key="",
-            )
-
-    def test_none_api_key_raises_value_error(self) -> None:
-        """Test that None API key raises ValueError."""
-        with pytest.raises(ValueError, match="OpenAI API key is required"):
-            summarize_transcript(
-                transcript="Test transcript",
-                api_key=None,  # type: ignore[arg-type]
-            )
-
-    def test_empty_transcript_raises_value_error(self) -> None:
-        """Test that empty transcript raises ValueError."""
-        with pytest.raises(ValueError, match="transcript cannot be empty"):
-            summarize_transcript(
-                transcript="",
-                api_key="test_api_key",
-            )
-
-    def test_whitespace_only_transcript_raises_value_error(self) -> None:
-        """Test that whitespace-only transcript raises ValueError."""
-        with pytest.raises(ValueError, match="transcript cannot be empty"):
-            summarize_transcript(
-                transcript="   \n\t  ",
-                api_key="test_api_key",
-            )
-
-    def test_empty_model_raises_value_error(self) -> None:
-        """Test that empty model raises ValueError."""
-        with pytest.raises(ValueError, match="model cannot be empty"):
-            summarize_transcript(
-                transcript="Test transcript",
-                model="",
-                api_key="test_api_key",
-            )
-
-    def test_whitespace_only_model_raises_value_error(self) -> None:
-        """Test that whitespace-only model raises ValueError."""
-        with pytest.raises(ValueError, match="model cannot be empty"):
-            summarize_transcript(
-                transcript="Test transcript",
-                model="   ",
-                api_key="test_api_key",
-            )
-
-    @patch("voice_notes.summarize.OpenAI")
-    def test_missing_choices_in_response_raises_runtime_error(
-        self,
-        mock_openai_class: MagicMock,
+        user_message = call_args.kwargs["messages"][-1]
+        assert user_message["content"].endswith(_LONG_TRANSCRIPT)
+
+    @pytest.mark.parametrize(
+        ("kwargs", "message"),
+        [
+            pytest.param(
+                {"transcript": "Test transcript", "api_key": ""},
+                "OpenAI API key is required",
+                id="empty-api-key",
+            ),
+            pytest.param(
+                {"transcript": "Test transcript", "api_key": None},
+                "OpenAI API key is required",
+                id="none-api-key",
+            ),
+            pytest.param(
+                {"transcript": "", "api_key": "test_api_key"},
+                "transcript cannot be empty",
+                id="empty-transcript",
+            ),
+            pytest.param(
+                {"transcript": "   \n\t  ", "api_key": "test_api_key"},
+                "transcript cannot be empty",
+                id="whitespace-transcript",
+            ),
+            pytest.param(
+                {
+                    "transcript": "Test transcript",
+                    "model": "",
+                    "api_key": "test_api_key",
+                },
+                "model cannot be empty",
+                id="empty-model",
+            ),
+            pytest.param(
+                {
+                    "transcript": "Test transcript",
+                    "model": "   ",
+                    "api_key": "test_api_key",
+                },
+                "model cannot be empty",
+                id="whitespace-model",
+            ),
+        ],
+    )
+    def test_invalid_arguments_raise_value_error(
+        self, kwargs: dict[str, Any], message: str
     ) -> None:
-        """Test that missing choices in API response raises RuntimeError."""
-        mock_client = MagicMock()
-        mock_response = MagicMock()
-        mock_response.choices = None
-        mock_client.chat.completions.create.return_value = mock_response
-        mock_openai_class.return_value = mock_client
-
-        with pytest.raises(RuntimeError, match="Invalid API response: missing choices"):
-            summarize_transcript(
-                transcript="Test transcript",
-                api_key="test_api_key",
-            )
-
-    @patch("voice_notes.summarize.OpenAI")
-    def test_empty_choices_list_raises_runtime_error(
+        """Test that missing or blank arguments raise ValueError."""
+        with pytest.raises(ValueError, match=message):
+            summarize_transcript(**kwargs)
+
+    @pytest.mark.parametrize(
+        ("response_fixture", "message"),
+        [
+            pytest.param(
+                "missing_choices_response",
+                "Invalid API response: missing choices",
+                id="missing-choices",
+            ),
+            pytest.param(
+                "empty_choices_response",
+                "Invalid API response: empty choices list",
+                id="empty-choices",
+            ),
+            pytest.param(
+                "missing_message_response",
+                "Invalid API response: missing message",
+                id="missing-message",
+            ),
+        ],
+    )
+    def test_malformed_response_raises_runtime_error(
         self,
         mock_openai_class: MagicMock,
+        request: pytest.FixtureRequest,
+        response_fixture: str,
+        message: str,
     ) -> None:
-        """Test that empty choices list raises RuntimeError."""
-        mock_client = MagicMock()
-        mock_response = MagicMock()
-        mock_response.choices = []
-        mock_client.chat.completions.create.return_value = mock_response
-        mock_openai_class.return_value = mock_client
-
-        with pytest.raises(
-            RuntimeError, match="Invalid API response: empty choices list"
-        ):
-            summarize_transcript(
-                transcript="Test transcript",
-                api_key="test_api_key",
-            )
+        """Test that responses without a usable message raise RuntimeError."""
+        response = request.getfixturevalue(response_fixture)
+        mock_openai_class.return_value = _stub_client(Mock(return_value=response))
 
-    @patch("voice_notes.summarize.OpenAI")
-    def test_missing_message_in_response_raises_runtime_error(
-        self,
-        mock_openai_class: MagicMock,
-    ) -> None:
-        """Test that missing message in response raises RuntimeError."""
-        mock_client = MagicMock()
-        mock_response = MagicMock()
-        mock_choice = MagicMock()
-        mock_choice.message = None
-        mock_response.choices = [mock_choice]
-        mock_client.chat.completions.create.return_value = mock_response
-        mock_openai_class.return_value = mock_client
-
-        with pytest.raises(RuntimeError, match="Invalid API response: missing message"):
+        with pytest.raises(RuntimeError, match=message):
             summarize_transcript(
                 transcript="Test transcript",
                 api_key="test_api_key",
             )
 
-    @patch("voice_notes.summarize.OpenAI")
     def test_none_content_in_message_returns_empty_summary(
         self,
         mock_openai_class: MagicMock,
+        none_content_response: SimpleNamespace,
     ) -> None:
         """Test that None content in message returns empty summary."""
-        mock_client = MagicMock()
-        mock_response = MagicMock()
-        mock_choice = MagicMock()
-        mock_message = MagicMock()
-        mock_message.content = None
-        mock_choice.message = mock_message
-        mock_response.choices = [mock_choice]
-        mock_client.chat.completions.create.return_value = mock_response
-        mock_openai_class.return_value = mock_client
+        mock_openai_class.return_value = _stub_client(
+            Mock(return_value=none_content_response)
+        )
 
         result = summarize_transcript(
             transcript="Test transcript",
@@ -230,113 +372,409 @@ class TestSummarizeTranscript:
         assert result.markdown == ""
         assert result.text == ""
 
-    @patch("voice_notes.summarize.OpenAI")
-    def test_api_exception_raises_runtime_error(
+    @pytest.mark.parametrize(
+        ("error", "expected", "message"),
+        [
+            pytest.param(
+                Exception("API error"),
+                RuntimeError,
+                "Failed to generate summary",
+                id="unexpected-error",
+            ),
+            pytest.param(
+                ValueError("Invalid input"),
+                ValueError,
+                "Invalid input",
+                id="value-error-passed-through",
+            ),
+            pytest.param(
+                RuntimeError("Runtime error"),
+                RuntimeError,
+                "Runtime error",
+                id="runtime-error-passed-through",
+            ),
+            pytest.param(
+                RateLimitError(
+                    message="Rate limit exceeded",
+                    response=MagicMock(),
+                    body={"error": {"message": "Rate limit exceeded"}},
+                ),
+                RuntimeError,
+                "OpenAI API quota exceeded",
+                id="rate-limit",
+            ),
+            pytest.param(
+                APIError(
+                    message="API error",
+                    request=MagicMock(),
+                    body={"error": {"message": "API error"}},
+                ),
+                RuntimeError,
+                "OpenAI API error",
+                id="api-error",
+            ),
+        ],
+    )
+    def test_api_call_errors(
         self,
         mock_openai_class: MagicMock,
+        error: Exception,
+        expected: type[Exception],
+        message: str,
     ) -> None:
-        """Test that API exceptions are wrapped in RuntimeError."""
-        mock_client = MagicMock()
-        mock_client.chat.completions.create.side_effect = Exception("API error")
-        mock_openai_class.return_value = mock_client
+        """Test that API errors are wrapped or passed through as documented."""
+        mock_openai_class.return_value = _stub_client(Mock(side_effect=error))
 
-        with pytest.raises(RuntimeError, match="Failed to generate summary"):
+        with pytest.raises(expected, match=message):
             summarize_transcript(
                 transcript="Test transcript",
                 api_key="test_api_key",
             )
 
-    @patch("voice_notes.summarize.OpenAI")
-    def test_value_error_passed_through(
+    def test_none_response_raises_runtime_error(
         self,
         mock_openai_class: MagicMock,
     ) -> None:
-        """Test that ValueError exceptions are passed through."""
-        mock_client = MagicMock()
-        mock_client.chat.completions.create.side_effect = ValueError("Invalid input")
-        mock_openai_class.return_value = mock_client
+        """Test that None response raises RuntimeError."""
+        mock_openai_class.return_value = _stub_client(Mock(return_value=None))
 
-        with pytest.raises(ValueError, match="Invalid input"):
+        with pytest.raises(RuntimeError, match="Invalid API response: missing choices"):
             summarize_transcript(
                 transcript="Test transcript",
                 api_key="test_api_key",
             )
 
-    @patch("voice_notes.summarize.OpenAI")
-    def test_runtime_error_passed_through(
-        self,
-        mock_openai_class: MagicMock,
-    ) -> None:
-        """Test that RuntimeError exceptions are passed through."""
-        mock_client = MagicMock()
-        mock_client.chat.completions.create.side_effect = RuntimeError("Runtime error")
-        mock_openai_class.return_value = mock_client
 
-        with pytest.raises(RuntimeError, match="Runtime error"):
-            summarize_transcript(
-                transcript="Test transcript",
-                api_key="test_api_key",
-            )
+def _make_response(content: str) -> MagicMock:
+    """Build a chat completion response carrying the given content."""
+    response = MagicMock()
+    response.choices = [MagicMock()]
+    response.choices[0].message.content = content
+    return response
 
-    @patch("voice_notes.summarize.OpenAI")
-    def test_rate_limit_error_raises_runtime_error(
-        self,
-        mock_openai_class: MagicMock,
+
+@pytest.fixture
+def mock_async_openai() -> Iterator[MagicMock]:
+    """Patch AsyncOpenAI with a client whose create() echoes the transcript."""
+
+    async def create(messages: list[dict[str, str]], **kwargs: object) -> MagicMock:
+        return _make_response(messages[-1]["content"].rsplit("\n", 1)[-1])
+
+    client = MagicMock()
+    client.chat.completions.create = AsyncMock(side_effect=create)
+    client.close = AsyncMock()
+    with patch("openai.AsyncOpenAI", return_value=client) as mock_class:
+        yield mock_class
+
+
+class TestSummarizeTranscripts:
+    """Test cases for summarize_transcripts function."""
+
+    def test_results_in_input_order(self, mock_async_openai: MagicMock) -> None:
+        """Test that one summary per transcript is returned in order."""
+        results = summarize_transcripts(["one", "two", "three"], api_key="key")
+
+        assert [r.text for r in results] == ["one", "two", "three"]
+        mock_async_openai.assert_called_once_with(api_key="key")
+        mock_async_openai.return_value.close.assert_awaited_once()
+
+    def test_concurrency_is_bounded(self, mock_async_openai: MagicMock) -> None:
+        """Test that no more than max_concurrency requests run at once."""
+        in_flight = 0
+        peak = 0
+
+        async def create(messages: list[dict[str, str]], **kwargs: object) -> MagicMock:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0)
+            in_flight -= 1
+            return _make_response("ok")
+
+        client = mock_async_openai.return_value
+        client.chat.completions.create.side_effect = create
+
+        results = summarize_transcripts(["t"] * 6, api_key="key", max_concurrency=2)
+
+        assert len(results) == 6
+        assert peak == 2
+
+    def test_empty_list_makes_no_requests(self, mock_async_openai: MagicMock) -> None:
+        """Test that an empty batch returns without creating a client."""
+        assert summarize_transcripts([], api_key="key") == []
+        mock_async_openai.assert_not_called()
+
+    def test_api_error_raises_runtime_error(self, mock_async_openai: MagicMock) -> None:
+        """Test that request failures are wrapped and the client is closed."""
+        client = mock_async_openai.return_value
+        client.chat.completions.create.side_effect = Exception("boom")
+
+        with pytest.raises(RuntimeError, match="Failed to generate summary: boom"):
+            summarize_transcripts(["one"], api_key="key")
+        client.close.assert_awaited_once()
+
+    def test_failure_cancels_other_requests_before_close(
+        self, mock_async_openai: MagicMock
+    ) -> None:
+        """Test that requests still in flight are cancelled before close."""
+        events: list[str] = []
+
+        async def create(messages: list[dict[str, str]], **kwargs: object) -> MagicMock:
+            if messages[-1]["content"].endswith("fail"):
+                raise Exception("boom")
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                events.append("cancelled")
+                raise
+            return _make_response("unreachable")
+
+        client = mock_async_openai.return_value
+        client.chat.completions.create.side_effect = create
+        client.close.side_effect = lambda: events.append("closed")
+
+        with pytest.raises(RuntimeError, match="boom"):
+            summarize_transcripts(["slow", "fail"], api_key="key")
+
+        assert events == ["cancelled", "closed"]
+
+    def test_invalid_response_raises_runtime_error(
+        self, mock_async_openai: MagicMock
+    ) -> None:
+        """Test that malformed responses raise RuntimeError."""
+        client = mock_async_openai.return_value
+        client.chat.completions.create.side_effect = None
+        client.chat.completions.create.return_value = None
+
+        with pytest.raises(RuntimeError, match="Invalid API response"):
+            summarize_transcripts(["one"], api_key="key")
+
+    @pytest.mark.parametrize(
+        ("kwargs", "message"),
+        [
+            ({"transcripts": ["t"]}, "OpenAI API key is required"),
+            ({"transcripts": ["t"], "api_key": "key", "model": ""}, "model"),
+            ({"transcripts": ["t", " "], "api_key": "key"}, "transcript"),
+            (
+                {"transcripts": ["t"], "api_key": "key", "max_concurrency": 0},
+                "max_concurrency",
+            ),
+        ],
+    )
+    def test_invalid_arguments_raise_value_error(
+        self, mock_async_openai: MagicMock, kwargs: dict, message: str
     ) -> None:
-        """Test that RateLimitError is caught and wrapped in RuntimeError."""
-        mock_client = MagicMock()
-        # Create RateLimitError with required keyword-only parameters
-        mock_response = MagicMock()
-        rate_limit_error = RateLimitError(
-            message="Rate limit exceeded",
-            response=mock_response,
-            body={"error": {"message": "Rate limit exceeded"}},
+        """Test that invalid arguments raise ValueError before any request."""
+        with pytest.raises(ValueError, match=message):
+            summarize_transcripts(**kwargs)
+        mock_async_openai.assert_not_called()
+
+
+def _batch_line(custom_id: str, content: str, status_code: int = 200) -> str:
+    """Build one Batch API output line."""
+    body = {"choices": [{"message": {"content": content}}]}
+    return json.dumps(
+        {
+            "custom_id": custom_id,
+            "response": {"status_code": status_code, "body": body},
+            "error": None,
+        }
+    )
+
+
+# Error file line for a request the API rejected
+_BATCH_ERROR_LINE = json.dumps(
+    {
+        "custom_id": "t-1",
+        "response": {
+            "status_code": 400,
+            "body": {"error": {"message": "Invalid model"}},
+        },
+        "error": None,
+    }
+)
+
+
+@pytest.fixture
+def mock_batch_client() -> Iterator[MagicMock]:
+    """Patch OpenAI with a client whose batch finishes after one poll."""
+    client = MagicMock()
+    client.files.create.return_value.id = "file-in"
+    client.batches.create.return_value = MagicMock(
+        id="batch-1", status="in_progress", output_file_id=None
+    )
+    client.batches.retrieve.return_value = MagicMock(
+        id="batch-1", status="completed", output_file_id="file-out", error_file_id=None
+    )
+    # Results may come back in any order
+    client.files.content.return_value.text = "\n".join(
+        [_batch_line("t-1", "second"), _batch_line("t-0", "first"), ""]
+    )
+    with (
+        patch("openai.OpenAI", return_value=client),
+        patch("voice_notes.summarize.time.sleep") as mock_sleep,
+    ):
+        client.sleep = mock_sleep
+        yield client
+
+
+class TestSummarizeTranscriptsBatch:
+    """Test cases for summarize_transcripts_batch function."""
+
+    def test_successful_batch(self, mock_batch_client: MagicMock) -> None:
+        """Test that a completed batch yields summaries in input order."""
+        results = summarize_transcripts_batch(
+            ["one", "two"], api_key="key", poll_interval=5.0
         )
-        mock_client.chat.completions.create.side_effect = rate_limit_error
-        mock_openai_class.return_value = mock_client
 
-        with pytest.raises(RuntimeError, match="OpenAI API quota exceeded"):
-            summarize_transcript(
-                transcript="Test transcript",
-                api_key="test_api_key",
-            )
+        assert [r.text for r in results] == ["first", "second"]
+        upload = mock_batch_client.files.create.call_args.kwargs
+        assert upload["purpose"] == "batch"
+        lines = [json.loads(line) for line in upload["file"][1].splitlines()]
+        assert [line["custom_id"] for line in lines] == ["t-0", "t-1"]
+        assert lines[0]["url"] == "/v1/chat/completions"
+        assert lines[0]["body"]["messages"][-1]["content"].endswith("one")
+        mock_batch_client.batches.create.assert_called_once_with(
+            input_file_id="file-in",
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        mock_batch_client.sleep.assert_called_once_with(5.0)
+        mock_batch_client.files.content.assert_called_once_with("file-out")
 
-    @patch("voice_notes.summarize.OpenAI")
-    def test_api_error_raises_runtime_error(
-        self,
-        mock_openai_class: MagicMock,
-    ) -> None:
-        """Test that APIError is caught and wrapped in RuntimeError."""
-        mock_client = MagicMock()
-        # Create APIError with required parameters:
-        # request (positional) and body (keyword-only)
-        mock_request = MagicMock()
-        api_error = APIError(
-            message="API error",
-            request=mock_request,
-            body={"error": {"message": "API error"}},
+    def test_use_batch_api_flag(self, mock_batch_client: MagicMock) -> None:
+        """Test that summarize_transcripts dispatches to the Batch API."""
+        results = summarize_transcripts(
+            ["one", "two"], api_key="key", use_batch_api=True
         )
-        mock_client.chat.completions.create.side_effect = api_error
-        mock_openai_class.return_value = mock_client
 
-        with pytest.raises(RuntimeError, match="OpenAI API error"):
-            summarize_transcript(
-                transcript="Test transcript",
-                api_key="test_api_key",
-            )
+        assert [r.text for r in results] == ["first", "second"]
 
-    @patch("voice_notes.summarize.OpenAI")
-    def test_none_response_raises_runtime_error(
+    def test_empty_list_makes_no_requests(self, mock_batch_client: MagicMock) -> None:
+        """Test that an empty batch does not upload anything."""
+        assert summarize_transcripts_batch([], api_key="key") == []
+        mock_batch_client.files.create.assert_not_called()
+
+    @pytest.mark.parametrize("status", ["failed", "expired", "cancelled"])
+    def test_failed_job_raises_runtime_error(
+        self, mock_batch_client: MagicMock, status: str
+    ) -> None:
+        """Test that a job ending in a failure state raises RuntimeError."""
+        mock_batch_client.batches.retrieve.return_value.status = status
+
+        with pytest.raises(RuntimeError, match=f"Batch job batch-1 {status}"):
+            summarize_transcripts_batch(["one", "two"], api_key="key")
+
+    def test_missing_output_file_raises_runtime_error(
+        self, mock_batch_client: MagicMock
+    ) -> None:
+        """Test that a completed job without output raises RuntimeError."""
+        mock_batch_client.batches.retrieve.return_value.output_file_id = None
+
+        with pytest.raises(RuntimeError, match="produced no output"):
+            summarize_transcripts_batch(["one", "two"], api_key="key")
+
+    @pytest.mark.parametrize(
+        ("output", "message"),
+        [
+            (_batch_line("t-0", "x", status_code=500), "Batch request t-0 failed"),
+            (_batch_line("t-0", "x"), "missing request t-1"),
+            ("not json", "Invalid batch output line"),
+            (
+                json.dumps({"custom_id": "t-0", "response": {"status_code": 200}}),
+                "Invalid API response for batch request t-0",
+            ),
+        ],
+    )
+    def test_bad_output_raises_runtime_error(
+        self, mock_batch_client: MagicMock, output: str, message: str
+    ) -> None:
+        """Test that failed or incomplete results raise RuntimeError."""
+        mock_batch_client.files.content.return_value.text = output
+
+        with pytest.raises(RuntimeError, match=message):
+            summarize_transcripts_batch(["one", "two"], api_key="key")
+
+    @pytest.mark.parametrize(
+        ("output_file_id", "errors", "message"),
+        [
+            pytest.param(
+                None,
+                _BATCH_ERROR_LINE,
+                "Batch request t-1 failed: .*Invalid model",
+                id="all-failed",
+            ),
+            pytest.param(
+                "file-out",
+                _BATCH_ERROR_LINE,
+                "Batch request t-1 failed: .*Invalid model",
+                id="some-failed",
+            ),
+            pytest.param(
+                "file-out",
+                "not json",
+                "Batch job batch-1 has failed requests",
+                id="unreadable-errors",
+            ),
+        ],
+    )
+    def test_failed_requests_reported_from_error_file(
         self,
-        mock_openai_class: MagicMock,
+        mock_batch_client: MagicMock,
+        output_file_id: str | None,
+        errors: str,
+        message: str,
     ) -> None:
-        """Test that None response raises RuntimeError."""
-        mock_client = MagicMock()
-        mock_client.chat.completions.create.return_value = None
-        mock_openai_class.return_value = mock_client
+        """Test that the API's error for a failed request is raised."""
+        batch = mock_batch_client.batches.retrieve.return_value
+        batch.output_file_id = output_file_id
+        batch.error_file_id = "file-err"
+        mock_batch_client.files.content.return_value.text = errors
 
-        with pytest.raises(RuntimeError, match="Invalid API response: missing choices"):
-            summarize_transcript(
-                transcript="Test transcript",
-                api_key="test_api_key",
-            )
+        with pytest.raises(RuntimeError, match=message):
+            summarize_transcripts_batch(["one", "two"], api_key="key")
+
+        mock_batch_client.files.content.assert_called_once_with("file-err")
+
+    def test_api_error_raises_runtime_error(self, mock_batch_client: MagicMock) -> None:
+        """Test that client failures are wrapped in RuntimeError."""
+        mock_batch_client.files.create.side_effect = Exception("upload failed")
+
+        with pytest.raises(RuntimeError, match="Failed to generate summary"):
+            summarize_transcripts_batch(["one"], api_key="key")
+
+    def test_empty_transcript_raises_value_error(
+        self, mock_batch_client: MagicMock
+    ) -> None:
+        """Test that empty transcripts are rejected before uploading."""
+        with pytest.raises(ValueError, match="transcript cannot be empty"):
+            summarize_transcripts_batch(["one", ""], api_key="key")
+        mock_batch_client.files.create.assert_not_called()
+
+
+class TestSummary:
+    """Test cases for the Summary dataclass."""
+
+    def test_summary_is_immutable_and_slotted(self) -> None:
+        """Test that Summary has no instance dict and rejects mutation."""
+        summary = Summary(markdown="# Summary", text="# Summary")
+
+        assert not hasattr(summary, "__dict__")
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            summary.text = "changed"  # type: ignore[misc]
+        assert hash(summary) == hash(Summary(markdown="# Summary", text="# Summary"))
+
+
+class TestLazyImports:
+    """Test cases for the deferred openai import."""
+
+    def test_module_import_skips_openai(self) -> None:
+        """Test that importing the summarize module does not load openai."""
+        code = "import sys, voice_notes.summarize; print('openai' in sys.modules)"
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        assert result.stdout.strip() == "False"
@@ -2,38 +2,132 @@
 
 from __future__ import annotations
 
+import gzip
 import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+from collections.abc import Callable, Iterator
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import MagicMock, Mock, patch
 
+import orjson
 import pytest
 
-from voice_notes.transcribe import WhisperResult, save_segments_json, transcribe_file
+from voice_notes.transcribe import (
+    WhisperResult,
+    clear_audio_cache,
+    clear_model_cache,
+    load_audio,
+    load_segments_json,
+    preload_model,
+    release_models,
+    save_segments_json,
+    transcribe_file,
+    transcribe_files,
+)
+
+_WORDS = [{"word": "Hello", "start": 0.0, "end": 0.5}]
+
+# (result.segments, normalized segments, transcript text) for the shapes
+# WhisperX may return; the segment objects are shared, so tests must not
+# modify them
+SEGMENT_CASES = (
+    pytest.param([], [], "", id="empty"),
+    pytest.param(
+        [
+            {"text": "Hello", "start": 0.0, "end": 1.0},
+            {"text": "   ", "start": 1.0, "end": 2.0},
+            {"text": "World", "start": 2.0, "end": 3.0},
+        ],
+        [
+            {"text": "Hello", "start": 0.0, "end": 1.0},
+            {"text": "   ", "start": 1.0, "end": 2.0},
+            {"text": "World", "start": 2.0, "end": 3.0},
+        ],
+        "Hello World",
+        id="whitespace-only-segment",
+    ),
+    pytest.param(
+        [
+            SimpleNamespace(text="Hello", start=0.0, end=1.0, words=[]),
+            SimpleNamespace(text="World", start=1.0, end=2.0, words=[]),
+        ],
+        [
+            {"text": "Hello", "start": 0.0, "end": 1.0},
+            {"text": "World", "start": 1.0, "end": 2.0},
+        ],
+        "Hello World",
+        id="segment-objects",
+    ),
+    pytest.param(
+        ({"text": "Hello", "start": 0.0, "end": 1.0},),
+        [{"text": "Hello", "start": 0.0, "end": 1.0}],
+        "Hello",
+        id="tuple",
+    ),
+    pytest.param(
+        [SimpleNamespace(text="Hello", start=0.0, end=1.0, words=_WORDS)],
+        [{"text": "Hello", "start": 0.0, "end": 1.0, "words": _WORDS}],
+        "Hello",
+        id="segment-object-with-words",
+    ),
+)
+
+
+@pytest.fixture
+def fake_whisperx(monkeypatch: pytest.MonkeyPatch) -> SimpleNamespace:
+    """Stand in for the whisperx module transcribe imports on first use.
+
+    Only the entry points transcribe calls are Mocks (so tests can assert on
+    their calls); the model they return is a plain namespace.
+
+    Args:
+        monkeypatch: Pytest monkeypatch fixture.
+
+    Returns:
+        Module stub whose load_model returns a model with a transcribe Mock.
+    """
+    model = SimpleNamespace(
+        transcribe=Mock(return_value={"segments": [], "language": "en"})
+    )
+    fake = SimpleNamespace(
+        load_model=Mock(return_value=model),
+        load_audio=Mock(return_value=b"fake_audio_data"),
+    )
+    monkeypatch.setitem(sys.modules, "whisperx", fake)
+    return fake
+
+
+@pytest.fixture(autouse=True)
+def empty_caches() -> Iterator[None]:
+    """Start and finish every test with empty Whisper model and audio caches."""
+    clear_model_cache()
+    clear_audio_cache()
+    yield
+    clear_model_cache()
+    clear_audio_cache()
 
 
 class TestTranscribeFile:
     """Test cases for transcribe_file function."""
 
-    @patch("voice_notes.transcribe.whisperx.load_audio")
-    @patch("voice_notes.transcribe.whisperx.load_model")
     def test_successful_transcription(
         self,
-        mock_load_model: MagicMock,
-        mock_load_audio: MagicMock,
+        fake_whisperx: SimpleNamespace,
         mock_audio_file: Path,
         sample_segments: list[dict],
+        make_whisper_result: Callable[..., SimpleNamespace],
     ) -> None:
         """Test successful transcription with valid inputs."""
         # Setup mocks
-        mock_model = MagicMock()
-        mock_result = MagicMock()
-        mock_result.segments = sample_segments
-        mock_result.language = "en"
-        # Set text to None so code extracts from segments instead
-        mock_result.text = None
+        mock_model = fake_whisperx.load_model.return_value
+        mock_result = make_whisper_result(sample_segments)
         mock_model.transcribe.return_value = mock_result
-        mock_load_model.return_value = mock_model
-        mock_load_audio.return_value = b"fake_audio_data"
 
         # Call function
         result = transcribe_file(
@@ -50,26 +144,20 @@ class TestTranscribeFile:
         assert result.text == "Hello world How are you? I'm doing well, thanks!"
 
         # Verify mocks were called correctly
-        mock_load_model.assert_called_once()
-        mock_load_audio.assert_called_once_with(str(mock_audio_file))
+        fake_whisperx.load_model.assert_called_once()
+        fake_whisperx.load_audio.assert_called_once_with(str(mock_audio_file))
         mock_model.transcribe.assert_called_once()
 
-    @patch("voice_notes.transcribe.whisperx.load_audio")
-    @patch("voice_notes.transcribe.whisperx.load_model")
     def test_transcription_with_prompt(
         self,
-        mock_load_model: MagicMock,
-        mock_load_audio: MagicMock,
+        fake_whisperx: SimpleNamespace,
         mock_audio_file: Path,
+        make_whisper_result: Callable[..., SimpleNamespace],
     ) -> None:
         """Test transcription with initial prompt."""
-        mock_model = MagicMock()
-        mock_result = MagicMock()
-        mock_result.segments = [{"text": "Test", "start": 0.0, "end": 1.0}]
-        mock_result.language = "en"
+        mock_model = fake_whisperx.load_model.return_value
+        mock_result = make_whisper_result([{"text": "Test", "start": 0.0, "end": 1.0}])
         mock_model.transcribe.return_value = mock_result
-        mock_load_model.return_value = mock_model
-        mock_load_audio.return_value = b"fake_audio_data"
 
         result = transcribe_file(
             audio_path=mock_audio_file,
@@ -79,27 +167,21 @@ class TestTranscribeFile:
         )
 
         assert isinstance(result, WhisperResult)
-        # Verify prompt was passed in asr_options
-        call_args = mock_load_model.call_args
-        assert call_args is not None
-        assert "asr_options" in call_args.kwargs or "asr_options" in str(call_args)
+        asr_options = fake_whisperx.load_model.call_args.kwargs["asr_options"]
+        assert asr_options == {"initial_prompt": "This is a test prompt"}
 
-    @patch("voice_notes.transcribe.whisperx.load_audio")
-    @patch("voice_notes.transcribe.whisperx.load_model")
     def test_transcription_auto_detect_language(
         self,
-        mock_load_model: MagicMock,
-        mock_load_audio: MagicMock,
+        fake_whisperx: SimpleNamespace,
         mock_audio_file: Path,
+        make_whisper_result: Callable[..., SimpleNamespace],
     ) -> None:
         """Test transcription with auto language detection."""
-        mock_model = MagicMock()
-        mock_result = MagicMock()
-        mock_result.segments = [{"text": "Bonjour", "start": 0.0, "end": 1.0}]
-        mock_result.language = "fr"
+        mock_model = fake_whisperx.load_model.return_value
+        mock_result = make_whisper_result(
+            [{"text": "Bonjour", "start": 0.0, "end": 1.0}], language="fr"
+        )
         mock_model.transcribe.return_value = mock_result
-        mock_load_model.return_value = mock_model
-        mock_load_audio.return_value = b"fake_audio_data"
 
         result = transcribe_file(
             audio_path=mock_audio_file,
@@ -110,36 +192,21 @@ class TestTranscribeFile:
 
         assert result.language == "fr"
 
-    @patch("voice_notes.transcribe.whisperx.load_audio")
-    @patch("voice_notes.transcribe.whisperx.load_model")
-    def test_transcription_with_segment_objects(
+    @pytest.mark.parametrize(
+        ("segments", "expected_segments", "expected_text"), SEGMENT_CASES
+    )
+    def test_segment_shapes(
         self,
-        mock_load_model: MagicMock,
-        mock_load_audio: MagicMock,
+        fake_whisperx: SimpleNamespace,
         mock_audio_file: Path,
+        make_whisper_result: Callable[..., SimpleNamespace],
+        segments: Any,
+        expected_segments: list[dict[str, Any]],
+        expected_text: str,
     ) -> None:
-        """Test transcription when WhisperX returns segment objects instead of dicts."""
-        mock_model = MagicMock()
-        mock_result = MagicMock()
-
-        # Create mock segment objects
-        mock_seg1 = MagicMock()
-        mock_seg1.text = "Hello"
-        mock_seg1.start = 0.0
-        mock_seg1.end = 1.0
-        mock_seg1.words = []
-
-        mock_seg2 = MagicMock()
-        mock_seg2.text = "World"
-        mock_seg2.start = 1.0
-        mock_seg2.end = 2.0
-        mock_seg2.words = []
-
-        mock_result.segments = [mock_seg1, mock_seg2]
-        mock_result.language = "en"
-        mock_model.transcribe.return_value = mock_result
-        mock_load_model.return_value = mock_model
-        mock_load_audio.return_value = b"fake_audio_data"
+        """Test that each segment shape WhisperX may return is normalized."""
+        mock_model = fake_whisperx.load_model.return_value
+        mock_model.transcribe.return_value = make_whisper_result(segments)
 
         result = transcribe_file(
             audio_path=mock_audio_file,
@@ -147,9 +214,178 @@ class TestTranscribeFile:
             device="cpu",
         )
 
-        assert len(result.segments) == 2
-        assert result.segments[0]["text"] == "Hello"
-        assert result.segments[1]["text"] == "World"
+        assert result.segments == expected_segments
+        assert result.text == expected_text
+
+    def test_model_reused_across_calls(
+        self,
+        fake_whisperx: SimpleNamespace,
+        mock_audio_file: Path,
+    ) -> None:
+        """Test that repeated transcriptions reuse the loaded model."""
+        mock_model = fake_whisperx.load_model.return_value
+        mock_model.transcribe.return_value = {"segments": [], "language": "en"}
+
+        for _ in range(2):
+            transcribe_file(
+                audio_path=mock_audio_file,
+                model_name="small",
+                device="cpu",
+            )
+        transcribe_file(
+            audio_path=mock_audio_file,
+            model_name="base",
+            device="cpu",
+        )
+
+        assert fake_whisperx.load_model.call_count == 2
+        assert mock_model.transcribe.call_count == 3
+
+    @pytest.mark.parametrize(
+        ("device", "compute_type", "expected"),
+        [
+            ("cpu", None, "int8"),
+            ("cuda", None, "float16"),
+            ("cpu", "float32", "float32"),
+        ],
+    )
+    def test_compute_type(
+        self,
+        fake_whisperx: SimpleNamespace,
+        mock_audio_file: Path,
+        device: str,
+        compute_type: str | None,
+        expected: str,
+    ) -> None:
+        """Test that the compute type defaults per device and can be overridden."""
+        mock_model = fake_whisperx.load_model.return_value
+        mock_model.transcribe.return_value = {"segments": [], "language": "en"}
+
+        transcribe_file(
+            audio_path=mock_audio_file,
+            model_name="small",
+            device=device,
+            compute_type=compute_type,
+        )
+
+        assert fake_whisperx.load_model.call_args.kwargs["compute_type"] == expected
+
+    def test_cached_result_reused(
+        self,
+        fake_whisperx: SimpleNamespace,
+        mock_audio_file: Path,
+        temp_dir: Path,
+    ) -> None:
+        """Test that a cached transcript skips model loading and inference."""
+        mock_model = fake_whisperx.load_model.return_value
+        mock_model.transcribe.return_value = {
+            "segments": [{"text": "Hello", "start": 0.0, "end": 1.0}],
+            "language": "en",
+        }
+
+        with patch.dict(os.environ, {"VOICE_NOTES_CACHE_DIR": str(temp_dir)}):
+            first = transcribe_file(mock_audio_file, "small", "cpu", cache_enabled=True)
+            clear_model_cache()
+            second = transcribe_file(
+                mock_audio_file, "small", "cpu", cache_enabled=True
+            )
+            other_model = transcribe_file(
+                mock_audio_file, "base", "cpu", cache_enabled=True
+            )
+
+        assert second == first
+        assert other_model == first
+        assert mock_model.transcribe.call_count == 2
+        assert fake_whisperx.load_model.call_count == 2
+
+    def test_detected_language_rerun_reuses_cache(
+        self,
+        fake_whisperx: SimpleNamespace,
+        mock_audio_file: Path,
+        temp_dir: Path,
+    ) -> None:
+        """Test that passing the detected language hits the auto-detect entry."""
+        mock_model = fake_whisperx.load_model.return_value
+        mock_model.transcribe.return_value = {"segments": [], "language": "fr"}
+
+        with patch.dict(os.environ, {"VOICE_NOTES_CACHE_DIR": str(temp_dir)}):
+            detected = transcribe_file(
+                mock_audio_file, "small", "cpu", cache_enabled=True
+            )
+            rerun = transcribe_file(
+                mock_audio_file, "small", "cpu", language="fr", cache_enabled=True
+            )
+
+        assert rerun == detected
+        mock_model.transcribe.assert_called_once()
+
+    def test_malformed_cache_entry_ignored(
+        self,
+        fake_whisperx: SimpleNamespace,
+        mock_audio_file: Path,
+        temp_dir: Path,
+    ) -> None:
+        """Test that a cache entry with the wrong shape is treated as a miss."""
+        mock_model = fake_whisperx.load_model.return_value
+        mock_model.transcribe.return_value = {"segments": [], "language": "en"}
+
+        with patch.dict(os.environ, {"VOICE_NOTES_CACHE_DIR": str(temp_dir)}):
+            with patch("voice_notes.transcribe.load_result", return_value={"text": 1}):
+                transcribe_file(mock_audio_file, "small", "cpu", cache_enabled=True)
+
+        mock_model.transcribe.assert_called_once()
+
+    def test_chunk_size_passed_to_model(
+        self,
+        fake_whisperx: SimpleNamespace,
+        mock_audio_file: Path,
+    ) -> None:
+        """Test that the window and batch sizes reach WhisperX."""
+        mock_model = fake_whisperx.load_model.return_value
+        mock_model.transcribe.return_value = {"segments": [], "language": "en"}
+
+        transcribe_file(mock_audio_file, "small", "cpu", chunk_size=10, batch_size=4)
+
+        assert mock_model.transcribe.call_args.kwargs["chunk_size"] == 10
+        assert mock_model.transcribe.call_args.kwargs["batch_size"] == 4
+
+    def test_invalid_batch_size_raises_error(self, mock_audio_file: Path) -> None:
+        """Test that a batch size below one is rejected."""
+        with pytest.raises(ValueError, match="batch_size must be at least 1"):
+            transcribe_file(mock_audio_file, "small", "cpu", batch_size=0)
+
+    @pytest.mark.parametrize("chunk_size", [0, 31])
+    def test_invalid_chunk_size_raises_error(
+        self, mock_audio_file: Path, chunk_size: int
+    ) -> None:
+        """Test that windows outside 1-30 seconds are rejected."""
+        with pytest.raises(ValueError, match="Invalid chunk_size"):
+            transcribe_file(mock_audio_file, "small", "cpu", chunk_size=chunk_size)
+
+    @pytest.mark.parametrize(
+        "result",
+        [
+            {"segments": [{"text": "Hi"}], "text": "Hi", "language": "en"},
+            SimpleNamespace(segments=[{"text": "Hi"}], text="Hi", language="en"),
+        ],
+    )
+    def test_result_structure_logged_at_debug(
+        self,
+        fake_whisperx: SimpleNamespace,
+        mock_audio_file: Path,
+        caplog: pytest.LogCaptureFixture,
+        result: object,
+    ) -> None:
+        """Test that result introspection only runs with debug logging on."""
+        fake_whisperx.load_model.return_value.transcribe.return_value = result
+
+        transcribe_file(mock_audio_file, "small", "cpu")
+        assert "Result type" not in caplog.text
+
+        with caplog.at_level(logging.DEBUG, logger="voice_notes.transcribe"):
+            transcribe_file(mock_audio_file, "small", "cpu")
+        assert caplog.text.count("Result type") == 1
+        assert "Segments type" in caplog.text
 
     def test_file_not_found_raises_error(self, temp_dir: Path) -> None:
         """Test that missing audio file raises FileNotFoundError."""
@@ -179,83 +415,19 @@ class TestTranscribeFile:
                 device="invalid_device",
             )
 
-    @patch("voice_notes.transcribe.whisperx.load_audio")
-    @patch("voice_notes.transcribe.whisperx.load_model")
-    def test_empty_segments(
-        self,
-        mock_load_model: MagicMock,
-        mock_load_audio: MagicMock,
-        mock_audio_file: Path,
-    ) -> None:
-        """Test transcription with empty segments."""
-        mock_model = MagicMock()
-        mock_result = MagicMock()
-        mock_result.segments = []
-        mock_result.language = "en"
-        # Set text to None so code extracts from segments instead
-        mock_result.text = None
-        mock_model.transcribe.return_value = mock_result
-        mock_load_model.return_value = mock_model
-        mock_load_audio.return_value = b"fake_audio_data"
-
-        result = transcribe_file(
-            audio_path=mock_audio_file,
-            model_name="small",
-            device="cpu",
-        )
-
-        assert result.segments == []
-        assert result.text == ""
-
-    @patch("voice_notes.transcribe.whisperx.load_audio")
-    @patch("voice_notes.transcribe.whisperx.load_model")
-    def test_segments_with_whitespace_only(
-        self,
-        mock_load_model: MagicMock,
-        mock_load_audio: MagicMock,
-        mock_audio_file: Path,
-    ) -> None:
-        """Test transcription with segments containing only whitespace."""
-        mock_model = MagicMock()
-        mock_result = MagicMock()
-        mock_result.segments = [
-            {"text": "Hello", "start": 0.0, "end": 1.0},
-            {"text": "   ", "start": 1.0, "end": 2.0},
-            {"text": "World", "start": 2.0, "end": 3.0},
-        ]
-        mock_result.language = "en"
-        # Set text to None so code extracts from segments instead
-        mock_result.text = None
-        mock_model.transcribe.return_value = mock_result
-        mock_load_model.return_value = mock_model
-        mock_load_audio.return_value = b"fake_audio_data"
-
-        result = transcribe_file(
-            audio_path=mock_audio_file,
-            model_name="small",
-            device="cpu",
-        )
-
-        assert result.text == "Hello World"
-
-    @patch("voice_notes.transcribe.whisperx.load_audio")
-    @patch("voice_notes.transcribe.whisperx.load_model")
     def test_transcription_with_dict_result_and_text(
         self,
-        mock_load_model: MagicMock,
-        mock_load_audio: MagicMock,
+        fake_whisperx: SimpleNamespace,
         mock_audio_file: Path,
     ) -> None:
         """Test transcription when result is a dict with text attribute."""
-        mock_model = MagicMock()
+        mock_model = fake_whisperx.load_model.return_value
         mock_result = {
             "text": "Direct text from result",
             "segments": [{"text": "Hello", "start": 0.0, "end": 1.0}],
             "language": "en",
         }
         mock_model.transcribe.return_value = mock_result
-        mock_load_model.return_value = mock_model
-        mock_load_audio.return_value = b"fake_audio_data"
 
         result = transcribe_file(
             audio_path=mock_audio_file,
@@ -266,22 +438,17 @@ class TestTranscribeFile:
         assert result.text == "Direct text from result"
         assert result.language == "en"
 
-    @patch("voice_notes.transcribe.whisperx.load_audio")
-    @patch("voice_notes.transcribe.whisperx.load_model")
     def test_transcription_with_dict_result_no_language(
         self,
-        mock_load_model: MagicMock,
-        mock_load_audio: MagicMock,
+        fake_whisperx: SimpleNamespace,
         mock_audio_file: Path,
     ) -> None:
         """Test transcription when result is a dict without language."""
-        mock_model = MagicMock()
+        mock_model = fake_whisperx.load_model.return_value
         mock_result = {
             "segments": [{"text": "Hello", "start": 0.0, "end": 1.0}],
         }
         mock_model.transcribe.return_value = mock_result
-        mock_load_model.return_value = mock_model
-        mock_load_audio.return_value = b"fake_audio_data"
 
         result = transcribe_file(
             audio_path=mock_audio_file,
@@ -292,86 +459,17 @@ class TestTranscribeFile:
 
         assert result.language == "fr"  # Falls back to provided language
 
-    @patch("voice_notes.transcribe.whisperx.load_audio")
-    @patch("voice_notes.transcribe.whisperx.load_model")
-    def test_transcription_with_non_list_segments(
-        self,
-        mock_load_model: MagicMock,
-        mock_load_audio: MagicMock,
-        mock_audio_file: Path,
-    ) -> None:
-        """Test transcription when segments is not a list."""
-        mock_model = MagicMock()
-        mock_result = MagicMock()
-        # Set segments to a tuple (iterable but not list)
-        mock_result.segments = ({"text": "Hello", "start": 0.0, "end": 1.0},)
-        mock_result.language = "en"
-        mock_result.text = None
-        mock_model.transcribe.return_value = mock_result
-        mock_load_model.return_value = mock_model
-        mock_load_audio.return_value = b"fake_audio_data"
-
-        result = transcribe_file(
-            audio_path=mock_audio_file,
-            model_name="small",
-            device="cpu",
-        )
-
-        assert len(result.segments) == 1
-        assert result.segments[0]["text"] == "Hello"
-
-    @patch("voice_notes.transcribe.whisperx.load_audio")
-    @patch("voice_notes.transcribe.whisperx.load_model")
-    def test_transcription_with_segments_containing_words(
-        self,
-        mock_load_model: MagicMock,
-        mock_load_audio: MagicMock,
-        mock_audio_file: Path,
-    ) -> None:
-        """Test transcription when segments have words attribute."""
-        mock_model = MagicMock()
-        mock_seg = MagicMock()
-        mock_seg.text = "Hello"
-        mock_seg.start = 0.0
-        mock_seg.end = 1.0
-        mock_seg.words = [{"word": "Hello", "start": 0.0, "end": 0.5}]
-
-        mock_result = MagicMock()
-        mock_result.segments = [mock_seg]
-        mock_result.language = "en"
-        mock_result.text = None
-        mock_model.transcribe.return_value = mock_result
-        mock_load_model.return_value = mock_model
-        mock_load_audio.return_value = b"fake_audio_data"
-
-        result = transcribe_file(
-            audio_path=mock_audio_file,
-            model_name="small",
-            device="cpu",
-        )
-
-        assert len(result.segments) == 1
-        assert "words" in result.segments[0]
-        assert result.segments[0]["words"] == [
-            {"word": "Hello", "start": 0.0, "end": 0.5}
-        ]
-
-    @patch("voice_notes.transcribe.whisperx.load_audio")
-    @patch("voice_notes.transcribe.whisperx.load_model")
     def test_transcription_with_dict_result_non_list_segments(
         self,
-        mock_load_model: MagicMock,
-        mock_load_audio: MagicMock,
+        fake_whisperx: SimpleNamespace,
         mock_audio_file: Path,
     ) -> None:
         """Test transcription when dict result has segments that aren't a list."""
-        mock_model = MagicMock()
+        mock_model = fake_whisperx.load_model.return_value
         mock_result = {
             "segments": "not a list",  # Invalid type
         }
         mock_model.transcribe.return_value = mock_result
-        mock_load_model.return_value = mock_model
-        mock_load_audio.return_value = b"fake_audio_data"
 
         result = transcribe_file(
             audio_path=mock_audio_file,
@@ -383,6 +481,46 @@ class TestTranscribeFile:
         assert result.text == ""
 
 
+class TestTranscribeFiles:
+    """Test cases for transcribe_files function."""
+
+    def test_files_share_one_model(
+        self, fake_whisperx: SimpleNamespace, temp_dir: Path
+    ) -> None:
+        """Test that every file is decoded and transcribed with one model."""
+        paths = [temp_dir / f"{name}.wav" for name in ("a", "b", "c")]
+        for path in paths:
+            path.write_bytes(b"RIFF")
+        model = fake_whisperx.load_model.return_value
+        model.transcribe.side_effect = [
+            {"segments": [{"text": name}], "language": "en"} for name in "abc"
+        ]
+
+        results = transcribe_files(paths, "small", "cpu")
+
+        assert [r.text for r in results] == ["a", "b", "c"]
+        fake_whisperx.load_model.assert_called_once()
+        assert [c.args for c in fake_whisperx.load_audio.call_args_list] == [
+            (str(path),) for path in paths
+        ]
+        assert model.transcribe.call_count == 3
+
+    def test_empty_list(self, fake_whisperx: SimpleNamespace) -> None:
+        """Test that no files means no model load."""
+        assert transcribe_files([], "small", "cpu") == []
+        fake_whisperx.load_model.assert_not_called()
+
+    def test_missing_file_raises_before_decoding(
+        self, fake_whisperx: SimpleNamespace, mock_audio_file: Path, temp_dir: Path
+    ) -> None:
+        """Test that a missing file is reported before any work starts."""
+        with pytest.raises(FileNotFoundError, match="Audio file not found"):
+            transcribe_files(
+                [mock_audio_file, temp_dir / "missing.wav"], "small", "cpu"
+            )
+        fake_whisperx.load_audio.assert_not_called()
+
+
 class TestSaveSegmentsJson:
     """Test cases for save_segments_json function."""
 
@@ -442,6 +580,15 @@ class TestSaveSegmentsJson:
             loaded = json.load(f)
         assert loaded == segments
 
+    def test_save_segments_keeps_unicode_unescaped(self, temp_dir: Path) -> None:
+        """Test that non-ASCII text is written as UTF-8, not escaped."""
+        output_path = temp_dir / "raw_unicode.json"
+        save_segments_json([{"text": "Hello 世界"}], output_path)
+
+        raw = output_path.read_text(encoding="utf-8")
+        assert "世界" in raw
+        assert raw == '[{"text":"Hello 世界"}]'
+
     def test_overwrite_existing_file(self, temp_dir: Path) -> None:
         """Test overwriting existing JSON file."""
         output_path = temp_dir / "segments.json"
@@ -455,6 +602,29 @@ class TestSaveSegmentsJson:
             loaded = json.load(f)
         assert loaded == new_segments
 
+    def test_atomic_overwrite(self, temp_dir: Path) -> None:
+        """Test that an atomic save replaces the file and leaves no temp file."""
+        output_path = temp_dir / "segments.json"
+        new_segments = [{"text": "New", "start": 0.0, "end": 1.0}]
+
+        save_segments_json([{"text": "Old"}], output_path)
+        save_segments_json(new_segments, output_path, atomic=True)
+
+        assert orjson.loads(output_path.read_bytes()) == new_segments
+        assert [p.name for p in temp_dir.iterdir()] == ["segments.json"]
+
+    def test_atomic_failure_keeps_old_file(self, temp_dir: Path) -> None:
+        """Test that a failed atomic save leaves the previous file intact."""
+        output_path = temp_dir / "segments.json"
+        save_segments_json([{"text": "Old"}], output_path)
+
+        with patch("voice_notes.transcribe.os.replace", side_effect=OSError("full")):
+            with pytest.raises(OSError, match="Failed to write JSON file"):
+                save_segments_json([{"text": "New"}], output_path, atomic=True)
+
+        assert orjson.loads(output_path.read_bytes()) == [{"text": "Old"}]
+        assert [p.name for p in temp_dir.iterdir()] == ["segments.json"]
+
     def test_save_segments_json_error_handling(self, temp_dir: Path) -> None:
         """Test error handling in save_segments_json."""
         output_path = temp_dir / "segments.json"
@@ -467,3 +637,296 @@ class TestSaveSegmentsJson:
 
         with pytest.raises(TypeError, match="Failed to serialize segments to JSON"):
             save_segments_json(segments, output_path)  # type: ignore[arg-type]
+
+    def test_save_segments_is_compact(self, temp_dir: Path) -> None:
+        """Test that segments are written without indentation."""
+        output_path = temp_dir / "segments.json"
+        save_segments_json([{"text": "Hi", "start": 0.0}], output_path)
+
+        assert output_path.read_bytes() == b'[{"text":"Hi","start":0.0}]'
+
+    def test_gzip_round_trip(self, temp_dir: Path) -> None:
+        """Test that a .gz path is compressed and loads back transparently."""
+        segments = [{"text": "Hello", "start": 0.0, "end": 1.0}] * 50
+        output_path = temp_dir / "segments.json.gz"
+
+        save_segments_json(segments, output_path)
+
+        raw = output_path.read_bytes()
+        assert gzip.decompress(raw) == orjson.dumps(segments)
+        assert len(raw) < len(orjson.dumps(segments))
+        assert load_segments_json(output_path) == segments
+
+    def test_save_columnar_segments(self, temp_dir: Path) -> None:
+        """Test that columnar output has one array per field."""
+        output_path = temp_dir / "segments.json"
+        segments = [
+            {"start": 0.0, "end": 1.0, "text": "Hi", "speaker": "SPEAKER_00"},
+            {"start": 1.0, "end": 2.0, "text": "Yo"},
+        ]
+        save_segments_json(segments, output_path, columnar=True)
+
+        with open(output_path, encoding="utf-8") as f:
+            loaded = json.load(f)
+        assert loaded == {
+            "start": [0.0, 1.0],
+            "end": [1.0, 2.0],
+            "text": ["Hi", "Yo"],
+            "speaker": ["SPEAKER_00", None],
+        }
+
+
+class TestLoadAudio:
+    """Test cases for load_audio function."""
+
+    @patch("whisperx.load_audio")
+    @patch("soundfile.read")
+    @patch("soundfile.info")
+    def test_native_audio_read_directly(
+        self,
+        mock_info: MagicMock,
+        mock_read: MagicMock,
+        mock_whisperx_load_audio: MagicMock,
+        mock_audio_file: Path,
+    ) -> None:
+        """Test that 16 kHz mono files skip the ffmpeg decode."""
+        mock_info.return_value = MagicMock(samplerate=16000, channels=1)
+        samples = MagicMock()
+        mock_read.return_value = (samples, 16000)
+
+        assert load_audio(mock_audio_file) is samples
+        mock_read.assert_called_once_with(str(mock_audio_file), dtype="float32")
+        mock_whisperx_load_audio.assert_not_called()
+
+    @patch("whisperx.load_audio")
+    def test_decodes_are_cached_until_file_changes(
+        self, mock_whisperx_load_audio: MagicMock, temp_dir: Path
+    ) -> None:
+        """Test that an unchanged file is decoded once and a changed one again."""
+        audio_path = temp_dir / "clip.mp4"
+        audio_path.write_bytes(b"first")
+
+        first = load_audio(audio_path)
+        assert load_audio(audio_path) is first
+        assert mock_whisperx_load_audio.call_count == 1
+
+        audio_path.write_bytes(b"second take")
+        load_audio(audio_path)
+        assert mock_whisperx_load_audio.call_count == 2
+
+    @patch("whisperx.load_audio")
+    @patch("soundfile.read")
+    @patch("soundfile.info")
+    def test_stereo_audio_downmixed_in_process(
+        self,
+        mock_info: MagicMock,
+        mock_read: MagicMock,
+        mock_whisperx_load_audio: MagicMock,
+        mock_audio_file: Path,
+    ) -> None:
+        """Test that 16 kHz stereo is averaged to mono without ffmpeg."""
+        mock_info.return_value = MagicMock(samplerate=16000, channels=2)
+        frames = MagicMock()
+        mock_read.return_value = (frames, 16000)
+
+        assert load_audio(mock_audio_file) is frames.mean.return_value
+        frames.mean.assert_called_once_with(axis=1)
+        mock_read.assert_called_once_with(
+            str(mock_audio_file), dtype="float32", always_2d=True
+        )
+        mock_whisperx_load_audio.assert_not_called()
+
+    @patch("whisperx.load_audio")
+    @patch("soundfile.read")
+    @patch("soundfile.info")
+    def test_other_rates_resampled_in_process(
+        self,
+        mock_info: MagicMock,
+        mock_read: MagicMock,
+        mock_whisperx_load_audio: MagicMock,
+        mock_audio_file: Path,
+    ) -> None:
+        """Test that 44.1 kHz mono is resampled with torchaudio, not ffmpeg."""
+        mock_info.return_value = MagicMock(samplerate=44100, channels=1)
+        frames = MagicMock()
+        mock_read.return_value = (frames, 44100)
+        mock_torch = MagicMock()
+        mock_torchaudio = MagicMock()
+
+        with patch.dict(
+            sys.modules, {"torch": mock_torch, "torchaudio": mock_torchaudio}
+        ):
+            result = load_audio(mock_audio_file)
+
+        mock_torch.from_numpy.assert_called_once_with(frames.__getitem__.return_value)
+        resample = mock_torchaudio.functional.resample
+        resample.assert_called_once_with(
+            mock_torch.from_numpy.return_value, 44100, 16000
+        )
+        assert result is resample.return_value.numpy.return_value
+        mock_whisperx_load_audio.assert_not_called()
+
+    @pytest.mark.parametrize(
+        "error", [RuntimeError("Format not recognised"), OSError()]
+    )
+    @patch("whisperx.load_audio")
+    @patch("soundfile.read")
+    @patch("soundfile.info")
+    def test_other_formats_decoded_by_whisperx(
+        self,
+        mock_info: MagicMock,
+        mock_read: MagicMock,
+        mock_whisperx_load_audio: MagicMock,
+        mock_audio_file: Path,
+        error: Exception,
+    ) -> None:
+        """Test that formats libsndfile cannot read fall back to ffmpeg."""
+        mock_info.side_effect = error
+
+        result = load_audio(mock_audio_file)
+
+        assert result is mock_whisperx_load_audio.return_value
+        mock_read.assert_not_called()
+        mock_whisperx_load_audio.assert_called_once_with(str(mock_audio_file))
+
+
+class TestLazyImports:
+    """Test cases for the deferred whisperx import."""
+
+    def test_module_import_skips_whisperx(self) -> None:
+        """Test that importing the transcribe module does not load whisperx."""
+        code = "import sys, voice_notes.transcribe; print('whisperx' in sys.modules)"
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        assert result.stdout.strip() == "False"
+
+
+class TestPreloadModel:
+    """Test cases for preload_model function."""
+
+    def test_preloaded_model_is_reused(
+        self,
+        fake_whisperx: SimpleNamespace,
+        mock_audio_file: Path,
+    ) -> None:
+        """Test that transcribe_file reuses a model loaded in the background."""
+        fake_whisperx.load_model.return_value.transcribe.return_value = {"segments": []}
+
+        thread = preload_model("small", "cpu", language="en")
+        thread.join()
+        transcribe_file(mock_audio_file, "small", "cpu", language="en")
+
+        assert thread.daemon
+        fake_whisperx.load_model.assert_called_once_with(
+            "small", device="cpu", compute_type="int8", language="en", asr_options=None
+        )
+
+    def test_failure_is_logged(
+        self, fake_whisperx: SimpleNamespace, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        """Test that a failed preload logs a warning instead of raising."""
+        fake_whisperx.load_model.side_effect = RuntimeError("out of memory")
+        with caplog.at_level(logging.WARNING, logger="voice_notes.transcribe"):
+            preload_model("small", "cpu").join()
+
+        assert "Preloading Whisper model small failed" in caplog.text
+
+    def test_clear_waits_for_loading_model(
+        self, fake_whisperx: SimpleNamespace
+    ) -> None:
+        """Test that clearing during a preload drops the model it loads."""
+        loading = threading.Event()
+        finish = threading.Event()
+        model = fake_whisperx.load_model.return_value
+
+        def slow_load(*args: object, **kwargs: object) -> SimpleNamespace:
+            loading.set()
+            finish.wait(timeout=5)
+            return model
+
+        fake_whisperx.load_model.side_effect = slow_load
+        preload = preload_model("small", "cpu")
+        assert loading.wait(timeout=5)
+
+        clearing = threading.Thread(target=clear_model_cache)
+        clearing.start()
+        clearing.join(timeout=0.1)
+        assert clearing.is_alive()
+
+        finish.set()
+        preload.join()
+        clearing.join()
+        preload_model("small", "cpu").join()
+
+        assert fake_whisperx.load_model.call_count == 2
+
+
+class TestReleaseModels:
+    """Test cases for release_models function."""
+
+    def test_cpu_drops_cached_models(self, fake_whisperx: SimpleNamespace) -> None:
+        """Test that released models are loaded again without touching torch."""
+        preload_model("small", "cpu").join()
+        with patch.dict(sys.modules, {"torch": None}):
+            release_models("cpu")
+        preload_model("small", "cpu").join()
+
+        assert fake_whisperx.load_model.call_count == 2
+
+    def test_cuda_empties_allocator_cache(self) -> None:
+        """Test that releasing CUDA models returns the freed memory."""
+        torch = MagicMock()
+        with patch.dict(sys.modules, {"torch": torch}):
+            release_models("cuda:1")
+
+        torch.cuda.empty_cache.assert_called_once_with()
+
+
+class TestLoadSegmentsJson:
+    """Test cases for load_segments_json function."""
+
+    def test_load_records(self, temp_dir: Path, sample_segments: list[dict]) -> None:
+        """Test loading the list-of-objects layout."""
+        output_path = temp_dir / "segments.json"
+        save_segments_json(sample_segments, output_path)
+        assert load_segments_json(output_path) == sample_segments
+
+    def test_columnar_round_trip(self, temp_dir: Path) -> None:
+        """Test that columnar files load back into the original segments."""
+        output_path = temp_dir / "segments.json"
+        segments = [
+            {"start": 0.0, "end": 1.0, "text": "Hi", "speaker": "SPEAKER_00"},
+            {"start": 1.0, "end": 2.0, "text": "Yo"},
+        ]
+        save_segments_json(segments, output_path, columnar=True)
+        assert load_segments_json(output_path) == segments
+
+    def test_columnar_empty(self, temp_dir: Path) -> None:
+        """Test that empty columnar output loads as an empty list."""
+        output_path = temp_dir / "segments.json"
+        save_segments_json([], output_path, columnar=True)
+        assert load_segments_json(output_path) == []
+
+    @pytest.mark.parametrize(
+        "content",
+        ["not json", '"text"', '{"text": "Hi"}', '{"start": [0.0], "text": []}'],
+    )
+    def test_invalid_content_raises_value_error(
+        self, temp_dir: Path, content: str
+    ) -> None:
+        """Test that malformed files raise ValueError."""
+        output_path = temp_dir / "segments.json"
+        output_path.write_text(content, encoding="utf-8")
+        with pytest.raises(ValueError, match="Invalid segments JSON"):
+            load_segments_json(output_path)
+
+    def test_truncated_gzip_raises_value_error(self, temp_dir: Path) -> None:
+        """Test that a corrupt gzip file raises ValueError."""
+        output_path = temp_dir / "segments.json.gz"
+        output_path.write_bytes(gzip.compress(b"[]")[:-4])
+        with pytest.raises(ValueError, match="Invalid segments JSON"):
+            load_segments_json(output_path)
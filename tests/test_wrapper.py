@@ -2,21 +2,19 @@
 
 from __future__ import annotations
 
+from voice_notes import wrapper
+
 
 class TestWrapper:
     """Test cases for wrapper module."""
 
     def test_wrapper_imports_main(self) -> None:
         """Test that wrapper imports main function."""
-        import voice_notes.wrapper
-
         # Verify main is imported
-        assert hasattr(voice_notes.wrapper, "main")
-        assert voice_notes.wrapper.main is not None
+        assert hasattr(wrapper, "main")
+        assert wrapper.main is not None
 
     def test_wrapper_module_has_docstring(self) -> None:
         """Test that wrapper module has docstring."""
-        import voice_notes.wrapper
-
-        assert voice_notes.wrapper.__doc__ is not None
-        assert "QT_QPA_PLATFORM" in voice_notes.wrapper.__doc__
+        assert wrapper.__doc__ is not None
+        assert "QT_QPA_PLATFORM" in wrapper.__doc__